@@ -0,0 +1,93 @@
+"""Аутентификация по JWT без загрузки пользователя из базы."""
+
+from django.conf import settings  # type: ignore
+from django.contrib.auth import get_user_model  # type: ignore
+from django.core.cache import (DEFAULT_CACHE_ALIAS, cache,  # type: ignore
+                               caches)
+from django.core.cache.backends.locmem import LocMemCache  # type: ignore
+from django.db import DEFAULT_DB_ALIAS  # type: ignore
+from django.utils.translation import gettext_lazy as _  # type: ignore
+from rest_framework_simplejwt.authentication import (  # type: ignore
+    JWTAuthentication)
+from rest_framework_simplejwt.exceptions import InvalidToken  # type: ignore
+from rest_framework_simplejwt.settings import api_settings  # type: ignore
+from rest_framework_simplejwt.tokens import AccessToken  # type: ignore
+
+from users.constants import TOKEN_VERSION_CACHE_KEY
+
+User = get_user_model()
+
+CLAIMS = ('role', 'is_superuser', 'token_version')
+# Версия удалённого или заблокированного пользователя.
+REVOKED = -1
+
+
+def get_access_token(user):
+    """Токен доступа с ролью пользователя и версией его прав."""
+    token = AccessToken.for_user(user)
+    for claim in CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def get_token_version_timeout():
+    """Срок хранения версии токенов в кэше, в секундах.
+
+    Локальный кэш процесса не узнает о смене прав в другом процессе,
+    поэтому в нём версия живёт TOKEN_VERSION_LOCAL_TIMEOUT секунд: столько
+    отозванные права могут действовать в других процессах.
+    """
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return settings.TOKEN_VERSION_LOCAL_TIMEOUT
+    return settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds()
+
+
+def get_token_version(user_id):
+    """Текущая версия токенов пользователя или REVOKED."""
+    key = TOKEN_VERSION_CACHE_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_id, is_active=True).values_list(
+            'token_version', flat=True).first()
+        if version is None:
+            version = REVOKED
+        cache.set(key, version, get_token_version_timeout())
+    return version
+
+
+def get_full_user(user):
+    """Пользователь со всеми полями вместо собранного из токена."""
+    if not user.get_deferred_fields():
+        return user
+    return User.objects.get(pk=user.pk)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Пользователь собирается из утверждений токена.
+
+    Разрешениям нужны только pk, роль и признак суперпользователя, поэтому
+    остальные поля отложены и загружаются при первом обращении. Версия
+    прав из токена сверяется с User.token_version: она растёт при смене
+    роли, прав суперпользователя или блокировке. Токен с устаревшей
+    версией, удалённого пользователя и токены без утверждений проверяются
+    как раньше, загрузкой пользователя из базы.
+    """
+
+    def get_user(self, validated_token):
+        """Пользователь из токена."""
+        if any(claim not in validated_token for claim in CLAIMS):
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification'))
+        if get_token_version(user_id) != validated_token['token_version']:
+            return super().get_user(validated_token)
+        values = {claim: validated_token[claim] for claim in CLAIMS}
+        values.update({'is_active': True,
+                       api_settings.USER_ID_FIELD: user_id})
+        fields = [field.attname for field in User._meta.concrete_fields
+                  if field.attname in values]
+        return User.from_db(DEFAULT_DB_ALIAS, fields,
+                            [values[field] for field in fields])
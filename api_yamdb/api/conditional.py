@@ -0,0 +1,110 @@
+"""Условные запросы: ETag, Last-Modified и ответ 304.
+
+Версия ресурса берётся только из базы, поэтому совпадает во всех
+процессах: у объекта — дата его изменения, у списка отзывов или
+комментариев — дата изменения родителя, у списка произведений — запись
+ListVersion. Сигналы сдвигают эти даты и при изменении связанных данных,
+попадающих в ответ: категорий и жанров у произведений, логинов авторов у
+отзывов и комментариев (см. reviews/signals.py и api/signals.py).
+
+Версии в кэше нужны только спискам с CachedListMixin.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache  # type: ignore
+from django.utils.cache import get_conditional_response  # type: ignore
+from django.utils.http import http_date, quote_etag  # type: ignore
+from rest_framework.generics import get_object_or_404  # type: ignore
+from rest_framework.response import Response  # type: ignore
+
+
+def get_list_version_key(basename):
+    """Ключ версии списка вьюсета с CachedListMixin."""
+    return f'list:{basename}:version'
+
+
+def get_cache_version(key):
+    """Текущая версия в кэше."""
+    version = cache.get(key)
+    if version is None:
+        # Не начинаем с единицы, чтобы после вытеснения ключа
+        # не совпасть с одной из прежних версий.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_cache_version(key):
+    """Сдвиг версии в кэше."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для списка и объекта, 304 без сериализации.
+
+    Вьюсет задаёт get_list_state() — пару из даты изменения и прочих
+    частей версии списка. Версия объекта — колонка object_state_field,
+    которая читается до загрузки объекта: 304 стоит одного запроса.
+    """
+
+    object_state_field = 'updated_at'
+
+    def conditional_response(self, request, state, respond):
+        """Ответ 304 или respond() с заголовками версии.
+
+        ETag слабый: он описывает версию данных, а не байты ответа, который
+        может быть сжат. Так 304 несёт тот же ETag, что и ответ 200.
+        """
+        last_modified, version = state
+        etag = 'W/' + quote_etag(hashlib.md5(
+            f'{last_modified}|{version}|'
+            f'{request.get_full_path()}|{request.accepted_media_type}'
+            .encode()).hexdigest())
+        timestamp = (int(last_modified.timestamp())
+                     if last_modified else None)
+        response = get_conditional_response(request, etag=etag,
+                                            last_modified=timestamp)
+        if response is None:
+            response = respond()
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """Список с проверкой версии."""
+        return self.conditional_response(
+            request, self.get_list_state(),
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs))
+
+    def get_object_state(self):
+        """Версия объекта без загрузки его полей и связей."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = (self.filter_queryset(self.get_queryset())
+                    .prefetch_related(None)
+                    .values_list(self.object_state_field, flat=True))
+        return get_object_or_404(queryset, **{
+            self.lookup_field: self.kwargs[lookup_url_kwarg]}), ''
+
+    def retrieve(self, request, *args, **kwargs):
+        """Объект с проверкой версии.
+
+        Без условных заголовков версия берётся из загруженного объекта,
+        чтобы не читать строку дважды.
+        """
+        if not any(header in request.headers for header in
+                   ('If-None-Match', 'If-Modified-Since')):
+            instance = self.get_object()
+            return self.conditional_response(
+                request,
+                (getattr(instance, self.object_state_field), ''),
+                lambda: Response(self.get_serializer(instance).data))
+        return self.conditional_response(
+            request, self.get_object_state(),
+            lambda: Response(self.get_serializer(self.get_object()).data))
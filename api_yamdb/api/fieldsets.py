@@ -0,0 +1,110 @@
+"""Выборочные поля ответа по параметрам ?fields= и ?omit=.
+
+Сериализатор отбрасывает лишние поля, а вьюсет по оставшимся полям
+решает, какие колонки читать и какие связи присоединять или
+подгружать отдельным запросом.
+"""
+
+from django.core.exceptions import FieldDoesNotExist  # type: ignore
+from rest_framework import serializers  # type: ignore
+from rest_framework.exceptions import ValidationError  # type: ignore
+from rest_framework.permissions import SAFE_METHODS  # type: ignore
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def parse_param(request, param):
+    value = request.query_params.get(param, '')
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_fieldset(request, available):
+    """Имена полей ответа; None, если ограничений нет.
+
+    Действует только на чтение: при записи все поля нужны для проверки
+    входных данных.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    params = {param: parse_param(request, param)
+              for param in (FIELDS_PARAM, OMIT_PARAM)}
+    if not any(params.values()):
+        return None
+    errors = {param: f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+              for param, names in params.items()
+              if (unknown := names - set(available))}
+    if errors:
+        raise ValidationError(errors)
+    selected = params[FIELDS_PARAM] or set(available)
+    return [name for name in available
+            if name in selected and name not in params[OMIT_PARAM]]
+
+
+class SparseFieldsetSerializerMixin:
+    """Сериализатор с полями, выбранными параметрами запроса."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fieldset = get_fieldset(self.context.get('request'), self.fields)
+        if fieldset is not None:
+            for name in set(self.fields) - set(fieldset):
+                self.fields.pop(name)
+
+
+def get_related_columns(field):
+    """Колонки связанной модели, которые читает поле сериализатора."""
+    if isinstance(field, serializers.BaseSerializer):
+        return [child.source for child in field.fields.values()
+                if child.source != '*']
+    if isinstance(field, serializers.SlugRelatedField):
+        return [field.slug_field]
+    return []
+
+
+def optimize_queryset(queryset, serializer, extra_columns=()):
+    """Чтение только тех колонок и связей, что нужны сериализатору."""
+    meta = queryset.model._meta
+    only = {meta.pk.name, *extra_columns}
+    select, prefetch = [], []
+    for field in serializer.fields.values():
+        try:
+            model_field = meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetch.append(field.source)
+            continue
+        only.add(field.source)
+        columns = get_related_columns(field)
+        if model_field.many_to_one and columns:
+            select.append(field.source)
+            only.update(f'{field.source}__{column}' for column in columns)
+    if select:
+        # Без аргументов select_related присоединил бы все связи.
+        queryset = queryset.select_related(*select)
+    return queryset.prefetch_related(*prefetch).only(*only)
+
+
+class SparseFieldsetViewMixin:
+    """Вьюсет, читающий из базы только запрошенные поля.
+
+    Колонки fieldset_columns и cursor_ordering читаются всегда: первые
+    нужны вьюсету, по вторым строится курсор.
+    """
+
+    fieldset_columns = ()
+
+    def get_fieldset_columns(self):
+        """Колонки, нужные независимо от полей ответа."""
+        return (*self.fieldset_columns,
+                *(name.lstrip('-')
+                  for name in getattr(self, 'cursor_ordering', ())))
+
+    def filter_queryset(self, queryset):
+        """Отбор с ограничением колонок и связей."""
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        return optimize_queryset(queryset, self.get_serializer(),
+                                 self.get_fieldset_columns())
@@ -1,8 +1,11 @@
 """Фильтры."""
 
 from django_filters import rest_framework as filters  # type: ignore
+from rest_framework.filters import (BaseFilterBackend,  # type: ignore
+                                    OrderingFilter)
 
 from reviews.models import Title
+from reviews.search import search
 
 
 class TitleFilter(filters.FilterSet):
@@ -16,3 +19,22 @@ class TitleFilter(filters.FilterSet):
     class Meta:
         model = Title
         fields = ('year',)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск по параметру ?q= с сортировкой по релевантности.
+
+    Явный ?ordering= важнее релевантности.
+    """
+
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        """Отбор и сортировка."""
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        queryset = search(queryset, query)
+        if request.query_params.get(OrderingFilter.ordering_param):
+            return queryset
+        return queryset.order_by('search_rank', 'pk')
@@ -0,0 +1,326 @@
+"""Нагрузочный прогон всех маршрутов API внутри процесса."""
+
+import json
+import time
+import tracemalloc
+from collections import namedtuple
+from itertools import count
+from pathlib import Path
+
+import numpy as np
+from django import get_version  # type: ignore
+from django.contrib.auth import get_user_model  # type: ignore
+from django.contrib.auth.tokens import default_token_generator  # type: ignore
+from django.core.management import call_command  # type: ignore
+from django.core.management.base import BaseCommand  # type: ignore
+from django.db import connection, models  # type: ignore
+from django.test.utils import (CaptureQueriesContext,  # type: ignore
+                               setup_databases, setup_test_environment,
+                               teardown_databases,
+                               teardown_test_environment)
+from django.utils import timezone  # type: ignore
+from rest_framework.test import APIClient  # type: ignore
+
+from api.authentication import get_access_token
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import Role
+
+User = get_user_model()
+
+Scenario = namedtuple('Scenario', ('name', 'client', 'method', 'prepare'))
+
+PERCENTILES = (50, 90, 99)
+
+
+def make_client(user=None):
+    """Клиент API с токеном пользователя."""
+    client = APIClient()
+    if user is not None:
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_access_token(user)}')
+    return client
+
+
+class BenchmarkData:
+    """Пользователи, объекты и подготовка запросов для сценариев.
+
+    Методы ``new_*`` и ``delete_*`` готовят уникальные данные для каждой
+    итерации вне замера и возвращают адрес и тело запроса.
+    """
+
+    def __init__(self, total):
+        self.numbers = count()
+        self.admin = User.objects.create_user(
+            username='bench-admin', email='bench-admin@yamdb.fake',
+            role=Role.ADMIN)
+        self.author = User.objects.create_user(
+            username='bench-author', email='bench-author@yamdb.fake')
+        self.category = Category.objects.first()
+        self.genre = Genre.objects.first()
+        self.title = Title.objects.order_by('-review_count').first()
+        self.review = (Review.objects.filter(title=self.title)
+                       .annotate(comment_count=models.Count('comments'))
+                       .order_by('-comment_count').first())
+        self.own_review = Review.objects.create(
+            title=Title.objects.exclude(reviews__author=self.author).first(),
+            author=self.author, text='Текст.', score=5)
+        self.own_comment = Comment.objects.create(
+            review=self.review, author=self.author, text='Текст.')
+        # Свободные для отзывов произведения: автор пишет с начала
+        # списка, администратор — с конца, пары не пересекаются.
+        title_ids = list(Title.objects.exclude(pk=self.own_review.title_id)
+                         .order_by('pk').values_list('pk', flat=True)
+                         [:2 * total])
+        self.author_titles = iter(title_ids[:total])
+        self.admin_titles = iter(title_ids[total:])
+        self.reviews_url = f'/api/v1/titles/{self.title.pk}/reviews/'
+        self.comments_url = (f'{self.reviews_url}{self.review.pk}/'
+                             'comments/')
+
+    def new_category(self):
+        return self.new_slug('/api/v1/categories/')
+
+    def new_genre(self):
+        return self.new_slug('/api/v1/genres/')
+
+    def new_slug(self, url):
+        number = next(self.numbers)
+        return url, {'name': f'Bench {number}', 'slug': f'bench-{number}'}
+
+    def delete_category(self):
+        return self.delete_slug(Category, '/api/v1/categories/')
+
+    def delete_genre(self):
+        return self.delete_slug(Genre, '/api/v1/genres/')
+
+    def delete_slug(self, model, url):
+        obj = model.objects.create(name='Bench',
+                                   slug=f'bench-{next(self.numbers)}')
+        return f'{url}{obj.slug}/', None
+
+    def new_user(self):
+        number = next(self.numbers)
+        return '/api/v1/users/', {'username': f'bench{number}',
+                                  'email': f'bench{number}@yamdb.fake'}
+
+    def delete_user(self):
+        number = next(self.numbers)
+        user = User.objects.create_user(username=f'bench{number}',
+                                        email=f'bench{number}@yamdb.fake')
+        return f'/api/v1/users/{user.username}/', None
+
+    def signup(self):
+        number = next(self.numbers)
+        return '/api/v1/auth/signup/', {'username': f'signup{number}',
+                                        'email': f'signup{number}@yamdb.fake'}
+
+    def token(self):
+        number = next(self.numbers)
+        user = User.objects.create_user(username=f'token{number}',
+                                        email=f'token{number}@yamdb.fake')
+        return '/api/v1/auth/token/', {
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user)}
+
+    def new_title(self):
+        return '/api/v1/titles/', {
+            'name': f'Bench {next(self.numbers)}', 'year': 2000,
+            'genre': [self.genre.slug], 'category': self.category.slug}
+
+    def delete_title(self):
+        obj = Title.objects.create(name='Bench', year=2000)
+        return f'/api/v1/titles/{obj.pk}/', None
+
+    def new_review(self):
+        return f'/api/v1/titles/{next(self.author_titles)}/reviews/', {
+            'text': 'Текст отзыва.', 'score': 7}
+
+    def delete_review(self):
+        obj = Review.objects.create(title_id=next(self.admin_titles),
+                                    author=self.admin, text='Текст.',
+                                    score=5)
+        return f'/api/v1/titles/{obj.title_id}/reviews/{obj.pk}/', None
+
+    def delete_comment(self):
+        obj = Comment.objects.create(review=self.review, author=self.admin,
+                                     text='Текст.')
+        return f'{self.comments_url}{obj.pk}/', None
+
+
+def fixed(url, data=None):
+    """Подготовка неизменного запроса."""
+    return lambda: (url, data)
+
+
+class Command(BaseCommand):
+    help = ('Прогоняет запросы ко всем маршрутам API на синтетических '
+            'данных и сохраняет задержки, число запросов к базе и '
+            'выделенную память в JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--iterations', type=int, default=50,
+                            help='Запросов на каждый сценарий.')
+        parser.add_argument('--memory-iterations', type=int, default=5,
+                            help='Запросов на замер памяти.')
+        parser.add_argument('--only', default='',
+                            help='Подстрока имени сценария.')
+        parser.add_argument('--output', type=Path,
+                            default=Path('benchmark.json'))
+
+    def handle(self, *args, **options):
+        """Прогон на временной тестовой базе."""
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            call_command(
+                'generate_data', users=options['users'],
+                titles=options['titles'], reviews=options['reviews'],
+                comments=options['comments'], seed=options['seed'],
+                stdout=self.stderr)
+            results = self.run_scenarios(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+        report = {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'django': get_version(),
+                'dataset': {name: options[name] for name in (
+                    'users', 'titles', 'reviews', 'comments', 'seed')},
+                'iterations': options['iterations'],
+            },
+            'results': results,
+        }
+        options['output'].write_text(
+            json.dumps(report, ensure_ascii=False, indent=2),
+            encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(
+            f'Результаты сохранены в {options["output"]}.'))
+
+    def run_scenarios(self, options):
+        """Замеры по всем сценариям."""
+        results = {}
+        for scenario in self.get_scenarios(options['iterations']
+                                           + options['memory_iterations']):
+            if options['only'] not in scenario.name:
+                continue
+            results[scenario.name] = self.measure(
+                scenario, options['iterations'],
+                options['memory_iterations'])
+            row = results[scenario.name]
+            self.stdout.write(
+                f'{scenario.name:<28} p50 {row["latency_ms"]["p50"]:8.2f} '
+                f'мс  p99 {row["latency_ms"]["p99"]:8.2f} мс  '
+                f'запросов {row["queries"]["mean"]:6.1f}  '
+                f'память {row["memory_kb"]["peak_mean"]:8.1f} КБ')
+        return results
+
+    def measure(self, scenario, iterations, memory_iterations):
+        """Задержка и число запросов, затем память отдельным проходом."""
+        latencies, queries, statuses = [], [], set()
+        for _ in range(iterations):
+            url, data = scenario.prepare()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = self.send(scenario, url, data)
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+            statuses.add(response.status_code)
+        peaks = []
+        for _ in range(memory_iterations):
+            url, data = scenario.prepare()
+            tracemalloc.start()
+            self.send(scenario, url, data)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+        return {
+            'statuses': sorted(statuses),
+            'latency_ms': dict(
+                {f'p{p}': float(np.percentile(latencies, p))
+                 for p in PERCENTILES},
+                mean=float(np.mean(latencies)),
+                max=float(np.max(latencies))),
+            'queries': {'mean': float(np.mean(queries)),
+                        'max': int(np.max(queries))},
+            'memory_kb': {'peak_mean': float(np.mean(peaks or [0])),
+                          'peak_max': float(np.max(peaks or [0]))},
+        }
+
+    def send(self, scenario, url, data):
+        method = getattr(scenario.client, scenario.method)
+        if data is None:
+            return method(url)
+        return method(url, data=data, format='json')
+
+    def get_scenarios(self, total):
+        """Сценарии для каждого маршрута router_v1 и auth/."""
+        data = BenchmarkData(total)
+        anonymous = make_client()
+        admin = make_client(data.admin)
+        author = make_client(data.author)
+        author_url = f'/api/v1/users/{data.author.username}/'
+        title_url = f'/api/v1/titles/{data.title.pk}/'
+        own_review_url = (f'/api/v1/titles/{data.own_review.title_id}/'
+                          f'reviews/{data.own_review.pk}/')
+        own_comment_url = f'{data.comments_url}{data.own_comment.pk}/'
+        return (
+            Scenario('auth:signup', anonymous, 'post', data.signup),
+            Scenario('auth:token', anonymous, 'post', data.token),
+            Scenario('categories:list', anonymous, 'get',
+                     fixed('/api/v1/categories/')),
+            Scenario('categories:search', anonymous, 'get',
+                     fixed('/api/v1/categories/?search=1')),
+            Scenario('categories:create', admin, 'post', data.new_category),
+            Scenario('categories:destroy', admin, 'delete',
+                     data.delete_category),
+            Scenario('genres:list', anonymous, 'get',
+                     fixed('/api/v1/genres/')),
+            Scenario('genres:search', anonymous, 'get',
+                     fixed('/api/v1/genres/?search=1')),
+            Scenario('genres:create', admin, 'post', data.new_genre),
+            Scenario('genres:destroy', admin, 'delete', data.delete_genre),
+            Scenario('users:list', admin, 'get', fixed('/api/v1/users/')),
+            Scenario('users:retrieve', admin, 'get', fixed(author_url)),
+            Scenario('users:create', admin, 'post', data.new_user),
+            Scenario('users:partial_update', admin, 'patch',
+                     fixed(author_url, {'bio': 'Био.'})),
+            Scenario('users:destroy', admin, 'delete', data.delete_user),
+            Scenario('users:me', author, 'get', fixed('/api/v1/users/me/')),
+            Scenario('users:me_update', author, 'patch',
+                     fixed('/api/v1/users/me/', {'bio': 'Био.'})),
+            Scenario('titles:list', anonymous, 'get',
+                     fixed('/api/v1/titles/')),
+            Scenario('titles:list_rating', anonymous, 'get',
+                     fixed('/api/v1/titles/?ordering=-rating')),
+            Scenario('titles:list_filtered', anonymous, 'get',
+                     fixed(f'/api/v1/titles/?genre={data.genre.slug}'
+                           f'&category={data.category.slug}')),
+            Scenario('titles:retrieve', anonymous, 'get', fixed(title_url)),
+            Scenario('titles:create', admin, 'post', data.new_title),
+            Scenario('titles:partial_update', admin, 'patch',
+                     fixed(title_url, {'description': 'Описание.'})),
+            Scenario('titles:destroy', admin, 'delete', data.delete_title),
+            Scenario('reviews:list', anonymous, 'get',
+                     fixed(data.reviews_url)),
+            Scenario('reviews:retrieve', anonymous, 'get',
+                     fixed(f'{data.reviews_url}{data.review.pk}/')),
+            Scenario('reviews:create', author, 'post', data.new_review),
+            Scenario('reviews:partial_update', author, 'patch',
+                     fixed(own_review_url, {'text': 'Правка.'})),
+            Scenario('reviews:destroy', admin, 'delete', data.delete_review),
+            Scenario('comments:list', anonymous, 'get',
+                     fixed(data.comments_url)),
+            Scenario('comments:retrieve', anonymous, 'get',
+                     fixed(own_comment_url)),
+            Scenario('comments:create', author, 'post',
+                     fixed(data.comments_url, {'text': 'Комментарий.'})),
+            Scenario('comments:partial_update', author, 'patch',
+                     fixed(own_comment_url, {'text': 'Правка.'})),
+            Scenario('comments:destroy', admin, 'delete',
+                     data.delete_comment),
+        )
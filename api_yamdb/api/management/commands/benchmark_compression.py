@@ -0,0 +1,71 @@
+"""Замер сжатия страниц API: размер против времени процессора."""
+
+import json
+import timeit
+import zlib
+from pathlib import Path
+
+from django.core.management.base import BaseCommand  # type: ignore
+
+from api.renderers import FastJSONRenderer
+from api_yamdb.middleware import compress, compress_sequence
+from .benchmark_json import load_pages
+
+LEVELS = range(1, 10)
+STREAM_CHUNK = 4096
+
+
+class Command(BaseCommand):
+    help = ('Сжимает страницы произведений и отзывов на каждом уровне gzip '
+            'и выводит размер, степень сжатия и время сжатия и распаковки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--number', type=int, default=100,
+                            help='Вызовов в одном замере.')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Замеров; берётся лучший.')
+        parser.add_argument('--output', type=Path)
+
+    def handle(self, *args, **options):
+        """Замеры по страницам и уровням."""
+        pages = load_pages(options['page_size'], self.stderr)
+        renderer = FastJSONRenderer()
+        results = {}
+        for name, data in pages.items():
+            body = renderer.render(data)
+            results[name] = {'bytes': len(body), 'levels': {}}
+            self.stdout.write(f'{name}: {len(body)} байт без сжатия')
+            for level in LEVELS:
+                row = self.measure(body, level, options['number'],
+                                   options['repeat'])
+                results[name]['levels'][level] = row
+                self.stdout.write(
+                    f'  уровень {level}  {row["bytes"]:7d} байт  '
+                    f'×{row["ratio"]:5.2f}  сжатие '
+                    f'{row["compress_us"]:8.1f} мкс  поток '
+                    f'{row["stream_bytes"]:7d} байт  распаковка '
+                    f'{row["decompress_us"]:7.1f} мкс')
+        if options['output']:
+            options['output'].write_text(json.dumps(results, indent=2),
+                                         encoding='utf-8')
+
+    def measure(self, body, level, number, repeat):
+        """Размер и лучшее время, мкс."""
+        def best(call):
+            return min(timeit.repeat(call, number=number,
+                                     repeat=repeat)) / number * 10 ** 6
+
+        compressed = compress(body, level)
+        # Поток из фрагментов: сброс после каждого стоит нескольких байт.
+        chunks = [body[start:start + STREAM_CHUNK]
+                  for start in range(0, len(body), STREAM_CHUNK)]
+        stream = b''.join(compress_sequence(chunks, level))
+        return {
+            'bytes': len(compressed),
+            'ratio': len(body) / len(compressed),
+            'compress_us': best(lambda: compress(body, level)),
+            'stream_bytes': len(stream),
+            'decompress_us': best(
+                lambda: zlib.decompress(compressed, zlib.MAX_WBITS | 16)),
+        }
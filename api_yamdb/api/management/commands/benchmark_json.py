@@ -0,0 +1,109 @@
+"""Микробенчмарк отрисовки и разбора JSON на страницах API."""
+
+import io
+import json
+import timeit
+from collections import OrderedDict
+from pathlib import Path
+
+from django.core.management import call_command  # type: ignore
+from django.core.management.base import BaseCommand  # type: ignore
+from django.db import models  # type: ignore
+from django.test.utils import (setup_databases,  # type: ignore
+                               teardown_databases)
+from rest_framework.parsers import JSONParser  # type: ignore
+from rest_framework.renderers import JSONRenderer  # type: ignore
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from api.serializers import ReviewSerializer, TitleReadSerializer
+from reviews.models import Review, Title
+
+RENDERERS = (('drf', JSONRenderer()), ('fast', FastJSONRenderer()))
+PARSERS = (('drf', JSONParser()), ('fast', FastJSONParser()))
+
+
+def paginated(results):
+    """Страница в формате PageNumberPagination."""
+    return OrderedDict((('count', len(results) * 10),
+                        ('next', 'http://testserver/api/v1/?page=2'),
+                        ('previous', None),
+                        ('results', results)))
+
+
+def get_pages(size):
+    """Данные страниц списков после сериализаторов."""
+    titles = (Title.objects.select_related('category')
+              .prefetch_related('genre').order_by('name')[:size])
+    title = (Title.objects.annotate(count=models.Count('reviews'))
+             .order_by('-count').first())
+    reviews = (Review.objects.filter(title=title)
+               .select_related('author')[:size])
+    return {
+        'titles': paginated(TitleReadSerializer(titles, many=True).data),
+        'reviews': paginated(ReviewSerializer(reviews, many=True).data),
+    }
+
+
+def load_pages(size, stderr):
+    """Страницы из синтетических данных на временной базе."""
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        call_command('generate_data', users=size, titles=size,
+                     reviews=size * size, comments=0, stdout=stderr)
+        return get_pages(size)
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает JSONRenderer/JSONParser DRF с FastJSONRenderer/'
+            'FastJSONParser на страницах произведений и отзывов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--number', type=int, default=200,
+                            help='Вызовов в одном замере.')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Замеров; берётся лучший.')
+        parser.add_argument('--output', type=Path)
+
+    def handle(self, *args, **options):
+        """Подготовка страниц на временной базе и замеры."""
+        pages = load_pages(options['page_size'], self.stderr)
+        results = {name: self.measure(data, options['number'],
+                                      options['repeat'])
+                   for name, data in pages.items()}
+        for name, row in results.items():
+            self.stdout.write(
+                f'{name:<8} {row["bytes"]:8d} байт  '
+                f'отрисовка {row["render_us"]["drf"]:9.1f} → '
+                f'{row["render_us"]["fast"]:8.1f} мкс  '
+                f'разбор {row["parse_us"]["drf"]:9.1f} → '
+                f'{row["parse_us"]["fast"]:8.1f} мкс')
+        if options['output']:
+            options['output'].write_text(json.dumps(results, indent=2),
+                                         encoding='utf-8')
+
+    def measure(self, data, number, repeat):
+        """Лучшее время вызова, мкс, и проверка совпадения вывода."""
+        rendered = {name: renderer.render(data)
+                    for name, renderer in RENDERERS}
+        if rendered['drf'] != rendered['fast']:
+            self.stderr.write(self.style.ERROR(
+                'Вывод FastJSONRenderer отличается от JSONRenderer.'))
+        body = rendered['drf']
+
+        def best(call):
+            return min(timeit.repeat(call, number=number,
+                                     repeat=repeat)) / number * 10 ** 6
+
+        return {
+            'bytes': len(body),
+            'identical': rendered['drf'] == rendered['fast'],
+            'render_us': {name: best(lambda: renderer.render(data))
+                          for name, renderer in RENDERERS},
+            'parse_us': {
+                name: best(lambda: parser.parse(io.BytesIO(body)))
+                for name, parser in PARSERS},
+        }
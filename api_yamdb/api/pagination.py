@@ -0,0 +1,164 @@
+"""Пагинация."""
+
+import json
+import operator
+from functools import reduce
+
+from django.core.exceptions import ValidationError  # type: ignore
+from django.db.models import Q  # type: ignore
+from rest_framework.exceptions import NotFound  # type: ignore
+from rest_framework.pagination import (Cursor,  # type: ignore
+                                       CursorPagination,
+                                       PageNumberPagination)
+
+
+class KeysetPagination(CursorPagination):
+    """Курсорная пагинация по составному ключу cursor_ordering вьюсета.
+
+    CursorPagination кладёт в курсор только первое поле порядка и
+    досчитывает строки с равным значением смещением, поэтому при равных
+    ``pub_date`` новые строки сдвигают страницы. Здесь курсор хранит все
+    поля ключа крайней строки страницы, а страница отбирается условием
+    «ключ строго после курсора». Порядок должен быть однозначным:
+    последним полем идёт ``id``.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        """Порядок ключа курсора."""
+        return view.cursor_ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Страница после курсора или перед ним."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        position = self.decode_position(queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_after(position, reverse))
+        results = list(queryset.order_by(*(
+            self.get_reversed_ordering() if reverse else self.ordering))
+            [:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        self.display_page_controls = self.has_previous or self.has_next
+        self.position = position
+        return self.page
+
+    def get_reversed_ordering(self):
+        return [name[1:] if name.startswith('-') else f'-{name}'
+                for name in self.ordering]
+
+    def get_after(self, position, reverse):
+        """Условие «ключ строки после position» в порядке выборки."""
+        conditions, equal = [], Q()
+        for name, value in zip(self.ordering, position):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') != reverse else 'gt'
+            conditions.append(equal & Q(**{f'{field}__{lookup}': value}))
+            equal &= Q(**{field: value})
+        return reduce(operator.or_, conditions)
+
+    def decode_position(self, model):
+        """Значения ключа из курсора, приведённые к типам полей."""
+        if self.cursor is None:
+            return None
+        try:
+            position = json.loads(self.cursor.position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list)
+                or len(position) != len(self.ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [
+                model._meta.get_field(name.lstrip('-')).to_python(value)
+                for name, value in zip(self.ordering, position)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_position(self, row):
+        """Значения ключа строки: словаря из .values() или объекта."""
+        position = []
+        for name in self.ordering:
+            field = name.lstrip('-')
+            value = (row[field] if isinstance(row, dict)
+                     else getattr(row, field))
+            position.append(value.isoformat()
+                            if hasattr(value, 'isoformat') else value)
+        return position
+
+    def get_link(self, row, reverse):
+        position = (self.get_position(row) if row is not None
+                    else self.position)
+        return self.encode_cursor(Cursor(
+            offset=0, reverse=reverse,
+            position=json.dumps(position, ensure_ascii=False)))
+
+    def get_next_link(self):
+        """Курсор после последней строки страницы."""
+        if not self.has_next:
+            return None
+        return self.get_link(self.page[-1] if self.page else None, False)
+
+    def get_previous_link(self):
+        """Курсор перед первой строкой страницы."""
+        if not self.has_previous:
+            return None
+        return self.get_link(self.page[0] if self.page else None, True)
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    """Постраничная пагинация с курсорным режимом по запросу.
+
+    Курсорный режим включается параметром ``?pagination=cursor`` или
+    наличием ``?cursor=`` и доступен вьюсетам с атрибутом
+    ``cursor_ordering``. Ответ содержит ``next``, ``previous`` и
+    ``results``, но без ``count``: страница N стоит столько же, сколько
+    первая.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def is_cursor_mode(self, request, view):
+        """Запрошен ли курсорный режим."""
+        if not getattr(view, 'cursor_ordering', None):
+            return False
+        return (request.query_params.get(self.mode_query_param)
+                == self.cursor_mode
+                or KeysetPagination.cursor_query_param
+                in request.query_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Выбор режима пагинации."""
+        if self.is_cursor_mode(request, view):
+            self.cursor_paginator = KeysetPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        """Ответ в формате выбранного режима."""
+        if self.cursor_paginator:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        """Навигация для browsable API."""
+        if self.cursor_paginator:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
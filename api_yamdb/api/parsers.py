@@ -0,0 +1,30 @@
+"""Разбор тела запросов."""
+
+import codecs
+import io
+
+import orjson  # type: ignore
+from django.conf import settings  # type: ignore
+from rest_framework.parsers import JSONParser  # type: ignore
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser на orjson.
+
+    Тело в кодировке, отличной от UTF-8, и тело, которое orjson не принял,
+    разбирает родительский класс, поэтому ошибки остаются прежними.
+    Целые длиннее 64 бит orjson читает как float; поля API такие значения
+    отклоняют и в том, и в другом виде.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Разбор тела запроса."""
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        body = stream.read()
+        if codecs.lookup(encoding).name == 'utf-8':
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -2,13 +2,18 @@
 
 from rest_framework import serializers  # type: ignore
 from rest_framework.relations import SlugRelatedField  # type: ignore
+from rest_framework.settings import api_settings  # type: ignore
 from django.contrib.auth import get_user_model  # type: ignore
 from django.shortcuts import get_object_or_404  # type: ignore
 from django.contrib.auth.tokens import default_token_generator  # type: ignore
+from django.db import IntegrityError, transaction  # type: ignore
 
-from reviews.models import Category, Genre, Title, Review, Comment
+from reviews.models import (Category, Genre, Title, TitleRanking, Review,
+                            Comment, SimilarTitle)
+from reviews.rankings import ORDERINGS
 from users.models import (validate_username as models_validate_username,
                           validate_email as models_validate_email)
+from .fieldsets import SparseFieldsetSerializerMixin
 
 User = get_user_model()
 
@@ -61,14 +66,37 @@ class TitleWriteSerializer(serializers.ModelSerializer):
                 .to_representation(instance))
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleBulkItemSerializer(serializers.ModelSerializer):
+    """Произведение в пакетной записи.
+
+    Слаги только проверяются на формат: жанры и категории всего пакета
+    ищутся в базе разом, см. api/bulk.py. С id — изменение произведения.
+    """
+
+    id = serializers.IntegerField(required=False)
+    genre = serializers.ListField(child=serializers.SlugField(),
+                                  allow_empty=False)
+    category = serializers.SlugField()
+
+    class Meta:
+        model = Title
+        fields = ('id',
+                  'name',
+                  'year',
+                  'description',
+                  'genre',
+                  'category')
+
+
+class TitleReadSerializer(SparseFieldsetSerializerMixin,
+                          serializers.ModelSerializer):
     """Сериализатор произведений на чтение."""
 
     category = CategorySerializer()
     genre = GenreSerializer(
         many=True,
     )
-    rating = serializers.IntegerField(allow_null=True)
+    rating = serializers.IntegerField(allow_null=True, read_only=True)
 
     class Meta:
         model = Title
@@ -81,7 +109,71 @@ class TitleReadSerializer(serializers.ModelSerializer):
                   'category')
 
 
-class AuthorSerializer(serializers.ModelSerializer):
+class LeaderboardParamsSerializer(serializers.Serializer):
+    """Параметры рейтинга лучших произведений."""
+
+    by = serializers.ChoiceField(choices=tuple(ORDERINGS), default='rating')
+    category = serializers.SlugField(required=False)
+    genre = serializers.SlugField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+    def validate(self, data_to_validate):
+        """Рейтинг общий, категории или жанра."""
+        if 'category' in data_to_validate and 'genre' in data_to_validate:
+            raise serializers.ValidationError(
+                'Укажите категорию или жанр, но не оба.')
+        return data_to_validate
+
+
+class LeaderboardSerializer(serializers.ModelSerializer):
+    """Строка рейтинга лучших произведений."""
+
+    id = serializers.IntegerField(source='title_id')
+    name = serializers.CharField(source='title.name')
+    year = serializers.IntegerField(source='title.year')
+    category = SlugRelatedField(slug_field='slug', read_only=True)
+    rating = serializers.IntegerField(source='title.rating', allow_null=True)
+
+    class Meta:
+        model = TitleRanking
+        fields = ('id',
+                  'name',
+                  'year',
+                  'category',
+                  'rating',
+                  'review_count',
+                  'score')
+
+
+class SimilarTitleParamsSerializer(serializers.Serializer):
+    """Параметры похожих произведений."""
+
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class SimilarTitleSerializer(serializers.ModelSerializer):
+    """Похожее произведение."""
+
+    id = serializers.IntegerField(source='similar_id')
+    name = serializers.CharField(source='similar.name')
+    year = serializers.IntegerField(source='similar.year')
+    category = SlugRelatedField(source='similar.category', slug_field='slug',
+                                read_only=True)
+    rating = serializers.IntegerField(source='similar.rating',
+                                      allow_null=True)
+
+    class Meta:
+        model = SimilarTitle
+        fields = ('id',
+                  'name',
+                  'year',
+                  'category',
+                  'rating',
+                  'score')
+
+
+class AuthorSerializer(SparseFieldsetSerializerMixin,
+                       serializers.ModelSerializer):
     """Сериализатор с полем автора."""
 
     author = SlugRelatedField(
@@ -104,23 +196,24 @@ class ReviewSerializer(AuthorSerializer):
                   'score',
                   'pub_date')
 
-    def validate(self, data_to_validate):
-        """Проверка единственности отзыва."""
-        view = self.context.get('view')
-        if not view:
-            raise serializers.ValidationError('Нет view.')
-        if not view.action == 'create':
-            return data_to_validate
-        title_id = view.kwargs.get('title_id')
-        if not title_id:
-            raise serializers.ValidationError('Не указано произведение.')
-        request = self.context.get('request')
-        if not request:
-            raise serializers.ValidationError('Нет данных запроса.')
-        if request.user.reviews.filter(title=title_id).exists():
-            raise serializers.ValidationError(
-                'Допустим только один обзор на произведение.')
-        return data_to_validate
+    def create(self, validated_data):
+        """Создание обзора с проверкой единственности в базе.
+
+        Отдельный запрос на существование не защищает от двух
+        одновременных запросов, поэтому решает ограничение
+        unique_title_author, а его нарушение становится ошибкой 400.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                    title=validated_data['title'],
+                    author=validated_data['author']).exists():
+                raise
+        raise serializers.ValidationError(
+            {api_settings.NON_FIELD_ERRORS_KEY: [
+                'Допустим только один обзор на произведение.']})
 
 
 class CommentSerializer(AuthorSerializer):
@@ -146,7 +239,8 @@ class UsernameEmailValidationSerializer:
         return models_validate_email(email)
 
 
-class UserSerializer(UsernameEmailValidationSerializer,
+class UserSerializer(SparseFieldsetSerializerMixin,
+                     UsernameEmailValidationSerializer,
                      serializers.ModelSerializer):
     """Сериализатор пользователей."""
 
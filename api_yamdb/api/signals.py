@@ -0,0 +1,56 @@
+"""Сигналы: права для выданных токенов, версии списков и имён авторов."""
+
+from django.contrib.auth import get_user_model  # type: ignore
+from django.db.models.signals import post_delete, post_save  # type: ignore
+from django.dispatch import receiver  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from api_yamdb.db import add_on_commit
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            bulk_changed)
+from users.models import forget_token_versions
+from .conditional import bump_cache_version, get_list_version_key
+
+User = get_user_model()
+
+# Наборы со списком в кэше, см. CachedListMixin.
+CACHED_LISTS = {Category: 'categories', Genre: 'genres'}
+
+
+@receiver(post_delete, sender=User)
+def revoke_user_tokens(sender, instance, **kwargs):
+    """Токены удалённого пользователя больше не действуют."""
+    forget_token_versions((instance.pk,))
+
+
+@receiver(post_save, sender=User)
+def touch_author_texts(sender, instance, created, **kwargs):
+    """Новый логин автора: новые версии его текстов и их списков."""
+    loaded = getattr(instance, '_loaded_username', None)
+    instance.remember_username()
+    if created or loaded in (None, instance.username):
+        return
+    now = timezone.now()
+    Review.objects.filter(author=instance).update(updated_at=now)
+    Comment.objects.filter(author=instance).update(updated_at=now)
+    Title.objects.filter(reviews__author=instance).touch_reviews()
+    Review.objects.filter(comments__author=instance).update(
+        comments_updated_at=now)
+
+
+@receiver((post_save, post_delete, bulk_changed), sender=Category)
+@receiver((post_save, post_delete, bulk_changed), sender=Genre)
+def invalidate_list_cache(sender, **kwargs):
+    """Изменение из API, админки или массовое: кэш списка устарел.
+
+    Версия сдвигается после фиксации: иначе параллельный запрос успел бы
+    положить в кэш под новой версией ещё старые строки.
+    """
+    add_on_commit('list_cache_versions',
+                  [get_list_version_key(CACHED_LISTS[sender])],
+                  bump_cache_versions)
+
+
+def bump_cache_versions(keys):
+    for key in keys:
+        bump_cache_version(key)
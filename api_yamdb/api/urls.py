@@ -1,11 +1,11 @@
 """Адреса API."""
 
-from django.urls import include, path  # type: ignore
+from django.urls import include, path, re_path  # type: ignore
 from rest_framework import routers  # type: ignore
-from .views import (CategoryViewSet, GenreViewSet,
+from .views import (CategoryViewSet, ExportView, GenreViewSet,
                     ReviewViewSet, CommentViewSet, TitleViewSet,
-                    get_jwt_token, send_confirmation_code,
-                    UserViewSet)
+                    db_stats, get_jwt_token, metrics_view,
+                    send_confirmation_code, UserViewSet)
 
 app_name: str = 'api'
 
@@ -27,6 +27,10 @@ v1_auth_patterns = [
 
 v1_patterns: list[path] = [
     path('auth/', include(v1_auth_patterns)),
+    path('db-stats/', db_stats, name='db_stats'),
+    path('metrics/', metrics_view, name='metrics'),
+    re_path(r'^export/(?P<name>titles|reviews)\.(?P<file_format>ndjson|csv)$',
+            ExportView.as_view(), name='export'),
     path('', include(router_v1.urls)),
 ]
 
@@ -1,25 +1,38 @@
 """Контроллеры."""
 
+import hashlib
+
 from rest_framework import viewsets, filters, status  # type: ignore
 from django.shortcuts import get_object_or_404  # type: ignore
 from django.contrib.auth import get_user_model  # type: ignore
 from django_filters.rest_framework import DjangoFilterBackend  # type: ignore
 from django.contrib.auth.tokens import default_token_generator  # type: ignore
-from django.core.mail import send_mail  # type: ignore
 from rest_framework.decorators import (  # type: ignore
     api_view, permission_classes)
 from rest_framework.permissions import (AllowAny,  # type: ignore
                                         IsAuthenticated)
+from rest_framework.exceptions import ValidationError  # type: ignore
 from rest_framework.response import Response  # type: ignore
-from rest_framework_simplejwt.tokens import AccessToken  # type: ignore
+from rest_framework.settings import api_settings  # type: ignore
+from rest_framework.views import APIView  # type: ignore
 from django.conf import settings  # type: ignore
-from django.http import JsonResponse  # type: ignore
-from django.db import models  # type: ignore
+from django.http import (HttpResponse, JsonResponse,  # type: ignore
+                         StreamingHttpResponse)
+from django.core.cache import cache  # type: ignore
 from rest_framework.decorators import action  # type: ignore
 
-from reviews.models import Category, Genre, Title, Review, Comment
+from api_yamdb import metrics
+from api_yamdb.db import get_db_metrics
+from reviews.constants import TITLES_LIST_VERSION
+from reviews.models import (Category, Genre, Title, Review, Comment,
+                            ListVersion, SimilarTitle)
+from reviews.rankings import get_leaderboard
+from users.models import OutgoingEmail
 from .serializers import (CategorySerializer, GenreSerializer,
                           TitleReadSerializer, TitleWriteSerializer,
+                          LeaderboardParamsSerializer, LeaderboardSerializer,
+                          SimilarTitleParamsSerializer,
+                          SimilarTitleSerializer,
                           ReviewSerializer, CommentSerializer)
 from .serializers import (UserGetOrCreationSerializer,
                           ConfirmationCodeSerializer,
@@ -28,7 +41,14 @@ from .serializers import (UserGetOrCreationSerializer,
 from .permissions import (AdminOrReadOnlyPermission, TextPermission,
                           AdminOnlyPermission, NotUserModeratorPermission,
                           ForbiddenPermission)
-from .filters import TitleFilter
+from .filters import FullTextSearchFilter, TitleFilter
+from .authentication import get_access_token, get_full_user
+from .fieldsets import SparseFieldsetViewMixin
+from .values import ValuesListMixin
+from .bulk import TitleBulkWriter
+from .export import EXPORTS, FORMATS, IgnoreClientContentNegotiation
+from .conditional import (ConditionalGetMixin, get_cache_version,
+                          get_list_version_key)
 
 User = get_user_model()
 
@@ -45,14 +65,57 @@ class OrderingMixin:
     ordering = ('name',)
 
 
-class BaseTextViewSet(HttpNoPUTMethodsMixin, viewsets.ModelViewSet):
-    """Базовый вьюсет для текстов обзоров и комментариев."""
+class CachedListMixin:
+    """Миксин кэширования списка с инвалидацией при изменениях.
+
+    Ключ списка включает версию набора, которую сдвигают сигналы моделей
+    (см. api/signals.py): старые записи просто перестают читаться и
+    истекают сами. Между процессами версия согласована только с общим
+    кэшем.
+    """
+
+    def get_list_cache_timeout(self):
+        """Срок жизни списка в кэше."""
+        return settings.LIST_CACHE_TIMEOUT
+
+    def get_list_cache_version(self):
+        """Текущая версия набора."""
+        return get_cache_version(get_list_version_key(self.basename))
+
+    def get_list_cache_key(self, request):
+        """Ключ списка с учётом параметров запроса."""
+        url_hash = hashlib.md5(
+            request.build_absolute_uri().encode()).hexdigest()
+        return (f'list:{self.basename}:{self.get_list_cache_version()}:'
+                f'{url_hash}')
+
+    def list(self, request, *args, **kwargs):
+        """Список из кэша."""
+        key = self.get_list_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, self.get_list_cache_timeout())
+        return response
+
+
+class BaseTextViewSet(HttpNoPUTMethodsMixin, ConditionalGetMixin,
+                      ValuesListMixin, SparseFieldsetViewMixin,
+                      viewsets.ModelViewSet):
+    """Базовый вьюсет для текстов обзоров и комментариев.
+
+    Списки читаются через .values(), остальные действия — через
+    сериализатор.
+    """
 
     permission_classes = (TextPermission,)
     ordering = ('-pub_date',)
+    cursor_ordering = ('-pub_date', '-id')
 
 
-class BaseTagViewset(HttpNoPUTMethodsMixin, OrderingMixin,
+class BaseTagViewset(HttpNoPUTMethodsMixin, OrderingMixin, CachedListMixin,
                      viewsets.ModelViewSet):
     """Базовый вьюсет для категорий и жанров."""
 
@@ -89,13 +152,18 @@ class GenreViewSet(BaseTagViewset):
 
 class TitleViewSet(HttpNoPUTMethodsMixin,
                    OrderingMixin,
+                   ConditionalGetMixin,
+                   SparseFieldsetViewMixin,
                    viewsets.ModelViewSet):
     """Обработка произведений."""
 
     permission_classes = (AdminOrReadOnlyPermission,)
-    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
+    filter_backends = (DjangoFilterBackend, filters.OrderingFilter,
+                       FullTextSearchFilter)
     filterset_class = TitleFilter
     ordering_fields = ('name', 'year', 'rating')
+    cursor_ordering = ('name', 'id')
+    fieldset_columns = ('updated_at',)
 
     def get_serializer_class(self):
         """Выбор сериализатора."""
@@ -105,17 +173,68 @@ class TitleViewSet(HttpNoPUTMethodsMixin,
 
     def get_queryset(self):
         """Набор произведений."""
-        if self.action in {'list', 'retrieve'}:
-            return Title.objects.annotate(
-                rating=models.Avg('reviews__score')
-            )
+        # Рейтинг хранится в Title и поддерживается сигналами отзывов.
+        # Категория и жанры подгружаются по полям ответа
+        # в SparseFieldsetViewMixin.
         return Title.objects.all()
 
+    def get_list_state(self):
+        """Версия всех произведений, сдвигается и при удалении."""
+        return ListVersion.objects.get_state(TITLES_LIST_VERSION)
+
+    @action(detail=False, url_path='top')
+    def top(self, request):
+        """Лучшие произведения: по оценке или числу отзывов."""
+        params = LeaderboardParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        rankings = get_leaderboard(
+            data['by'], data['limit'],
+            category=(get_object_or_404(Category, slug=data['category'])
+                      if 'category' in data else None),
+            genre=(get_object_or_404(Genre, slug=data['genre'])
+                   if 'genre' in data else None))
+        return Response(LeaderboardSerializer(rankings, many=True).data)
+
+    @action(detail=True)
+    def similar(self, request, pk=None):
+        """Похожие произведения по оценкам пользователей.
+
+        Соседи пересчитываются командой build_similar_titles: новые
+        отзывы не влияют на ответ до следующего пересчёта.
+        """
+        params = SimilarTitleParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        title = get_object_or_404(Title.objects.only('pk'), pk=pk)
+        similar = (SimilarTitle.objects.filter(title=title)
+                   .select_related('similar__category')
+                   .order_by('-score', 'similar')
+                   [:params.validated_data['limit']])
+        return Response(SimilarTitleSerializer(similar, many=True).data)
+
+    @action(detail=False, methods=('post',),
+            permission_classes=(AdminOnlyPermission,))
+    def bulk(self, request):
+        """Пакетное создание и изменение произведений."""
+        writer = TitleBulkWriter(request.data)
+        if not writer.is_valid():
+            return Response({'errors': writer.errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+        ids = writer.save()
+        titles = (Title.objects.select_related('category')
+                  .prefetch_related('genre').in_bulk(ids))
+        return Response(
+            TitleReadSerializer([titles[pk] for pk in ids], many=True).data,
+            status=(status.HTTP_201_CREATED if writer.created
+                    else status.HTTP_200_OK))
+
 
 class ReviewViewSet(BaseTextViewSet):
     """Обработка обзоров."""
 
     serializer_class = ReviewSerializer
+    filter_backends = (FullTextSearchFilter,)
+    fieldset_columns = ('updated_at',)
 
     def perform_create(self, serializer):
         """Создание обзора."""
@@ -123,19 +242,30 @@ class ReviewViewSet(BaseTextViewSet):
                         title=self.get_title())
 
     def get_title(self):
-        """Получение произведения."""
-        title_id = self.kwargs.get('title_id')
-        return get_object_or_404(Title, id=title_id)
+        """Получение произведения, один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id'))
+        return self._title
 
     def get_queryset(self):
-        """Выбор обзоров."""
-        return self.get_title().reviews.all()
+        """Выбор обзоров.
+
+        Фильтр по title_id без отдельного запроса произведения: у обзора
+        по чужому произведению 404 даёт тот же запрос.
+        """
+        return Review.objects.filter(title_id=self.kwargs.get('title_id'))
+
+    def get_list_state(self):
+        """Версия отзывов произведения."""
+        return self.get_title().reviews_updated_at, ''
 
 
 class CommentViewSet(BaseTextViewSet):
     """Обработка комментариев."""
 
     serializer_class = CommentSerializer
+    fieldset_columns = ('updated_at',)
 
     def perform_create(self, serializer):
         """Создание поста."""
@@ -143,15 +273,28 @@ class CommentViewSet(BaseTextViewSet):
                         review=self.get_review())
 
     def get_review(self):
-        """Получение отзыва."""
-        review_id = self.kwargs.get('review_id')
-        title_id = self.kwargs.get('title_id')
-        return get_object_or_404(Review, id=review_id,
-                                 title=title_id)
+        """Получение отзыва, один раз за запрос."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review, id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'))
+        return self._review
 
     def get_queryset(self):
-        """Выбор комментариев."""
-        return self.get_review().comments.all()
+        """Выбор комментариев.
+
+        Если отзыв уже получен, фильтр по его id; иначе отзыв и
+        произведение проверяются соединением в том же запросе.
+        """
+        if hasattr(self, '_review'):
+            return Comment.objects.filter(review_id=self._review.pk)
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'))
+
+    def get_list_state(self):
+        """Версия комментариев отзыва."""
+        return self.get_review().comments_updated_at, ''
 
 
 @api_view(('POST',))
@@ -159,6 +302,7 @@ class CommentViewSet(BaseTextViewSet):
 def send_confirmation_code(request):
     serializer = UserGetOrCreationSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
+    metrics.registry.inc('yamdb_auth_signups_total')
 
     email = serializer.validated_data.get('email')
     username = serializer.validated_data.get('username')
@@ -168,12 +312,12 @@ def send_confirmation_code(request):
 
     confirmation_code = default_token_generator.make_token(user)
 
-    send_mail(
-        'Код подтверждения',
-        f'Ваш код подтверждения: {confirmation_code}',
-        settings.DEFAULT_FROM_EMAIL,
-        (email,),
-        fail_silently=False
+    # Письмо отправит команда send_emails, запрос его не ждёт.
+    OutgoingEmail.objects.create(
+        subject='Код подтверждения',
+        body=f'Ваш код подтверждения: {confirmation_code}',
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=email,
     )
 
     return Response(serializer.validated_data)
@@ -183,23 +327,61 @@ def send_confirmation_code(request):
 @permission_classes((AllowAny,))
 def get_jwt_token(request):
     serializer = ConfirmationCodeSerializer(data=request.data)
-    serializer.is_valid(raise_exception=True)
+    if not serializer.is_valid():
+        # Неверный код — ошибка всего сериализатора, а не поля.
+        if api_settings.NON_FIELD_ERRORS_KEY in serializer.errors:
+            metrics.registry.inc('yamdb_auth_confirmation_failures_total')
+        raise ValidationError(serializer.errors)
 
     username = serializer.validated_data.get('username')
     user = get_object_or_404(User, username=username)
-    token = AccessToken.for_user(user)
+    token = get_access_token(user)
+    metrics.registry.inc('yamdb_auth_tokens_issued_total')
     return Response(
         {'token': str(token)}
     )
 
 
+@api_view(('GET',))
+@permission_classes((AdminOnlyPermission,))
+def db_stats(request):
+    """Метрики соединений с базой для подбора числа воркеров."""
+    return Response(get_db_metrics())
+
+
+@api_view(('GET',))
+@permission_classes((AdminOnlyPermission,))
+def metrics_view(request):
+    """Метрики запросов и соединений в текстовом формате Prometheus."""
+    return HttpResponse(metrics.registry.render(),
+                        content_type=metrics.CONTENT_TYPE)
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка всех произведений или отзывов."""
+
+    permission_classes = (AdminOnlyPermission,)
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    def get(self, request, name, file_format):
+        """Выгрузка name в формате file_format."""
+        rows, fields = EXPORTS[name]
+        render, content_type = FORMATS[file_format]
+        response = StreamingHttpResponse(render(rows(), fields),
+                                         content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{name}.{file_format}"')
+        return response
+
+
 def page_not_found(request, exception) -> JsonResponse:
     """Ошибка 404: Объект не найден."""
     return JsonResponse({'message': 'Объект не найден.'},
                         status=status.HTTP_404_NOT_FOUND)
 
 
-class UserViewSet(HttpNoPUTMethodsMixin, viewsets.ModelViewSet):
+class UserViewSet(HttpNoPUTMethodsMixin, SparseFieldsetViewMixin,
+                  viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (AdminOnlyPermission,)
@@ -213,7 +395,7 @@ class UserViewSet(HttpNoPUTMethodsMixin, viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,)
     )
     def me(self, request):
-        user = request.user
+        user = get_full_user(request.user)
         serializer = self.get_serializer(user, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -221,7 +403,7 @@ class UserViewSet(HttpNoPUTMethodsMixin, viewsets.ModelViewSet):
 
     @me.mapping.get
     def get_me(self, request):
-        user = request.user
+        user = get_full_user(request.user)
         serializer = self.get_serializer(user)
         return Response(serializer.data)
 
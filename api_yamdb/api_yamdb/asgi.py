@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application  # type: ignore
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+# Под ASGI соединения с базой берутся из общего пула (api_yamdb.db).
+os.environ.setdefault('YAMDB_DB_POOL', '1')
 
 application = get_asgi_application()
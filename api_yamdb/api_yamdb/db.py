@@ -0,0 +1,277 @@
+"""Повторное использование соединений с базой и их метрики.
+
+Под WSGI каждый поток держит своё соединение не дольше CONN_MAX_AGE;
+перед началом запроса соединение, простоявшее дольше DB_HEALTH_CHECK_IDLE
+секунд, проверяется и при неисправности закрывается. Под ASGI (asgi.py)
+движок базы заменяется на пулящий: соединение берётся из общего пула при
+первом запросе к базе и возвращается туда при закрытии в конце запроса.
+Пул ограничен DB_POOL_SIZE соединениями, а каждое живёт не дольше
+DB_CONNECTION_MAX_AGE секунд.
+
+Сигналы моделей откладывают работу до фиксации транзакции пакетами
+add_on_commit: значения копятся на соединении, и действие выполняется
+один раз на транзакцию.
+"""
+
+import threading
+import time
+from collections import deque
+
+from django.conf import settings  # type: ignore
+from django.core.signals import (request_finished,  # type: ignore
+                                 request_started)
+from django.db import connections, transaction  # type: ignore
+from django.db.backends.signals import connection_created  # type: ignore
+from django.db.utils import OperationalError  # type: ignore
+from django.dispatch import receiver  # type: ignore
+
+METRICS = ('opened', 'closed', 'reused', 'reconnects', 'expired',
+           'checkouts', 'checkins', 'waits', 'timeouts')
+
+
+class Metrics:
+    """Потокобезопасные счётчики соединений."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters = dict.fromkeys(METRICS, 0)
+            self.wait_seconds = 0.0
+
+    def add(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def add_wait(self, seconds):
+        with self.lock:
+            self.counters['waits'] += 1
+            self.wait_seconds += seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {**self.counters, 'wait_seconds': self.wait_seconds}
+
+
+metrics = Metrics()
+
+
+class ConnectionPool:
+    """Ограниченный пул открытых соединений одной базы.
+
+    Свободные соединения выдаются в порядке LIFO: давно не использованные
+    остаются в конце очереди и закрываются по истечении срока жизни.
+    Исправность проверяется только у простоявших дольше check_idle секунд.
+    """
+
+    def __init__(self, size, max_age, timeout, check_idle=0):
+        self.size = size
+        self.max_age = max_age
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.idle = deque()
+        self.in_use = 0
+
+    def acquire_slot(self):
+        """Ожидание свободного места в пуле не дольше timeout секунд."""
+        if self.slots.acquire(blocking=False):
+            return
+        started = time.perf_counter()
+        acquired = self.slots.acquire(timeout=self.timeout)
+        metrics.add_wait(time.perf_counter() - started)
+        if not acquired:
+            metrics.add('timeouts')
+            raise OperationalError(
+                f'Пул соединений исчерпан: {self.size} занято дольше '
+                f'{self.timeout} с.')
+
+    def is_expired(self, created):
+        return (self.max_age is not None
+                and time.monotonic() - created >= self.max_age)
+
+    def checkout(self, connect, is_usable):
+        """Свободное исправное соединение или новое через connect().
+
+        Возвращает соединение, время его создания и признак повторного
+        использования.
+        """
+        self.acquire_slot()
+        try:
+            while True:
+                with self.lock:
+                    item = self.idle.pop() if self.idle else None
+                if item is None:
+                    raw, created, reused = connect(), time.monotonic(), False
+                    metrics.add('opened')
+                    break
+                raw, created, returned = item
+                if self.is_expired(created):
+                    metrics.add('expired')
+                elif (time.monotonic() - returned >= self.check_idle
+                      and not is_usable(raw)):
+                    metrics.add('reconnects')
+                else:
+                    metrics.add('reused')
+                    reused = True
+                    break
+                self.discard(raw)
+        except BaseException:
+            self.slots.release()
+            raise
+        with self.lock:
+            self.in_use += 1
+        metrics.add('checkouts')
+        return raw, created, reused
+
+    def checkin(self, raw, created, reusable=True):
+        """Возврат соединения; устаревшие и сбойные закрываются."""
+        try:
+            if reusable and not self.is_expired(created):
+                with self.lock:
+                    self.idle.append((raw, created, time.monotonic()))
+            else:
+                self.discard(raw)
+        finally:
+            with self.lock:
+                self.in_use -= 1
+            self.slots.release()
+            metrics.add('checkins')
+
+    def discard(self, raw):
+        metrics.add('closed')
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """Закрытие всех свободных соединений."""
+        with self.lock:
+            idle, self.idle = self.idle, deque()
+        for raw, *_ in idle:
+            self.discard(raw)
+
+    def stats(self):
+        with self.lock:
+            return {'size': self.size, 'in_use': self.in_use,
+                    'idle': len(self.idle)}
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(alias):
+    """Пул базы alias, создаётся при первом обращении."""
+    with pools_lock:
+        if alias not in pools:
+            pools[alias] = ConnectionPool(settings.DB_POOL_SIZE,
+                                          settings.DB_CONNECTION_MAX_AGE,
+                                          settings.DB_POOL_TIMEOUT,
+                                          settings.DB_HEALTH_CHECK_IDLE)
+        return pools[alias]
+
+
+def get_db_metrics():
+    """Счётчики соединений и состояние пулов."""
+    return {
+        'conn_max_age': settings.DATABASES['default'].get('CONN_MAX_AGE', 0),
+        'pool_enabled': settings.DB_POOL_ENABLED,
+        'connections': metrics.snapshot(),
+        'pools': {alias: pool.stats() for alias, pool in pools.items()},
+    }
+
+
+class CommitBatch:
+    """Значения, копящиеся до фиксации транзакции, и действие над ними."""
+
+    def __init__(self, action):
+        self.action = action
+        self.items = set()
+
+    def __call__(self):
+        self.action(self.items)
+
+
+def get_commit_batch(name, using=None):
+    """Пакет name текущей транзакции; None, если его нет.
+
+    Выполненный пакет и пакет, отменённый откатом, больше не ждут
+    фиксации и не возвращаются.
+    """
+    connection = transaction.get_connection(using)
+    batch = getattr(connection, name, None)
+    if batch is not None and any(
+            func is batch for _, func in connection.run_on_commit):
+        return batch
+    return None
+
+
+def add_on_commit(name, items, action, using=None):
+    """Добавление items в пакет name: action(items) после фиксации.
+
+    Действие выполняется один раз на транзакцию, вне транзакции — сразу.
+    """
+    batch = get_commit_batch(name, using)
+    if batch is None:
+        batch = CommitBatch(action)
+        setattr(transaction.get_connection(using), name, batch)
+        batch.items.update(items)
+        transaction.on_commit(batch, using)
+    else:
+        batch.items.update(items)
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Настройка нового соединения SQLite по SQLITE_PRAGMAS.
+
+    Соединение, повторно выданное пулом, уже настроено.
+    """
+    if connection.vendor != 'sqlite' or getattr(connection, 'pool_reused',
+                                                False):
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    """Новые соединения потоков WSGI; пул считает свои сам."""
+    if not getattr(connection, 'pool', None):
+        metrics.add('opened')
+
+
+@receiver(request_started)
+def check_connections(sender, **kwargs):
+    """Проверка постоянных соединений перед запросом.
+
+    Django сам закрывает соединения с истёкшим CONN_MAX_AGE, но не замечает
+    разорванные сервером: такое соединение закрывается здесь, и запрос
+    откроет новое. Недавно использованные соединения не проверяются.
+    """
+    if not settings.DB_HEALTH_CHECKS:
+        return
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is None or getattr(connection, 'pool',
+                                                    None):
+            continue
+        idle = now - getattr(connection, 'released_at', now)
+        if idle < settings.DB_HEALTH_CHECK_IDLE or connection.is_usable():
+            metrics.add('reused')
+        else:
+            metrics.add('reconnects')
+            connection.close()
+
+
+@receiver(request_finished)
+def mark_connections_released(sender, **kwargs):
+    """Время окончания запроса: от него считается простой соединения."""
+    now = time.monotonic()
+    for connection in connections.all():
+        connection.released_at = now
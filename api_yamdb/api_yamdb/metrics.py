@@ -0,0 +1,186 @@
+"""Метрики запросов к API в текстовом формате Prometheus.
+
+Для каждого представления и действия DRF собираются гистограммы времени
+ответа, числа запросов к базе и размера ответа, а также счётчики ответов
+по статусам. Значения копятся в памяти процесса: при нескольких воркерах
+каждый отдаёт свои, а суммирует их Prometheus.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings  # type: ignore
+from django.db import connections  # type: ignore
+
+from .db import get_db_metrics
+from .profiler import QueryCounter
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+HISTOGRAMS = {
+    'yamdb_request_duration_seconds': (
+        'Время ответа представления.', LATENCY_BUCKETS),
+    'yamdb_request_db_queries': (
+        'Число запросов к базе за ответ.', QUERY_BUCKETS),
+    'yamdb_response_size_bytes': (
+        'Размер тела ответа.', SIZE_BUCKETS),
+}
+COUNTERS = {
+    'yamdb_responses_total': 'Ответы по статусам.',
+    'yamdb_auth_signups_total': 'Запросы кода подтверждения.',
+    'yamdb_auth_tokens_issued_total': 'Выданные токены.',
+    'yamdb_auth_confirmation_failures_total': 'Неверные коды подтверждения.',
+}
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\')
+                         .replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels)
+    return '{' + pairs + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """Потокобезопасные счётчики и гистограммы с метками."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters = defaultdict(int)
+            # Для каждой серии: число попаданий в корзины, сумма, количество.
+            self.histograms = {}
+
+    def inc(self, name, labels=(), value=1):
+        with self.lock:
+            self.counters[name, tuple(labels)] += value
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        key = name, tuple(labels)
+        with self.lock:
+            series = self.histograms.get(key)
+            if series is None:
+                series = self.histograms[key] = [[0] * len(buckets), 0, 0]
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        """Все метрики в текстовом формате."""
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {key: (list(series[0]), series[1], series[2])
+                          for key, series in self.histograms.items()}
+        lines = []
+        for name, (help_text, buckets) in HISTOGRAMS.items():
+            lines += [f'# HELP {name} {help_text}',
+                      f'# TYPE {name} histogram']
+            for (series_name, labels), (counts, total, count) in sorted(
+                    histograms.items()):
+                if series_name != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket'
+                                 f'{format_labels(labels + (("le", bound),))}'
+                                 f' {cumulative}')
+                lines += [
+                    f'{name}_bucket'
+                    f'{format_labels(labels + (("le", "+Inf"),))} {count}',
+                    f'{name}_sum{format_labels(labels)} '
+                    f'{format_value(total)}',
+                    f'{name}_count{format_labels(labels)} {count}',
+                ]
+        for name, help_text in COUNTERS.items():
+            lines += [f'# HELP {name} {help_text}',
+                      f'# TYPE {name} counter']
+            lines += [f'{name}{format_labels(labels)} {value}'
+                      for (series_name, labels), value in sorted(
+                          counters.items())
+                      if series_name == name]
+        return '\n'.join(lines + render_db_metrics()) + '\n'
+
+
+def render_db_metrics():
+    """Счётчики соединений и состояние пулов из api_yamdb.db."""
+    db_metrics = get_db_metrics()
+    connections_metrics = dict(db_metrics['connections'])
+    wait_seconds = connections_metrics.pop('wait_seconds')
+    lines = ['# HELP yamdb_db_connection_events_total События соединений.',
+             '# TYPE yamdb_db_connection_events_total counter']
+    lines += [f'yamdb_db_connection_events_total'
+              f'{format_labels((("event", event),))} {value}'
+              for event, value in connections_metrics.items()]
+    lines += ['# HELP yamdb_db_pool_wait_seconds_total Ожидание пула.',
+              '# TYPE yamdb_db_pool_wait_seconds_total counter',
+              f'yamdb_db_pool_wait_seconds_total {format_value(wait_seconds)}',
+              '# HELP yamdb_db_pool_connections Соединения пулов.',
+              '# TYPE yamdb_db_pool_connections gauge']
+    for alias, stats in db_metrics['pools'].items():
+        lines += [f'yamdb_db_pool_connections'
+                  f'{format_labels((("alias", alias), ("state", state)))} '
+                  f'{stats[state]}'
+                  for state in ('size', 'in_use', 'idle')]
+    return lines
+
+
+registry = Registry()
+
+
+def get_view_labels(view_func, method):
+    """Имя представления и действие DRF."""
+    cls = getattr(view_func, 'cls', None)
+    name = cls.__name__ if cls else view_func.__name__
+    actions = getattr(view_func, 'actions', None) or {}
+    return name, actions.get(method.lower(), method.lower())
+
+
+class MetricsMiddleware:
+    """Сбор метрик каждого ответа по представлению и действию."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in settings.DATABASES:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(profile))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+        view, action = getattr(request, 'metrics_view',
+                               ('unmatched', request.method.lower()))
+        labels = (('view', view), ('action', action))
+        registry.observe('yamdb_request_duration_seconds', labels, elapsed)
+        registry.observe('yamdb_request_db_queries', labels, profile.count)
+        if not response.streaming:
+            registry.observe('yamdb_response_size_bytes', labels,
+                             len(response.content))
+        registry.inc('yamdb_responses_total',
+                     labels + (('status', response.status_code),))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_view = get_view_labels(view_func, request.method)
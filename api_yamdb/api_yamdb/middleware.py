@@ -0,0 +1,89 @@
+"""Сжатие ответов gzip по Accept-Encoding.
+
+В отличие от GZipMiddleware, порог размера, список типов содержимого и
+уровень сжатия задаются в настройках COMPRESSION_*, а потоковые ответы
+сбрасываются после каждого фрагмента, чтобы клиент получал данные
+по мере готовности.
+"""
+
+import zlib
+
+from django.conf import settings  # type: ignore
+from django.utils.cache import patch_vary_headers  # type: ignore
+from django.utils.deprecation import MiddlewareMixin  # type: ignore
+
+# Формат gzip: заголовок и контрольная сумма вокруг deflate.
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def get_quality(params):
+    for param in params.split(';'):
+        name, _, value = param.strip().partition('=')
+        if name.lower() == 'q':
+            try:
+                return float(value)
+            except ValueError:
+                return 0
+    return 1
+
+
+def accepts_gzip(request):
+    """Принимает ли клиент gzip: явно или через *, с ненулевым q."""
+    qualities = {}
+    for coding in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = coding.partition(';')
+        qualities[name.strip().lower()] = get_quality(params)
+    return qualities.get('gzip', qualities.get('*', 0)) > 0
+
+
+def compress(content, level):
+    """Сжатие всего тела."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    return compressor.compress(content) + compressor.flush()
+
+
+def compress_sequence(sequence, level):
+    """Сжатие потока с передачей каждого фрагмента сразу."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    for chunk in sequence:
+        data = (compressor.compress(chunk)
+                + compressor.flush(zlib.Z_SYNC_FLUSH))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжатие ответов разрешённых типов не меньше порога."""
+
+    def process_response(self, request, response):
+        """Сжатие ответа, если клиент и содержимое это позволяют."""
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').partition(';')[0]
+        if (content_type.strip().lower()
+                not in settings.COMPRESSION_CONTENT_TYPES):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not accepts_gzip(request):
+            return response
+        level = settings.COMPRESSION_LEVEL
+        if response.streaming:
+            # Размер заранее неизвестен: порог не применяется.
+            response.streaming_content = compress_sequence(
+                response.streaming_content, level)
+            del response['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+            compressed = compress(response.content, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # Сжатое тело побайтно отличается: ETag становится слабым.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = 'gzip'
+        return response
@@ -0,0 +1 @@
+"""SQLite с пулом соединений для ASGI."""
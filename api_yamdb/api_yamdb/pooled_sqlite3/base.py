@@ -0,0 +1,40 @@
+"""Движок SQLite, берущий соединения из пула api_yamdb.db."""
+
+import sqlite3
+
+from api_yamdb.db import get_pool
+from api_yamdb.sqlite_backend import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Закрытие соединения возвращает его в пул вместо разрыва."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None
+        self.pool_created = None
+        self.pool_reused = False
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(self.alias)
+        connection, self.pool_created, self.pool_reused = self.pool.checkout(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params),
+            self.is_raw_usable)
+        return connection
+
+    @staticmethod
+    def is_raw_usable(connection):
+        try:
+            connection.execute('SELECT 1')
+        except sqlite3.Error:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is None or self.pool is None:
+            return super()._close()
+        # Незавершённая транзакция не должна достаться другому запросу.
+        reusable = (not self.connection.in_transaction
+                    and not self.errors_occurred)
+        self.pool.checkin(self.connection, self.pool_created, reusable)
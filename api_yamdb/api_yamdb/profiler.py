@@ -0,0 +1,155 @@
+"""Профилирование SQL-запросов каждого запроса к API.
+
+Запросы к базе перехватываются через connection.execute_wrapper, поэтому
+DEBUG не нужен. Одинаковые после нормализации запросы группируются:
+группа не меньше QUERY_PROFILER_REPEAT_THRESHOLD — признак N+1.
+Профилируется доля запросов QUERY_PROFILER_SAMPLE_RATE, остальные
+проходят без обёрток. Запросы, выполненные при чтении потокового ответа,
+уже после выхода из представления, не учитываются.
+"""
+
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings  # type: ignore
+from django.core.exceptions import MiddlewareNotUsed  # type: ignore
+from django.db import connections  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Списки параметров IN (%s, %s, ...) разной длины — один запрос.
+PARAMS_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+# Запросов в отчёте о медленном запросе.
+SLOWEST_QUERIES = 5
+
+log_lock = threading.Lock()
+
+
+def normalize(sql):
+    """Текст запроса без значений."""
+    sql = PARAMS_LIST.sub('(...)', sql)
+    sql = STRING_LITERAL.sub('?', sql)
+    return NUMBER_LITERAL.sub('?', sql)
+
+
+class QueryCounter:
+    """Число и общее время запросов к базе без их текста.
+
+    Достаточно для метрик каждого ответа; текст запросов сохраняет только
+    QueryProfile у выборки QUERY_PROFILER_SAMPLE_RATE.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class QueryProfile:
+    """Запросы к базе одного запроса к API."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(duration for _, duration in self.queries)
+
+    def get_repeated(self, threshold):
+        """Группы одинаковых запросов не меньше порога, частые первыми."""
+        groups = defaultdict(list)
+        for sql, duration in self.queries:
+            groups[normalize(sql)].append(duration)
+        repeated = [
+            {'sql': sql, 'count': len(durations),
+             'ms': round(sum(durations) * 1000, 3)}
+            for sql, durations in groups.items()
+            if len(durations) >= threshold]
+        return sorted(repeated, key=lambda group: -group['count'])
+
+    def get_slowest(self, limit=SLOWEST_QUERIES):
+        return [{'sql': sql, 'ms': round(duration * 1000, 3)}
+                for sql, duration in sorted(self.queries,
+                                            key=lambda query: -query[1])
+                [:limit]]
+
+
+def write_slow_request(path, record):
+    """Строка JSON в журнал медленных запросов."""
+    line = json.dumps(record, ensure_ascii=False) + '\n'
+    with log_lock, open(path, 'a', encoding='utf-8') as log:
+        log.write(line)
+
+
+class QueryProfilerMiddleware:
+    """Заголовки X-DB-* со сводкой запросов к базе и журнал медленных.
+
+    X-DB-Queries — число запросов, X-DB-Time — их время в мс,
+    X-DB-Repeated — число групп повторов, похожих на N+1.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.QUERY_PROFILER_SAMPLE_RATE:
+            return self.get_response(request)
+        profile = QueryProfile()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in settings.DATABASES:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(profile))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+        repeated = profile.get_repeated(
+            settings.QUERY_PROFILER_REPEAT_THRESHOLD)
+        response['X-DB-Queries'] = str(profile.count)
+        response['X-DB-Time'] = f'{profile.duration * 1000:.3f}'
+        response['X-DB-Repeated'] = str(len(repeated))
+        if repeated:
+            logger.warning('%s %s: повторы запросов %s', request.method,
+                           request.path, [group['count']
+                                          for group in repeated])
+        if (settings.QUERY_PROFILER_LOG
+                and elapsed * 1000 >= settings.QUERY_PROFILER_SLOW_MS):
+            write_slow_request(settings.QUERY_PROFILER_LOG, {
+                'time': time.time(),
+                'method': request.method,
+                'path': request.get_full_path(),
+                'status': response.status_code,
+                'ms': round(elapsed * 1000, 3),
+                'queries': profile.count,
+                'db_ms': round(profile.duration * 1000, 3),
+                'repeated': repeated,
+                'slowest': profile.get_slowest(),
+            })
+        return response
@@ -2,6 +2,8 @@ from pathlib import Path
 from datetime import timedelta
 import os
 
+from django.core.exceptions import ImproperlyConfigured  # type: ignore
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -34,6 +36,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api_yamdb.metrics.MetricsMiddleware',
+    'api_yamdb.profiler.QueryProfilerMiddleware',
+    'api_yamdb.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -68,11 +73,133 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'api_yamdb.sqlite_backend',
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
 
+# Настройки соединений SQLite по профилям, см. api_yamdb/db.py.
+SQLITE_PROFILES: dict[str, dict[str, object]] = {
+    'default': {
+        'pragmas': {},
+        'transaction_mode': 'DEFERRED',
+    },
+    'production': {
+        'pragmas': {
+            # Читатели не ждут писателя, писатель не ждёт читателей.
+            'journal_mode': 'WAL',
+            # В режиме WAL сохраняет целостность без fsync на каждую
+            # запись.
+            'synchronous': 'NORMAL',
+            'mmap_size': 256 * 1024 * 1024,
+            # Отрицательное значение — размер в КиБ.
+            'cache_size': -64 * 1024,
+            # Ожидание блокировки вместо ошибки "database is locked", мс.
+            'busy_timeout': 5000,
+            'temp_store': 'MEMORY',
+        },
+        # Транзакции сразу берут блокировку записи, иначе busy_timeout не
+        # спасает их от "database is locked", см. sqlite_backend.
+        'transaction_mode': 'IMMEDIATE',
+    },
+}
+DATABASE_PROFILE = os.getenv('YAMDB_DATABASE_PROFILE', 'default')
+if DATABASE_PROFILE not in SQLITE_PROFILES:
+    raise ImproperlyConfigured(
+        f'Неизвестный профиль базы YAMDB_DATABASE_PROFILE='
+        f'{DATABASE_PROFILE!r}, допустимы: {", ".join(SQLITE_PROFILES)}.')
+SQLITE_PRAGMAS = SQLITE_PROFILES[DATABASE_PROFILE]['pragmas']
+SQLITE_TRANSACTION_MODE = SQLITE_PROFILES[DATABASE_PROFILE][
+    'transaction_mode']
+
+# Срок жизни соединения, в секундах: под WSGI — соединения потока,
+# под ASGI — соединения в пуле. 0 — новое соединение на каждый запрос.
+DB_CONNECTION_MAX_AGE = int(os.getenv('YAMDB_CONN_MAX_AGE', 60))
+# Проверка постоянного соединения перед запросом.
+DB_HEALTH_CHECKS = True
+# Проверяются только соединения, простоявшие без дела дольше, в секундах.
+DB_HEALTH_CHECK_IDLE = 30
+# Пул соединений включается точкой входа asgi.py.
+DB_POOL_ENABLED = os.getenv('YAMDB_DB_POOL') == '1'
+DB_POOL_SIZE = int(os.getenv('YAMDB_DB_POOL_SIZE', 10))
+# Ожидание свободного соединения, в секундах.
+DB_POOL_TIMEOUT = 10
+
+if DB_POOL_ENABLED:
+    # Соединение возвращается в пул в конце каждого запроса.
+    DATABASES['default']['ENGINE'] = 'api_yamdb.pooled_sqlite3'
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = DB_CONNECTION_MAX_AGE
+
+
+# Compression
+
+# Ответы короче порога, байт, не сжимаются: выигрыш меньше затрат.
+COMPRESSION_MIN_SIZE = 1024
+# Уровень gzip от 1 (быстрее) до 9 (меньше), см. benchmark_compression.
+COMPRESSION_LEVEL = int(os.getenv('YAMDB_COMPRESSION_LEVEL', 6))
+# Только ответы API в JSON: страницы HTML (админка, browsable API) несут
+# токен CSRF рядом с данными из запроса, и сжатие открывает их для BREACH.
+COMPRESSION_CONTENT_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+)
+
+
+# Leaderboards
+
+# Произведения с меньшим числом отзывов в рейтинги не попадают.
+LEADERBOARD_MIN_REVIEWS = int(os.getenv('YAMDB_LEADERBOARD_MIN_REVIEWS', 3))
+# Вес средней оценки в байесовской оценке, в отзывах.
+LEADERBOARD_PRIOR_WEIGHT = int(
+    os.getenv('YAMDB_LEADERBOARD_PRIOR_WEIGHT', 5))
+# Срок жизни средней оценки в кэше, в секундах; refresh_rankings обновляет.
+LEADERBOARD_PRIOR_TIMEOUT = 60 * 60
+
+
+# Similar titles
+
+# Соседей, сохраняемых для каждого произведения.
+SIMILAR_TITLES_COUNT = int(os.getenv('YAMDB_SIMILAR_TITLES_COUNT', 20))
+# Произведения с меньшим числом общих оценивших похожими не считаются.
+SIMILAR_TITLES_MIN_COMMON = int(
+    os.getenv('YAMDB_SIMILAR_TITLES_MIN_COMMON', 3))
+# Память под блок сходств при пересчёте, в мегабайтах.
+SIMILAR_TITLES_MEMORY_MB = int(
+    os.getenv('YAMDB_SIMILAR_TITLES_MEMORY_MB', 256))
+
+
+# Query profiler
+
+QUERY_PROFILER_ENABLED = os.getenv('YAMDB_QUERY_PROFILER') == '1'
+# Доля профилируемых запросов от 0 до 1.
+QUERY_PROFILER_SAMPLE_RATE = float(
+    os.getenv('YAMDB_QUERY_PROFILER_SAMPLE_RATE', 1))
+# Сколько одинаковых запросов считать признаком N+1.
+QUERY_PROFILER_REPEAT_THRESHOLD = 5
+# Журнал JSONL запросов не быстрее порога, мс; None — без журнала.
+QUERY_PROFILER_LOG = os.getenv('YAMDB_QUERY_PROFILER_LOG')
+QUERY_PROFILER_SLOW_MS = int(os.getenv('YAMDB_QUERY_PROFILER_SLOW_MS', 500))
+
+
+# Cache
+
+# Версия прав по токену хранится в кэше, см. api/authentication.py.
+# С общим кэшем (Redis, Memcached) отзыв прав виден всем процессам сразу,
+# с локальным — не позже TOKEN_VERSION_LOCAL_TIMEOUT секунд.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Срок жизни кэша списков категорий и жанров, в секундах.
+LIST_CACHE_TIMEOUT = 60 * 15
+
+# Срок хранения версии прав в локальном кэше процесса, в секундах.
+TOKEN_VERSION_LOCAL_TIMEOUT = 5
+
 
 # Password validation
 
@@ -115,15 +242,24 @@ AUTH_USER_MODEL = 'users.YamdbUser'
 
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS':
-    'rest_framework.pagination.PageNumberPagination',
+    'api.pagination.PageNumberOrCursorPagination',
     'PAGE_SIZE': 100,
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
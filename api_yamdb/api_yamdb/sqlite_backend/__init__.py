@@ -0,0 +1 @@
+"""SQLite с настраиваемым режимом транзакций и RETURNING."""
@@ -0,0 +1,52 @@
+"""Движок SQLite проекта: режим начала транзакций и INSERT ... RETURNING."""
+
+import sqlite3
+
+from django.conf import settings  # type: ignore
+from django.db.backends.sqlite3 import (base, features,  # type: ignore
+                                        operations)
+
+
+class DatabaseFeatures(features.DatabaseFeatures):
+    """RETURNING есть в SQLite с версии 3.35.
+
+    С ним bulk_create заполняет id созданных объектов, как на PostgreSQL.
+    """
+
+    can_return_columns_from_insert = sqlite3.sqlite_version_info >= (3, 35)
+    can_return_rows_from_bulk_insert = can_return_columns_from_insert
+
+
+class DatabaseOperations(operations.DatabaseOperations):
+    """Вставка пакета через VALUES и возврат колонок вставленных строк."""
+
+    def bulk_insert_sql(self, fields, placeholder_rows):
+        return 'VALUES ' + ', '.join(f'({", ".join(row)})'
+                                     for row in placeholder_rows)
+
+    def return_insert_columns(self, fields):
+        if not fields:
+            return '', ()
+        columns = ', '.join(
+            f'{self.quote_name(field.model._meta.db_table)}.'
+            f'{self.quote_name(field.column)}' for field in fields)
+        return f'RETURNING {columns}', ()
+
+    def fetch_returned_insert_rows(self, cursor):
+        return cursor.fetchall()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """transaction.atomic начинается с BEGIN DEFERRED или IMMEDIATE.
+
+    Отложенная транзакция берёт блокировку записи только на первой записи.
+    Если к этому моменту другой писатель уже изменил базу, SQLite сразу
+    отвечает "database is locked", не дожидаясь busy_timeout. IMMEDIATE
+    ждёт блокировку записи в начале транзакции.
+    """
+
+    features_class = DatabaseFeatures
+    ops_class = DatabaseOperations
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {settings.SQLITE_TRANSACTION_MODE}')
@@ -1,9 +1,15 @@
 """Настройки приложения."""
 
 from django.apps import AppConfig  # type: ignore
+from django.db.models.signals import post_migrate  # type: ignore
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
     verbose_name = 'Обзоры'
+
+    def ready(self):
+        """Подключение сигналов."""
+        from . import signals
+        post_migrate.connect(signals.create_search_tables, sender=self)
@@ -5,3 +5,6 @@ MAX_SLUG_LENGTH: int = 50
 
 MIN_SCORE: int = 1
 MAX_SCORE: int = 10
+
+# Имя версии списка произведений, см. ListVersion.
+TITLES_LIST_VERSION: str = 'titles'
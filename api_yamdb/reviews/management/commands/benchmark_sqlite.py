@@ -0,0 +1,151 @@
+"""Замер конкурентной записи отзывов в SQLite по профилям соединения."""
+
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings  # type: ignore
+from django.contrib.auth import get_user_model  # type: ignore
+from django.core.management.base import BaseCommand  # type: ignore
+from django.db import OperationalError, connections  # type: ignore
+from django.test.utils import (override_settings,  # type: ignore
+                               setup_databases, teardown_databases)
+
+from reviews.models import Review, Title
+
+User = get_user_model()
+
+PERCENTILES = (50, 90, 99)
+TITLES_PAGE = 100
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает профили SQLite: пропускную способность записи '
+            'отзывов и задержку чтения списка произведений под нагрузкой.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--duration', type=float, default=5.0,
+                            help='Длительность прогона, секунд.')
+        parser.add_argument('--titles', type=int, default=20000)
+        parser.add_argument('--profile', action='append',
+                            choices=tuple(settings.SQLITE_PROFILES),
+                            help='Профиль; по умолчанию все.')
+        parser.add_argument('--output', type=Path)
+
+    def handle(self, *args, **options):
+        """Прогон каждого профиля на отдельном файле базы."""
+        results = {}
+        for profile in (options['profile']
+                        or settings.SQLITE_PROFILES):
+            with tempfile.TemporaryDirectory() as directory:
+                results[profile] = self.run_profile(
+                    profile, Path(directory) / 'bench.sqlite3', options)
+            row = results[profile]
+            self.stdout.write(
+                f'{profile:<12} записей/с {row["writes_per_second"]:8.1f}  '
+                f'блокировок {row["lock_errors"]:5d}  '
+                f'чтение p50 {row["read_latency_ms"]["p50"]:7.2f} мс  '
+                f'p99 {row["read_latency_ms"]["p99"]:7.2f} мс')
+        if options['output']:
+            options['output'].write_text(json.dumps(results, indent=2),
+                                         encoding='utf-8')
+
+    def run_profile(self, profile, path, options):
+        database = settings.DATABASES['default']
+        test_settings = database.setdefault('TEST', {})
+        saved_name = test_settings.get('NAME')
+        test_settings['NAME'] = str(path)
+        try:
+            with override_settings(
+                    SQLITE_PRAGMAS=settings.SQLITE_PROFILES[profile][
+                        'pragmas'],
+                    SQLITE_TRANSACTION_MODE=settings.SQLITE_PROFILES[
+                        profile]['transaction_mode']):
+                old_config = setup_databases(verbosity=0, interactive=False)
+                try:
+                    return self.run_load(options)
+                finally:
+                    connections.close_all()
+                    teardown_databases(old_config, verbosity=0)
+        finally:
+            test_settings['NAME'] = saved_name
+
+    def prepare(self, options):
+        """Авторы по одному на писателя и произведения для отзывов."""
+        writers = [User.objects.create_user(username=f'writer{number}',
+                                            email=f'writer{number}@ya.fake')
+                   for number in range(options['writers'])]
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000)
+            for number in range(options['titles']))
+        title_ids = list(Title.objects.values_list('pk', flat=True))
+        connections.close_all()
+        return writers, title_ids
+
+    def run_load(self, options):
+        """Писатели и читатели параллельно в течение duration секунд."""
+        writers, title_ids = self.prepare(options)
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.stats = {'writes': 0, 'lock_errors': 0, 'read_latencies': []}
+        threads = ([threading.Thread(target=self.write_reviews,
+                                     args=(author, title_ids))
+                    for author in writers]
+                   + [threading.Thread(target=self.read_titles)
+                      for _ in range(options['readers'])])
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        latencies = self.stats['read_latencies'] or [0]
+        return {
+            'writes': self.stats['writes'],
+            'writes_per_second': self.stats['writes'] / elapsed,
+            'lock_errors': self.stats['lock_errors'],
+            'reads': len(self.stats['read_latencies']),
+            'read_latency_ms': {f'p{p}': float(np.percentile(latencies, p))
+                                for p in PERCENTILES},
+        }
+
+    def write_reviews(self, author, title_ids):
+        """Поток записи: отзывы автора на произведения по порядку."""
+        writes = errors = 0
+        for title_id in title_ids:
+            if self.stop.is_set():
+                break
+            try:
+                Review.objects.create(title_id=title_id, author=author,
+                                      text='Текст отзыва.', score=7)
+                writes += 1
+            except OperationalError:
+                errors += 1
+        connections.close_all()
+        with self.lock:
+            self.stats['writes'] += writes
+            self.stats['lock_errors'] += errors
+
+    def read_titles(self):
+        """Поток чтения: страница произведений по рейтингу."""
+        latencies = []
+        errors = 0
+        while not self.stop.is_set():
+            started = time.perf_counter()
+            try:
+                list(Title.objects.order_by('-rating')[:TITLES_PAGE])
+            except OperationalError:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+        connections.close_all()
+        with self.lock:
+            self.stats['read_latencies'] += latencies
+            self.stats['lock_errors'] += errors
@@ -0,0 +1,33 @@
+"""Пересчёт похожих произведений."""
+
+from django.conf import settings  # type: ignore
+from django.core.management.base import BaseCommand  # type: ignore
+
+from reviews.similar import LOAD_BATCH_SIZE, build_similar_titles
+
+
+class Command(BaseCommand):
+    help = ('Считает сходство произведений по оценкам пользователей и '
+            'сохраняет ближайших соседей; запускается периодически.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int,
+                            default=settings.SIMILAR_TITLES_COUNT,
+                            help='Соседей для каждого произведения.')
+        parser.add_argument('--min-common', type=int,
+                            default=settings.SIMILAR_TITLES_MIN_COMMON,
+                            help='Наименьшее число общих оценивших.')
+        parser.add_argument('--memory-mb', type=int,
+                            default=settings.SIMILAR_TITLES_MEMORY_MB,
+                            help='Память под блок сходств, в мегабайтах.')
+        parser.add_argument('--batch-size', type=int,
+                            default=LOAD_BATCH_SIZE,
+                            help='Отзывов в одном запросе при чтении.')
+
+    def handle(self, *args, **options):
+        """Пересчёт блоками произведений."""
+        saved = build_similar_titles(
+            options['count'], options['min_common'], options['memory_mb'],
+            options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Сохранено пар похожих произведений: {saved}.'))
@@ -0,0 +1,274 @@
+"""Генерация синтетических данных для нагрузочных проверок."""
+
+import csv
+from pathlib import Path
+
+import numpy as np
+from django.core.management.base import BaseCommand  # type: ignore
+
+from reviews.constants import MAX_SCORE, MIN_SCORE
+from users.models import Role
+from .load_csv import DEFAULT_BATCH_SIZE
+from .load_csv import Command as LoadCommand
+
+HEADERS = {
+    'users.csv': ('id', 'username', 'email', 'role', 'bio', 'first_name',
+                  'last_name'),
+    'category.csv': ('id', 'name', 'slug'),
+    'genre.csv': ('id', 'name', 'slug'),
+    'titles.csv': ('id', 'name', 'year', 'category'),
+    'genre_title.csv': ('id', 'title_id', 'genre_id'),
+    'review.csv': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comments.csv': ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'автор', 'музыка', 'сцена',
+    'история', 'актёр', 'роль', 'жанр', 'смысл', 'диалог', 'ритм', 'стиль',
+    'очень', 'слишком', 'совсем', 'вполне', 'отличный', 'скучный',
+    'неожиданный', 'сильный', 'слабый', 'яркий', 'мрачный', 'смешной',
+    'понравился', 'удивил', 'разочаровал', 'запомнился', 'затянут',
+)
+ROLES = (Role.USER, Role.MODERATOR, Role.ADMIN)
+ROLE_WEIGHTS = (0.9, 0.08, 0.02)
+MAX_GENRES_PER_TITLE = 3
+MIN_YEAR = 1900
+FIRST_PUB_DATE = np.datetime64('2000-01-01T00:00:00', 'ms')
+# Постоянная граница, а не текущее время: зерно задаёт данные полностью.
+LAST_PUB_DATE = np.datetime64('2024-07-01T00:00:00', 'ms')
+MAX_YEAR = 2024
+TEXT_POOL_SIZE = 1000
+REDISTRIBUTION_ROUNDS = 10
+
+
+class SyntheticData:
+    """Генератор строк в формате static/data.
+
+    Каждый метод отдаёт строки пакетами, собранными векторно средствами
+    NumPy, поэтому память ограничена размером пакета и массивами на
+    уровне произведений.
+    """
+
+    def __init__(self, users, categories, genres, titles, reviews,
+                 comments, seed, batch_size):
+        self.counts = {'users': users, 'categories': categories,
+                       'genres': genres, 'titles': titles,
+                       'reviews': reviews, 'comments': comments}
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self.texts = self.make_texts()
+        # Популярность и «качество» произведений задают число отзывов
+        # и средний балл каждого произведения.
+        popularity = self.rng.pareto(1.2, titles) + 1
+        self.review_counts = np.zeros(titles, dtype=np.int64)
+        for _ in range(REDISTRIBUTION_ROUNDS):
+            # Отзывы сверх числа пользователей раздаются остальным.
+            missing = reviews - int(self.review_counts.sum())
+            weights = popularity * (self.review_counts < users)
+            if missing <= 0 or not weights.any():
+                break
+            self.review_counts = np.minimum(
+                self.review_counts
+                + self.rng.multinomial(missing, weights / weights.sum()),
+                users)
+        self.quality = self.rng.normal(6.5, 1.5, titles)
+        self.total_reviews = int(self.review_counts.sum())
+        self.span_ms = int((LAST_PUB_DATE - FIRST_PUB_DATE).astype(np.int64))
+
+    def make_texts(self):
+        """Набор предложений для текстов отзывов и комментариев."""
+        lengths = self.rng.integers(5, 30, TEXT_POOL_SIZE)
+        return np.array([
+            ' '.join(self.rng.choice(WORDS, length)).capitalize() + '.'
+            for length in lengths
+        ], dtype=object)
+
+    def chunks(self, total, size=None):
+        """Границы пакетов."""
+        size = size or self.batch_size
+        for start in range(0, total, size):
+            yield start, min(start + size, total)
+
+    def pick_texts(self, size):
+        return self.texts[self.rng.integers(0, len(self.texts), size)]
+
+    def pick_dates(self, size):
+        offsets = self.rng.integers(0, self.span_ms, size)
+        dates = FIRST_PUB_DATE + offsets.astype('timedelta64[ms]')
+        return np.char.add(np.datetime_as_string(dates, unit='ms'), 'Z')
+
+    def users(self):
+        for start, stop in self.chunks(self.counts['users']):
+            ids = np.arange(start + 1, stop + 1)
+            roles = self.rng.choice(ROLES, stop - start, p=ROLE_WEIGHTS)
+            yield [(user_id, f'user{user_id}', f'user{user_id}@yamdb.fake',
+                    role, '', '', '')
+                   for user_id, role in zip(ids.tolist(), roles.tolist())]
+
+    def categories(self):
+        yield [(idx, f'Категория {idx}', f'category-{idx}')
+               for idx in range(1, self.counts['categories'] + 1)]
+
+    def genres(self):
+        yield [(idx, f'Жанр {idx}', f'genre-{idx}')
+               for idx in range(1, self.counts['genres'] + 1)]
+
+    def titles(self):
+        for start, stop in self.chunks(self.counts['titles']):
+            size = stop - start
+            ids = np.arange(start + 1, stop + 1)
+            years = self.rng.integers(MIN_YEAR, MAX_YEAR + 1, size)
+            categories = self.rng.integers(1, self.counts['categories'] + 1,
+                                           size)
+            words = self.rng.choice(WORDS, size)
+            yield [(title_id, f'{word.capitalize()} {title_id}', year,
+                    category)
+                   for title_id, word, year, category in zip(
+                       ids.tolist(), words.tolist(), years.tolist(),
+                       categories.tolist())]
+
+    def genre_title(self):
+        genres = self.counts['genres']
+        next_id = 1
+        # До MAX_GENRES_PER_TITLE связей на произведение.
+        for start, stop in self.chunks(
+                self.counts['titles'],
+                max(1, self.batch_size // MAX_GENRES_PER_TITLE)):
+            size = stop - start
+            per_title = self.rng.integers(
+                1, min(MAX_GENRES_PER_TITLE, genres) + 1, size)
+            title_ids = np.repeat(np.arange(start + 1, stop + 1), per_title)
+            # Подряд идущие жанры от случайного начала не повторяются.
+            offsets = np.arange(len(title_ids)) - np.repeat(
+                np.cumsum(per_title) - per_title, per_title)
+            first = np.repeat(self.rng.integers(0, genres, size), per_title)
+            genre_ids = (first + offsets) % genres + 1
+            ids = np.arange(next_id, next_id + len(title_ids))
+            next_id += len(title_ids)
+            yield list(zip(ids.tolist(), title_ids.tolist(),
+                           genre_ids.tolist()))
+
+    def reviews(self):
+        """Отзывы без повторов пары (произведение, автор).
+
+        Авторы произведения берутся арифметической прогрессией по модулю
+        числа пользователей с шагом, взаимно простым с этим числом.
+        """
+        users = self.counts['users']
+        titles = self.counts['titles']
+        cumulative = np.cumsum(self.review_counts)
+        next_id = 1
+        start = 0
+        while start < titles:
+            # Произведения, чьи отзывы умещаются в пакет, но хотя бы одно.
+            done = int(cumulative[start - 1]) if start else 0
+            stop = max(start + 1, int(np.searchsorted(
+                cumulative, done + self.batch_size, side='right')))
+            counts = self.review_counts[start:stop]
+            size = int(counts.sum())
+            title_ids = np.repeat(np.arange(start + 1, stop + 1), counts)
+            positions = np.arange(size) - np.repeat(
+                np.cumsum(counts) - counts, counts)
+            steps = (self.rng.integers(1, users, stop - start)
+                     if users > 1 else np.ones(stop - start, dtype=int))
+            steps[np.gcd(steps, users) != 1] = 1
+            first = self.rng.integers(0, users, stop - start)
+            authors = ((np.repeat(first, counts)
+                        + np.repeat(steps, counts) * positions) % users + 1)
+            scores = np.clip(
+                np.rint(np.repeat(self.quality[start:stop], counts)
+                        + self.rng.normal(0, 1.5, size)),
+                MIN_SCORE, MAX_SCORE).astype(int)
+            ids = np.arange(next_id, next_id + size)
+            next_id += size
+            rows = list(zip(ids.tolist(), title_ids.tolist(),
+                            self.pick_texts(size).tolist(), authors.tolist(),
+                            scores.tolist(), self.pick_dates(size).tolist()))
+            # У одного произведения отзывов может быть больше пакета.
+            for begin in range(0, size, self.batch_size):
+                yield rows[begin:begin + self.batch_size]
+            start = stop
+
+    def comments(self):
+        if not self.total_reviews:
+            return
+        for start, stop in self.chunks(self.counts['comments']):
+            size = stop - start
+            ids = np.arange(start + 1, stop + 1)
+            review_ids = self.rng.integers(1, self.total_reviews + 1, size)
+            authors = self.rng.integers(1, self.counts['users'] + 1, size)
+            yield list(zip(ids.tolist(), review_ids.tolist(),
+                           self.pick_texts(size).tolist(), authors.tolist(),
+                           self.pick_dates(size).tolist()))
+
+    def files(self):
+        """Источники строк по файлам в порядке зависимостей."""
+        return {
+            'users.csv': self.users,
+            'category.csv': self.categories,
+            'genre.csv': self.genres,
+            'titles.csv': self.titles,
+            'genre_title.csv': self.genre_title,
+            'review.csv': self.reviews,
+            'comments.csv': self.comments,
+        }
+
+
+class Command(BaseCommand):
+    help = ('Генерирует синтетические данные заданного объёма в базу '
+            'или в CSV-файлы формата static/data.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=10000)
+        parser.add_argument('--reviews', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Зерно генератора случайных чисел.')
+        parser.add_argument('--batch-size', type=int,
+                            default=DEFAULT_BATCH_SIZE,
+                            help='Количество строк в одном пакете.')
+        parser.add_argument(
+            '--output', type=Path,
+            help='Каталог для CSV-файлов. Без него данные пишутся в базу.')
+
+    def handle(self, *args, **options):
+        """Генерация."""
+        for name in ('users', 'categories', 'genres', 'titles'):
+            if options[name] < 1:
+                options[name] = 1
+        data = SyntheticData(
+            options['users'], options['categories'], options['genres'],
+            options['titles'], options['reviews'], options['comments'],
+            options['seed'], options['batch_size'])
+        if options['output']:
+            self.write_csv(data, options['output'])
+        else:
+            self.write_db(data, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Сгенерировано отзывов: {data.total_reviews}.'))
+
+    def write_csv(self, data, output):
+        """Запись в CSV-файлы."""
+        output.mkdir(parents=True, exist_ok=True)
+        for filename, rows in data.files().items():
+            with open(output / filename, 'w', encoding='utf-8',
+                      newline='') as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(HEADERS[filename])
+                for chunk in rows():
+                    writer.writerows(chunk)
+            self.stdout.write(f'{filename}: записан.')
+
+    def write_db(self, data, batch_size):
+        """Запись в базу через загрузчик load_csv."""
+        loader = LoadCommand(stdout=self.stdout, stderr=self.stderr)
+        loader.prepare(batch_size)
+        sources = data.files()
+        for filename, model, build in loader.get_loaders():
+            header = HEADERS[filename]
+            rows = (dict(zip(header, row))
+                    for chunk in sources[filename]() for row in chunk)
+            loader.load(filename, rows, model, build)
+        loader.finish()
@@ -0,0 +1,17 @@
+"""Перестроение поискового индекса."""
+
+from django.core.management.base import BaseCommand  # type: ignore
+
+from reviews.search import create_search_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс произведений и отзывов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        """Перестроение."""
+        create_search_index(using=options['database'], rebuild=True)
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен.'))
@@ -0,0 +1,18 @@
+"""Пересчёт хранимого рейтинга произведений."""
+
+from django.core.management.base import BaseCommand  # type: ignore
+
+from reviews.models import Title
+from reviews.rankings import rebuild_rankings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг, количество и сумму оценок произведений.'
+
+    def handle(self, *args, **options):
+        """Пересчёт одним запросом UPDATE."""
+        updated = Title.objects.recalculate_ratings()
+        ranked = rebuild_rankings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитан рейтинг произведений: {updated}, '
+            f'в рейтингах лучших: {ranked}.'))
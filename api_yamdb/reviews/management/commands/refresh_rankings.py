@@ -0,0 +1,21 @@
+"""Пересчёт рейтингов лучших произведений."""
+
+from django.core.management.base import BaseCommand  # type: ignore
+
+from reviews.rankings import REFRESH_BATCH_SIZE, rebuild_rankings
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает среднюю оценку и рейтинги лучших произведений; '
+            'запускается периодически.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            default=REFRESH_BATCH_SIZE,
+                            help='Произведений в одной транзакции.')
+
+    def handle(self, *args, **options):
+        """Пересчёт пакетами произведений."""
+        ranked = rebuild_rankings(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Произведений в рейтингах: {ranked}.'))
@@ -7,6 +7,9 @@ from django.contrib.auth import get_user_model  # type: ignore
 from django.core.validators import (MaxValueValidator,  # type: ignore
                                     MaxLengthValidator,
                                     MinValueValidator)
+from django.db.models.functions import Cast, Coalesce, NullIf  # type: ignore
+from django.dispatch import Signal  # type: ignore
+from django.utils import timezone  # type: ignore
 
 from .constants import (MAX_NAME_LENGTH, MAX_SLUG_LENGTH,
                         MIN_SCORE, MAX_SCORE)
@@ -14,6 +17,23 @@ from .constants import (MAX_NAME_LENGTH, MAX_SLUG_LENGTH,
 
 User = get_user_model()
 
+# Массовые изменения без сигналов моделей: QuerySet.update и bulk_create.
+bulk_changed = Signal()
+
+
+class BulkSignalQuerySet(models.QuerySet):
+    """Набор, сообщающий о массовых изменениях сигналом bulk_changed."""
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        bulk_changed.send(sender=self.model)
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        bulk_changed.send(sender=self.model)
+        return objs
+
 
 class BaseNameModel(models.Model):
     """Базовая модель с именем."""
@@ -37,6 +57,8 @@ class BaseNameSlugModel(BaseNameModel):
                             validators=(MaxLengthValidator,),
                             verbose_name='Слаг')
 
+    objects = BulkSignalQuerySet.as_manager()
+
     class Meta(BaseNameModel.Meta):
         abstract = True
 
@@ -57,6 +79,89 @@ class Genre(BaseNameSlugModel):
         verbose_name_plural = 'Жанры'
 
 
+class ListVersionQuerySet(models.QuerySet):
+    """Версии наборов."""
+
+    def bump(self, name):
+        """Новая версия набора name."""
+        now = timezone.now()
+        changes = {'version': models.F('version') + 1, 'updated_at': now}
+        if self.filter(name=name).update(**changes):
+            return
+        _, created = self.get_or_create(
+            name=name, defaults={'version': 1, 'updated_at': now})
+        if not created:
+            self.filter(name=name).update(**changes)
+
+    def get_state(self, name):
+        """Дата изменения и версия набора name."""
+        return self.filter(name=name).values_list(
+            'updated_at', 'version').first() or (None, 0)
+
+
+class ListVersion(models.Model):
+    """Версия набора для ETag и Last-Modified списка, см. api/conditional.py.
+
+    В отличие от даты последнего изменения, сдвигается и при удалении.
+    """
+
+    name = models.CharField(primary_key=True, max_length=MAX_SLUG_LENGTH,
+                            verbose_name='Набор')
+    version = models.PositiveBigIntegerField(default=0,
+                                             verbose_name='Версия')
+    updated_at = models.DateTimeField(default=timezone.now,
+                                      verbose_name='Дата изменения')
+
+    objects = ListVersionQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Версия набора'
+        verbose_name_plural = 'Версии наборов'
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
+
+
+class TitleQuerySet(BulkSignalQuerySet):
+    """Набор произведений с хранимым рейтингом."""
+
+    def change_rating(self, score_delta, count_delta):
+        """Сдвиг суммы и количества оценок одним запросом UPDATE."""
+        score_sum = models.F('score_sum') + score_delta
+        review_count = models.F('review_count') + count_delta
+        now = timezone.now()
+        return self.update(
+            score_sum=score_sum,
+            review_count=review_count,
+            rating=(Cast(score_sum, models.FloatField())
+                    / NullIf(review_count, 0)),
+            updated_at=now,
+            reviews_updated_at=now,
+        )
+
+    def touch_reviews(self):
+        """Новая версия списка отзывов без изменения рейтинга."""
+        return self.update(reviews_updated_at=timezone.now())
+
+    def recalculate_ratings(self):
+        """Пересчёт рейтинга по таблице отзывов."""
+        reviews = (Review.objects.filter(title=models.OuterRef('pk'))
+                   .order_by().values('title'))
+        return self.update(
+            review_count=Coalesce(models.Subquery(
+                reviews.annotate(value=models.Count('pk')).values('value')
+            ), 0),
+            score_sum=Coalesce(models.Subquery(
+                reviews.annotate(value=models.Sum('score')).values('value')
+            ), 0),
+            rating=models.Subquery(
+                reviews.annotate(value=models.Avg('score')).values('value')
+            ),
+            updated_at=timezone.now(),
+            reviews_updated_at=timezone.now(),
+        )
+
+
 class Title(BaseNameModel):
     """Произведения искусства."""
 
@@ -73,19 +178,67 @@ class Title(BaseNameModel):
     category = models.ForeignKey(
         Category, on_delete=models.DO_NOTHING, related_name='titles',
         verbose_name='Категория', blank=True, null=True)
+    # Поддерживаются сигналами отзывов, см. reviews/signals.py.
+    rating = models.FloatField(verbose_name='Рейтинг', null=True,
+                               blank=True, editable=False, db_index=True)
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов', default=0, editable=False)
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок', default=0, editable=False)
+    # Версии для ETag и Last-Modified, см. api/conditional.py. Сдвигаются
+    # и при изменении категории, жанров, см. reviews/signals.py.
+    updated_at = models.DateTimeField(verbose_name='Дата изменения',
+                                      auto_now=True, db_index=True)
+    reviews_updated_at = models.DateTimeField(
+        verbose_name='Дата изменения отзывов', null=True, editable=False)
+
+    objects = TitleQuerySet.as_manager()
+
+    # Меняются только запросами UPDATE из TitleQuerySet.
+    STORED_FIELDS = ('rating', 'review_count', 'score_sum',
+                     'reviews_updated_at')
 
     class Meta(BaseNameModel.Meta):
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            # Ключ курсорной пагинации.
+            models.Index(fields=('name', 'id'), name='title_name_id_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Изменение без хранимых счётчиков: объект мог устареть."""
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.STORED_FIELDS]
+        super().save(*args, **kwargs)
+
+
+class CreationDateTimeField(models.DateTimeField):
+    """auto_now_add, не затирающий уже заданную дату.
+
+    Через API дата не передаётся (поле не редактируется), а загрузка из
+    CSV сохраняет даты из файла.
+    """
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.attname)
+        if add and value is not None:
+            return value
+        return super().pre_save(model_instance, add)
 
 
 class BaseTextModel(models.Model):
     """Базовая текстовая модель."""
 
     text = models.TextField(verbose_name='Текст')
-    pub_date = models.DateTimeField(verbose_name='Дата публикации',
-                                    auto_now_add=True,
-                                    db_index=True)
+    pub_date = CreationDateTimeField(verbose_name='Дата публикации',
+                                     auto_now_add=True,
+                                     db_index=True)
+    updated_at = models.DateTimeField(verbose_name='Дата изменения',
+                                      auto_now=True)
 
     class Meta:
         abstract = True
@@ -108,6 +261,9 @@ class Review(BaseTextModel):
     title = models.ForeignKey(
         Title, on_delete=models.CASCADE, related_name='reviews',
         verbose_name='Произведение')
+    comments_updated_at = models.DateTimeField(
+        verbose_name='Дата изменения комментариев', null=True,
+        editable=False)
 
     class Meta(BaseTextModel.Meta):
         verbose_name = 'Отзыв'
@@ -119,6 +275,18 @@ class Review(BaseTextModel):
                 name='unique_title_author'),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминание оценки из базы для пересчёта рейтинга."""
+        instance = super().from_db(db, field_names, values)
+        instance.remember_score()
+        return instance
+
+    def remember_score(self):
+        """Снимок оценки и произведения."""
+        self._loaded_score = (self.__dict__.get('title_id'),
+                              self.__dict__.get('score'))
+
 
 class Comment(BaseTextModel):
     """Комментарии."""
@@ -133,3 +301,87 @@ class Comment(BaseTextModel):
     class Meta(BaseTextModel.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+
+
+class BaseRanking(models.Model):
+    """Строка рейтинга произведений, см. reviews/rankings.py."""
+
+    score = models.FloatField(verbose_name='Байесовская оценка')
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов')
+
+    class Meta:
+        abstract = True
+
+
+class TitleRanking(BaseRanking):
+    """Рейтинг произведений: общий и по категориям."""
+
+    title = models.OneToOneField(
+        Title, on_delete=models.CASCADE, primary_key=True,
+        related_name='ranking', verbose_name='Произведение')
+    # Копия категории произведения для индексов по категории.
+    category = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, related_name='+',
+        verbose_name='Категория', null=True)
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинг произведений'
+        indexes = [
+            models.Index(fields=('-score', 'title'),
+                         name='ranking_score_idx'),
+            models.Index(fields=('-review_count', '-score', 'title'),
+                         name='ranking_reviews_idx'),
+            models.Index(fields=('category', '-score', 'title'),
+                         name='ranking_category_score_idx'),
+            models.Index(fields=('category', '-review_count', '-score',
+                                 'title'),
+                         name='ranking_category_reviews_idx'),
+        ]
+
+
+class GenreRanking(BaseRanking):
+    """Рейтинг произведений по жанрам."""
+
+    genre = models.ForeignKey(
+        Genre, on_delete=models.CASCADE, related_name='+',
+        verbose_name='Жанр')
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='+',
+        verbose_name='Произведение')
+
+    class Meta:
+        verbose_name = 'Место в рейтинге жанра'
+        verbose_name_plural = 'Рейтинг произведений по жанрам'
+        constraints = [
+            models.UniqueConstraint(fields=('genre', 'title'),
+                                    name='unique_genre_ranking'),
+        ]
+        indexes = [
+            models.Index(fields=('genre', '-score', 'title'),
+                         name='ranking_genre_score_idx'),
+            models.Index(fields=('genre', '-review_count', '-score',
+                                 'title'),
+                         name='ranking_genre_reviews_idx'),
+        ]
+
+
+class SimilarTitle(models.Model):
+    """Похожее произведение, см. reviews/similar.py."""
+
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='similar_titles',
+        verbose_name='Произведение')
+    similar = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='+',
+        verbose_name='Похожее произведение')
+    score = models.FloatField(verbose_name='Сходство')
+
+    class Meta:
+        verbose_name = 'Похожее произведение'
+        verbose_name_plural = 'Похожие произведения'
+        constraints = [
+            models.UniqueConstraint(fields=('title', 'similar'),
+                                    name='unique_similar_title'),
+        ]
@@ -0,0 +1,124 @@
+"""Рейтинги лучших произведений с байесовской оценкой.
+
+Оценка произведения с v отзывами и суммой оценок S равна
+(S + m * C) / (v + m), где C — средняя оценка всех отзывов, а m —
+LEADERBOARD_PRIOR_WEIGHT: произведение с парой высоких оценок тянется к C
+и не обгоняет произведения со многими отзывами.
+
+Строки рейтингов хранятся в TitleRanking и GenreRanking только для
+произведений не меньше чем с LEADERBOARD_MIN_REVIEWS отзывами, поэтому
+чтение рейтинга — проход по индексу с LIMIT. Сигналы пересчитывают строки
+произведения при изменении его отзывов, категории или жанров — один раз
+на произведение после фиксации транзакции; C берётся из кэша, а команда
+refresh_rankings пересчитывает C и все строки.
+"""
+
+from django.conf import settings  # type: ignore
+from django.core.cache import cache  # type: ignore
+from django.db import transaction  # type: ignore
+from django.db.models import Sum  # type: ignore
+
+from api_yamdb.db import add_on_commit
+
+from .constants import MAX_SCORE, MIN_SCORE
+from .models import GenreRanking, Title, TitleRanking
+
+PRIOR_MEAN_KEY = 'rankings:prior_mean'
+REFRESH_BATCH_SIZE = 1000
+ORDERINGS = {
+    'rating': ('-score', 'title'),
+    'reviews': ('-review_count', '-score', 'title'),
+}
+
+
+def get_prior_mean():
+    """Средняя оценка всех отзывов; без отзывов — середина шкалы."""
+    totals = Title.objects.aggregate(score_sum=Sum('score_sum'),
+                                     review_count=Sum('review_count'))
+    if not totals['review_count']:
+        return (MIN_SCORE + MAX_SCORE) / 2
+    return totals['score_sum'] / totals['review_count']
+
+
+def get_cached_prior_mean():
+    """Средняя оценка из кэша, см. LEADERBOARD_PRIOR_TIMEOUT."""
+    prior_mean = cache.get(PRIOR_MEAN_KEY)
+    if prior_mean is None:
+        prior_mean = get_prior_mean()
+        cache.set(PRIOR_MEAN_KEY, prior_mean,
+                  settings.LEADERBOARD_PRIOR_TIMEOUT)
+    return prior_mean
+
+
+def get_bayesian_score(score_sum, review_count, prior_mean):
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    return (score_sum + weight * prior_mean) / (review_count + weight)
+
+
+@transaction.atomic
+def refresh_rankings(title_ids, prior_mean=None):
+    """Пересчёт строк рейтингов произведений; число строк в рейтинге."""
+    if prior_mean is None:
+        prior_mean = get_cached_prior_mean()
+    title_ids = list(title_ids)
+    rows = (Title.objects
+            .filter(pk__in=title_ids,
+                    review_count__gte=settings.LEADERBOARD_MIN_REVIEWS)
+            .values_list('pk', 'category_id', 'score_sum', 'review_count'))
+    rankings = {
+        pk: TitleRanking(
+            title_id=pk, category_id=category_id,
+            score=get_bayesian_score(score_sum, review_count, prior_mean),
+            review_count=review_count)
+        for pk, category_id, score_sum, review_count in rows}
+    TitleRanking.objects.filter(title_id__in=title_ids).delete()
+    GenreRanking.objects.filter(title_id__in=title_ids).delete()
+    if not rankings:
+        return 0
+    TitleRanking.objects.bulk_create(rankings.values())
+    links = (Title.genre.through.objects.filter(title_id__in=rankings)
+             .values_list('title_id', 'genre_id'))
+    GenreRanking.objects.bulk_create(
+        GenreRanking(genre_id=genre_id, title_id=title_id,
+                     score=rankings[title_id].score,
+                     review_count=rankings[title_id].review_count)
+        for title_id, genre_id in links)
+    return len(rankings)
+
+
+def refresh_rankings_on_commit(title_ids, using=None):
+    """Пересчёт рейтингов после фиксации транзакции, по разу на произведение.
+
+    Удаление произведения с N отзывами пересчитывает его строки один раз,
+    а не на каждый отзыв. Вне транзакции пересчёт идёт сразу.
+    """
+    add_on_commit('pending_rankings', title_ids, refresh_rankings, using)
+
+
+def rebuild_rankings(batch_size=REFRESH_BATCH_SIZE):
+    """Пересчёт средней оценки и всех рейтингов пакетами произведений."""
+    prior_mean = get_prior_mean()
+    cache.set(PRIOR_MEAN_KEY, prior_mean, settings.LEADERBOARD_PRIOR_TIMEOUT)
+    ranked = last_id = 0
+    while True:
+        title_ids = list(Title.objects.filter(pk__gt=last_id).order_by('pk')
+                         .values_list('pk', flat=True)[:batch_size])
+        if not title_ids:
+            return ranked
+        ranked += refresh_rankings(title_ids, prior_mean)
+        last_id = title_ids[-1]
+
+
+def get_leaderboard(ordering, limit, category=None, genre=None):
+    """Первые limit строк рейтинга, общего или категории, или жанра."""
+    order_by = ORDERINGS[ordering]
+    rankings = TitleRanking.objects.select_related('title', 'category')
+    if genre is None:
+        if category is not None:
+            rankings = rankings.filter(category=category)
+        return list(rankings.order_by(*order_by)[:limit])
+    title_ids = list(GenreRanking.objects.filter(genre=genre)
+                     .order_by(*order_by)
+                     .values_list('title_id', flat=True)[:limit])
+    found = rankings.in_bulk(title_ids)
+    return [found[pk] for pk in title_ids if pk in found]
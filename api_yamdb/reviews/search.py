@@ -0,0 +1,101 @@
+"""Полнотекстовый поиск по произведениям и отзывам.
+
+На SQLite используется FTS5 с внешним содержимым: индекс хранит только
+токены, а текст читается из таблицы модели. Индекс поддерживается
+триггерами, поэтому изменения через bulk_create и update тоже учитываются.
+На других базах поиск сводится к icontains по тем же полям.
+"""
+
+import re
+
+from django.db import connections  # type: ignore
+from django.db.models import Q, Value  # type: ignore
+from django.db.models.expressions import RawSQL  # type: ignore
+
+from .models import Review, Title
+
+# Модель: поля, попадающие в индекс.
+SEARCH_FIELDS = {
+    Title: ('name', 'description'),
+    Review: ('text',),
+}
+WORD_RE = re.compile(r'\w+')
+
+
+def get_fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def uses_fts(connection):
+    return connection.vendor == 'sqlite'
+
+
+def get_index_sql(model):
+    """Создание таблицы FTS5 и триггеров синхронизации."""
+    table = model._meta.db_table
+    fts = get_fts_table(model)
+    fields = SEARCH_FIELDS[model]
+    columns = ', '.join(fields)
+    new = ', '.join(f'new.{field}' for field in fields)
+    old = ', '.join(f'old.{field}' for field in fields)
+    delete = (f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+              f"VALUES ('delete', old.id, {old});")
+    insert = f'INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new});'
+    return (
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, "
+        f"content='{table}', content_rowid='id', tokenize='unicode61')",
+        f'CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} '
+        f'BEGIN {insert} END',
+        f'CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} '
+        f'BEGIN {delete} END',
+        # Только по индексируемым полям: пересчёт рейтинга не трогает FTS.
+        f'CREATE TRIGGER {fts}_au AFTER UPDATE OF {columns} ON {table} '
+        f'BEGIN {delete} {insert} END',
+    )
+
+
+def create_search_index(using='default', rebuild=False):
+    """Создание недостающих индексов, при rebuild — полная переиндексация."""
+    connection = connections[using]
+    if not uses_fts(connection):
+        return
+    with connection.cursor() as cursor:
+        tables = set(connection.introspection.table_names(cursor))
+        for model in SEARCH_FIELDS:
+            fts = get_fts_table(model)
+            if fts not in tables:
+                for statement in get_index_sql(model):
+                    cursor.execute(statement)
+                rebuild = True
+            if rebuild:
+                cursor.execute(
+                    f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def get_match_query(query):
+    """Запрос FTS5 из слов пользователя: все слова, с поиском по префиксу."""
+    return ' '.join(f'"{word}"*' for word in WORD_RE.findall(query))
+
+
+def search(queryset, query):
+    """Отбор по запросу с оценкой релевантности в search_rank.
+
+    Чем меньше search_rank, тем выше совпадение (bm25 в FTS5).
+    """
+    match = get_match_query(query)
+    if not match:
+        return queryset.annotate(search_rank=Value(0)).none()
+    model = queryset.model
+    if not uses_fts(connections[queryset.db]):
+        condition = Q()
+        for field in SEARCH_FIELDS[model]:
+            condition |= Q(**{f'{field}__icontains': query})
+        return queryset.filter(condition).annotate(search_rank=Value(0))
+    fts = get_fts_table(model)
+    table = model._meta.db_table
+    return queryset.filter(
+        pk__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s',
+                      (match,))
+    ).annotate(search_rank=RawSQL(
+        f'SELECT rank FROM {fts} WHERE {fts} MATCH %s '
+        f'AND rowid = {table}.id', (match,)))
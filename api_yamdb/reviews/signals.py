@@ -0,0 +1,157 @@
+"""Сигналы: рейтинг, рейтинги лучших, версии списков, поиск."""
+
+from django.db.models.signals import (m2m_changed,  # type: ignore
+                                      post_delete, post_save, pre_delete)
+from django.dispatch import receiver  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from api_yamdb.db import add_on_commit, get_commit_batch
+
+from .constants import TITLES_LIST_VERSION
+from .models import (Category, Comment, Genre, GenreRanking, ListVersion,
+                     Review, Title, bulk_changed)
+from .rankings import refresh_rankings_on_commit
+from .search import create_search_index
+
+
+@receiver(post_save, sender=Review)
+def add_review_score(sender, instance, created, **kwargs):
+    """Учёт новой или изменённой оценки."""
+    old_title_id, old_score = getattr(instance, '_loaded_score',
+                                      (None, None))
+    titles = Title.objects.filter(pk=instance.title_id)
+    if created:
+        titles.change_rating(instance.score, 1)
+    elif old_title_id is None:
+        # Прежняя оценка неизвестна: пересчитываем по отзывам.
+        titles.recalculate_ratings()
+    elif old_title_id != instance.title_id:
+        Title.objects.filter(pk=old_title_id).change_rating(-old_score, -1)
+        titles.change_rating(instance.score, 1)
+    elif old_score != instance.score:
+        titles.change_rating(instance.score - old_score, 0)
+    else:
+        titles.touch_reviews()
+        instance.remember_score()
+        return
+    refresh_rankings_on_commit({old_title_id or instance.title_id,
+                                instance.title_id})
+    instance.remember_score()
+
+
+def is_deleted_with(name, pk):
+    """Удаляется ли объект pk вместе с родителем из пакета name."""
+    batch = get_commit_batch(name)
+    return batch is not None and pk in batch.items
+
+
+@receiver(pre_delete, sender=Title)
+@receiver(pre_delete, sender=Review)
+def mark_deleted_parent(sender, instance, **kwargs):
+    """Родитель удаляется: каскад не обновляет его счётчики и даты."""
+    add_on_commit(f'deleted_{sender._meta.model_name}s', [instance.pk],
+                  set.clear)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_score(sender, instance, **kwargs):
+    """Исключение оценки удалённого отзыва."""
+    if is_deleted_with('deleted_titles', instance.title_id):
+        return
+    Title.objects.filter(pk=instance.title_id).change_rating(
+        -instance.score, -1)
+    refresh_rankings_on_commit([instance.title_id])
+
+
+@receiver(post_save, sender=Title)
+def refresh_title_rankings(sender, instance, created, **kwargs):
+    """Категория в рейтингах; у нового произведения отзывов нет."""
+    if not created:
+        refresh_rankings_on_commit([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_genre_rankings(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """Жанры в рейтингах."""
+    if action not in {'post_add', 'post_remove', 'post_clear'}:
+        return
+    if not reverse:
+        refresh_rankings_on_commit([instance.pk])
+    elif action == 'post_clear':
+        GenreRanking.objects.filter(genre=instance).delete()
+    else:
+        refresh_rankings_on_commit(pk_set)
+
+
+def bump_versions(names):
+    for name in names:
+        ListVersion.objects.bump(name)
+
+
+@receiver((post_save, post_delete, bulk_changed), sender=Title)
+def bump_titles_version(sender, **kwargs):
+    """Новая версия списка произведений, в том числе после удаления.
+
+    Версия сдвигается после фиксации и один раз на транзакцию: иначе
+    каждый отзыв и каждое звено каскада писали бы одну и ту же строку.
+    """
+    add_on_commit('list_versions', [TITLES_LIST_VERSION], bump_versions)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_titles(sender, instance, created=False, **kwargs):
+    """Категория в ответе произведения: новая версия его и списка."""
+    if not created:
+        Title.objects.filter(category_id=instance.pk).update(
+            updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_genre_titles(sender, instance, created=False, **kwargs):
+    """Жанр в ответе произведения: новая версия его и списка."""
+    if not created:
+        Title.objects.filter(genre=instance).update(
+            updated_at=timezone.now())
+
+
+@receiver(bulk_changed, sender=Category)
+@receiver(bulk_changed, sender=Genre)
+def touch_all_titles(sender, **kwargs):
+    """Массовое изменение категорий или жанров: затронутые неизвестны."""
+    Title.objects.update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_title_genres(sender, instance, action, reverse, pk_set,
+                       **kwargs):
+    """Изменился состав жанров произведений."""
+    if reverse and action == 'pre_clear':
+        instance._cleared_titles = list(
+            instance.titles.values_list('pk', flat=True))
+    if action not in {'post_add', 'post_remove', 'post_clear'}:
+        return
+    if not reverse:
+        pks = [instance.pk]
+    elif action == 'post_clear':
+        pks = instance.__dict__.pop('_cleared_titles', [])
+    else:
+        pks = pk_set
+    Title.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_comments(sender, instance, **kwargs):
+    """Новая версия списка комментариев отзыва."""
+    if is_deleted_with('deleted_reviews', instance.review_id):
+        return
+    Review.objects.filter(pk=instance.review_id).update(
+        comments_updated_at=timezone.now())
+
+
+def create_search_tables(sender, using, **kwargs):
+    """Создание поискового индекса после migrate."""
+    create_search_index(using=using)
@@ -0,0 +1,211 @@
+"""Похожие произведения: «оценившие это произведение оценили и...».
+
+Оценки отзывов образуют разреженную матрицу произведения × пользователи.
+Из оценки вычитается средняя оценка её автора (скорректированный
+косинус): все оценки от 1 до 10 положительны, и без этого похожими
+оказались бы просто популярные произведения. Матрица хранится в формате
+CSR массивами NumPy в двух ориентациях — по произведениям и по
+пользователям, около 8 байт на отзыв в каждой.
+
+Сходства считаются блоками произведений: для блока копятся плотные
+матрицы скалярных произведений и числа общих оценивших размером
+блок × все произведения, а размер блока выбирается по
+SIMILAR_TITLES_MEMORY_MB. Для каждого произведения сохраняются
+SIMILAR_TITLES_COUNT ближайших соседей в SimilarTitle. Пересчёт пакетный:
+отзывы, оставленные после него, учитываются только следующим пересчётом.
+"""
+
+import numpy as np
+from django.conf import settings  # type: ignore
+from django.contrib.auth import get_user_model  # type: ignore
+from django.db import transaction  # type: ignore
+from django.db.models import Max  # type: ignore
+
+from .models import Review, SimilarTitle, Title
+
+User = get_user_model()
+
+LOAD_BATCH_SIZE = 100_000
+# Пар «отзыв блока × отзыв того же автора» за один проход bincount.
+PAIR_BATCH_SIZE = 1 << 22
+# Произведений в блоке не больше: блок записывается одной транзакцией.
+MAX_BLOCK_SIZE = 1024
+# Байт на ячейку блока: скалярные произведения (float64), общие
+# оценившие (int32) и временный результат bincount или номера argpartition
+# (по 8 байт).
+CELL_BYTES = 20
+
+
+def get_csr(rows, columns, values, row_count):
+    """Столбцы и значения, упорядоченные по строкам, и смещения строк."""
+    order = np.argsort(rows, kind='stable')
+    indptr = np.zeros(row_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=row_count), out=indptr[1:])
+    return indptr, columns[order], values[order]
+
+
+def expand_rows(indptr, rows):
+    """Позиции всех элементов строк rows и длины этих строк."""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    offsets = np.cumsum(lengths) - lengths
+    positions = (np.arange(lengths.sum(), dtype=np.int64)
+                 - np.repeat(offsets - starts, lengths))
+    return positions, lengths
+
+
+class ScoreMatrix:
+    """Центрированные оценки в CSR по произведениям и по пользователям."""
+
+    def __init__(self, title_ids, title_index, user_index, scores):
+        self.title_ids = title_ids
+        user_count = int(user_index.max()) + 1 if len(user_index) else 0
+        user_totals = np.bincount(user_index, weights=scores,
+                                  minlength=user_count)
+        user_reviews = np.bincount(user_index, minlength=user_count)
+        values = (scores - (user_totals / np.maximum(user_reviews, 1))
+                  [user_index]).astype(np.float32)
+        self.norms = np.sqrt(np.bincount(
+            title_index, weights=values.astype(np.float64) ** 2,
+            minlength=len(title_ids)))
+        self.title_indptr, self.title_users, self.title_values = get_csr(
+            title_index, user_index, values, len(title_ids))
+        self.user_indptr, self.user_titles, self.user_values = get_csr(
+            user_index, title_index, values, user_count)
+
+    def get_block_size(self, memory_mb):
+        """Произведений в блоке, чтобы блок уместился в memory_mb."""
+        cells = memory_mb * 2 ** 20 // CELL_BYTES
+        return max(1, min(MAX_BLOCK_SIZE, cells // max(len(self.title_ids),
+                                                       1)))
+
+    def get_products(self, start, stop):
+        """Скалярные произведения и числа общих оценивших для блока."""
+        title_count = len(self.title_ids)
+        size = (stop - start) * title_count
+        products = np.zeros(size)
+        common = np.zeros(size, dtype=np.int32)
+        first, last = self.title_indptr[start], self.title_indptr[stop]
+        users = self.title_users[first:last]
+        values = self.title_values[first:last]
+        rows = np.repeat(np.arange(stop - start, dtype=np.int64),
+                         np.diff(self.title_indptr[start:stop + 1]))
+        # Отзывы блока обходятся частями, чтобы пары не превышали
+        # PAIR_BATCH_SIZE; отзыв автора с огромным числом оценок идёт один.
+        pairs = np.cumsum(self.user_indptr[users + 1]
+                          - self.user_indptr[users])
+        done = begin = 0
+        while begin < len(users):
+            end = max(begin + 1, int(np.searchsorted(
+                pairs, done + PAIR_BATCH_SIZE, side='right')))
+            positions, lengths = expand_rows(self.user_indptr,
+                                             users[begin:end])
+            cells = (np.repeat(rows[begin:end], lengths) * title_count
+                     + self.user_titles[positions])
+            products += np.bincount(
+                cells, minlength=size,
+                weights=(np.repeat(values[begin:end], lengths)
+                         * self.user_values[positions]))
+            common += np.bincount(cells, minlength=size)
+            done = int(pairs[end - 1])
+            begin = end
+        return (products.reshape(stop - start, title_count),
+                common.reshape(stop - start, title_count))
+
+    def get_neighbours(self, start, stop, count, min_common):
+        """Пары (произведение, похожее, сходство) для блока."""
+        count = min(count, len(self.title_ids) - 1)
+        if count < 1:
+            return []
+        # Сходства считаются на месте скалярных произведений и хранятся
+        # со знаком минус: argpartition ищет наименьшие.
+        distances, common = self.get_products(start, stop)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distances /= self.norms[start:stop, None]
+            distances /= -self.norms
+        distances[~(common >= min_common) | ~(distances < 0)] = np.inf
+        del common
+        distances[np.arange(stop - start), np.arange(start, stop)] = np.inf
+        best = np.argpartition(distances, count - 1, axis=1)[:, :count]
+        best_distances = np.take_along_axis(distances, best, axis=1)
+        neighbours = []
+        for row, (columns, row_distances) in enumerate(
+                zip(best, best_distances)):
+            title_id = int(self.title_ids[start + row])
+            neighbours += [
+                (title_id, int(self.title_ids[column]), -float(distance))
+                for distance, column in sorted(zip(row_distances, columns))
+                if distance < np.inf]
+        return neighbours
+
+
+def get_index(ids, values):
+    """Номера values в отсортированном ids; -1 для отсутствующих."""
+    index = np.searchsorted(ids, values)
+    found = index < len(ids)
+    found[found] = ids[index[found]] == values[found]
+    return np.where(found, index, -1)
+
+
+def load_scores(batch_size=LOAD_BATCH_SIZE):
+    """Матрица оценок всех отзывов, прочитанных пакетами по pk."""
+    last_review = Review.objects.aggregate(last=Max('pk'))['last'] or 0
+    title_ids = np.fromiter(
+        Title.objects.order_by('pk').values_list('pk', flat=True),
+        dtype=np.int64)
+    user_ids = np.fromiter(
+        User.objects.order_by('pk').values_list('pk', flat=True),
+        dtype=np.int64)
+    size = Review.objects.filter(pk__lte=last_review).count()
+    title_index = np.empty(size, dtype=np.int32)
+    user_index = np.empty(size, dtype=np.int32)
+    scores = np.empty(size, dtype=np.float32)
+    loaded = last_id = 0
+    while loaded < size:
+        rows = np.array(
+            Review.objects.filter(pk__gt=last_id, pk__lte=last_review)
+            .order_by('pk')
+            .values_list('pk', 'title_id', 'author_id', 'score')
+            [:min(batch_size, size - loaded)], dtype=np.int64)
+        if not len(rows):
+            break
+        last_id = int(rows[-1, 0])
+        titles = get_index(title_ids, rows[:, 1])
+        users = get_index(user_ids, rows[:, 2])
+        # Отзывы, чьи произведение или автор удалены во время чтения.
+        kept = (titles >= 0) & (users >= 0)
+        end = loaded + int(kept.sum())
+        title_index[loaded:end] = titles[kept]
+        user_index[loaded:end] = users[kept]
+        scores[loaded:end] = rows[kept, 3]
+        loaded = end
+    return ScoreMatrix(title_ids, title_index[:loaded],
+                       user_index[:loaded], scores[:loaded])
+
+
+def build_similar_titles(count=None, min_common=None, memory_mb=None,
+                         batch_size=LOAD_BATCH_SIZE):
+    """Пересчёт похожих произведений; число сохранённых пар."""
+    if count is None:
+        count = settings.SIMILAR_TITLES_COUNT
+    if min_common is None:
+        min_common = settings.SIMILAR_TITLES_MIN_COMMON
+    if memory_mb is None:
+        memory_mb = settings.SIMILAR_TITLES_MEMORY_MB
+    matrix = load_scores(batch_size)
+    block_size = matrix.get_block_size(memory_mb)
+    saved = 0
+    for start in range(0, len(matrix.title_ids), block_size):
+        stop = min(start + block_size, len(matrix.title_ids))
+        neighbours = matrix.get_neighbours(start, stop, count, min_common)
+        with transaction.atomic():
+            SimilarTitle.objects.filter(
+                title_id__gte=int(matrix.title_ids[start]),
+                title_id__lte=int(matrix.title_ids[stop - 1])).delete()
+            SimilarTitle.objects.bulk_create(
+                (SimilarTitle(title_id=title_id, similar_id=similar_id,
+                              score=score)
+                 for title_id, similar_id, score in neighbours),
+                batch_size=batch_size)
+        saved += len(neighbours)
+    return saved
@@ -1,9 +1,10 @@
 from django.contrib import admin  # type: ignore
 from django.contrib.auth.admin import UserAdmin  # type: ignore
 
-from users.models import YamdbUser
+from users.models import OutgoingEmail, YamdbUser
 
 UserAdmin.fieldsets += (
     ('Extra Fields', {'fields': ('bio', 'role')}),
 )
 admin.site.register(YamdbUser, UserAdmin)
+admin.site.register(OutgoingEmail)
@@ -2,3 +2,16 @@
 
 NAME_MAX_LENGTH: int = 150
 EMAIL_MAX_LENGTH: int = 254
+
+# Поля пользователя, от которых зависят права по токену доступа.
+TOKEN_FIELDS: tuple = ('role', 'is_superuser', 'is_active')
+TOKEN_VERSION_CACHE_KEY: str = 'user-token-version:{}'
+
+# Очередь писем.
+EMAIL_SUBJECT_MAX_LENGTH: int = 255
+EMAIL_BATCH_SIZE: int = 100
+EMAIL_MAX_ATTEMPTS: int = 5
+EMAIL_RETRY_DELAY: int = 30
+EMAIL_MAX_RETRY_DELAY: int = 3600
+# Захват письма отправителем истекает, если процесс упал, секунд.
+EMAIL_CLAIM_TIMEOUT: int = 600
@@ -0,0 +1,110 @@
+"""Отправка писем из очереди."""
+
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection  # type: ignore
+from django.core.management.base import BaseCommand  # type: ignore
+from django.db.models import Q  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from users.constants import (EMAIL_BATCH_SIZE, EMAIL_CLAIM_TIMEOUT,
+                             EMAIL_MAX_ATTEMPTS, EMAIL_MAX_RETRY_DELAY,
+                             EMAIL_RETRY_DELAY)
+from users.models import OutgoingEmail
+
+
+def get_retry_delay(attempts):
+    """Экспоненциальная пауза перед повтором."""
+    return timedelta(seconds=min(EMAIL_RETRY_DELAY * 2 ** (attempts - 1),
+                                 EMAIL_MAX_RETRY_DELAY))
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди пакетами через одно соединение '
+            'с повторами и нарастающей паузой.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            default=EMAIL_BATCH_SIZE,
+                            help='Писем за одно соединение.')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='Пауза при пустой очереди, секунд.')
+        parser.add_argument('--once', action='store_true',
+                            help='Отправить готовые письма и завершиться.')
+
+    def handle(self, *args, **options):
+        """Разбор очереди."""
+        while True:
+            processed = self.send_batch(options['batch_size'])
+            if processed:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+    def get_due(self, now):
+        """Письма, готовые к отправке и не захваченные другим процессом."""
+        return OutgoingEmail.objects.filter(
+            Q(claimed_at__isnull=True)
+            | Q(claimed_at__lt=now - timedelta(seconds=EMAIL_CLAIM_TIMEOUT)),
+            sent_at__isnull=True,
+            send_after__lte=now,
+            attempts__lt=EMAIL_MAX_ATTEMPTS,
+        )
+
+    def claim(self, batch_size):
+        """Захват пакета писем.
+
+        UPDATE повторяет условия выборки, поэтому письмо, которое успел
+        захватить параллельный запуск, в пакет не попадёт.
+        """
+        now = timezone.now()
+        pks = list(self.get_due(now).order_by('send_after')
+                   .values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return []
+        claim = uuid.uuid4()
+        self.get_due(now).filter(pk__in=pks).update(claim=claim,
+                                                    claimed_at=now)
+        return list(OutgoingEmail.objects.filter(claim=claim)
+                    .order_by('send_after'))
+
+    def send_batch(self, batch_size):
+        """Отправка пакета. Возвращает число обработанных писем."""
+        emails = self.claim(batch_size)
+        if not emails:
+            return 0
+        sent, failed = [], []
+        try:
+            with get_connection() as connection:
+                for email in emails:
+                    try:
+                        EmailMessage(email.subject, email.body,
+                                     email.from_email, (email.to,),
+                                     connection=connection).send()
+                    except Exception as error:
+                        failed.append((email, error))
+                    else:
+                        sent.append(email.pk)
+        except Exception as error:
+            # Соединение не открылось или оборвалось: остаток пакета
+            # уходит на повтор.
+            done = set(sent) | {email.pk for email, _ in failed}
+            failed += [(email, error) for email in emails
+                       if email.pk not in done]
+        now = timezone.now()
+        OutgoingEmail.objects.filter(pk__in=sent).update(
+            sent_at=now, claim=None, claimed_at=None)
+        for email, error in failed:
+            email.attempts += 1
+            email.last_error = repr(error)
+            email.send_after = now + get_retry_delay(email.attempts)
+            email.claim = email.claimed_at = None
+        OutgoingEmail.objects.bulk_update(
+            [email for email, _ in failed],
+            ('attempts', 'last_error', 'send_after', 'claim', 'claimed_at'))
+        self.stdout.write(
+            f'Отправлено писем: {len(sent)}, ошибок: {len(failed)}.')
+        return len(emails)
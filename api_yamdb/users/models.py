@@ -3,12 +3,17 @@
 import re
 
 from django.db import models  # type: ignore
-from django.contrib.auth.models import AbstractUser  # type: ignore
+from django.contrib.auth.models import (AbstractUser,  # type: ignore
+                                        UserManager)
+from django.core.cache import cache  # type: ignore
 from django.core.validators import MaxLengthValidator  # type: ignore
 from django.utils.translation import gettext_lazy as _  # type: ignore
 from django.core.exceptions import ValidationError  # type: ignore
+from django.utils import timezone  # type: ignore
 
-from .constants import (EMAIL_MAX_LENGTH, NAME_MAX_LENGTH)
+from .constants import (EMAIL_MAX_LENGTH, EMAIL_SUBJECT_MAX_LENGTH,
+                        NAME_MAX_LENGTH, TOKEN_FIELDS,
+                        TOKEN_VERSION_CACHE_KEY)
 
 
 class Role(models.TextChoices):
@@ -51,6 +56,28 @@ def validate_email(email):
     return email
 
 
+def forget_token_versions(pks):
+    """Сброс версий токенов в кэше, см. api/authentication.py."""
+    cache.delete_many([TOKEN_VERSION_CACHE_KEY.format(pk) for pk in pks])
+
+
+class YamdbUserQuerySet(models.QuerySet):
+    """Пользователи: смена прав через update тоже отзывает токены."""
+
+    def update(self, **kwargs):
+        if not any(field in kwargs for field in TOKEN_FIELDS):
+            return super().update(**kwargs)
+        pks = list(self.values_list('pk', flat=True))
+        kwargs['token_version'] = models.F('token_version') + 1
+        rows = self.model._base_manager.filter(pk__in=pks).update(**kwargs)
+        forget_token_versions(pks)
+        return rows
+
+
+class YamdbUserManager(UserManager.from_queryset(YamdbUserQuerySet)):
+    """Менеджер пользователей."""
+
+
 class YamdbUser(AbstractUser):
     """Модель пользователя."""
 
@@ -91,6 +118,14 @@ class YamdbUser(AbstractUser):
         validators=(MaxLengthValidator,),
         default=Role.USER,
     )
+    # Растёт при смене прав: токены с прежней версией сверяются с базой.
+    token_version = models.PositiveIntegerField(
+        verbose_name='Версия токенов',
+        default=0,
+        editable=False,
+    )
+
+    objects = YamdbUserManager()
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -100,6 +135,43 @@ class YamdbUser(AbstractUser):
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминание прав из базы, чтобы заметить их смену."""
+        instance = super().from_db(db, field_names, values)
+        instance.remember_token_fields()
+        instance.remember_username()
+        return instance
+
+    def remember_username(self):
+        """Снимок логина: он попадает в ответы отзывов и комментариев."""
+        self._loaded_username = self.__dict__.get('username')
+
+    def remember_token_fields(self):
+        """Снимок полей, от которых зависят права по токену."""
+        self._loaded_token_fields = tuple(
+            self.__dict__.get(field) for field in TOKEN_FIELDS)
+
+    def save(self, *args, **kwargs):
+        """Сохранение; смена прав увеличивает версию токенов."""
+        loaded = getattr(self, '_loaded_token_fields', None)
+        revoked = not self._state.adding and loaded is not None and (
+            loaded != tuple(self.__dict__.get(field)
+                            for field in TOKEN_FIELDS))
+        update_fields = kwargs.get('update_fields')
+        if revoked and update_fields is not None:
+            revoked = not set(update_fields).isdisjoint(TOKEN_FIELDS)
+            if revoked:
+                kwargs['update_fields'] = [*update_fields, 'token_version']
+        if revoked:
+            self.token_version = models.F('token_version') + 1
+        super().save(*args, **kwargs)
+        if revoked:
+            self.refresh_from_db(fields=('token_version',))
+            forget_token_versions((self.pk,))
+        if update_fields is None or revoked:
+            self.remember_token_fields()
+
     @property
     def is_superuser_or_admin(self):
         return self.is_superuser or self.role == Role.ADMIN
@@ -119,3 +191,74 @@ class YamdbUser(AbstractUser):
     @property
     def is_user(self):
         return self.role == Role.USER
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку.
+
+    Запрос только сохраняет письмо, отправляет его команда send_emails.
+    """
+
+    subject = models.CharField(
+        verbose_name='Тема',
+        max_length=EMAIL_SUBJECT_MAX_LENGTH,
+    )
+    body = models.TextField(
+        verbose_name='Текст',
+    )
+    from_email = models.EmailField(
+        verbose_name='Отправитель',
+        max_length=EMAIL_MAX_LENGTH,
+    )
+    to = models.EmailField(
+        verbose_name='Получатель',
+        max_length=EMAIL_MAX_LENGTH,
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Создано',
+        auto_now_add=True,
+    )
+    send_after = models.DateTimeField(
+        verbose_name='Отправить после',
+        default=timezone.now,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток отправки',
+        default=0,
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True,
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='Отправлено',
+        null=True,
+        blank=True,
+    )
+    # Захват письма процессом send_emails, чтобы параллельные запуски
+    # не отправили его дважды.
+    claim = models.UUIDField(
+        verbose_name='Захвачено отправителем',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    claimed_at = models.DateTimeField(
+        verbose_name='Время захвата',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('send_after',)
+        indexes = [
+            # Выборка очереди: неотправленные по времени отправки.
+            models.Index(fields=('sent_at', 'send_after'),
+                         name='outgoing_email_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
@@ -0,0 +1,112 @@
+import pytest
+
+from reviews.models import Category, Genre, Title
+from tests.utils import create_comments
+
+# Версия списка для ETag по первичному ключу, COUNT для пагинации,
+# произведения с категориями, жанры.
+TITLES_LIST_QUERIES = 4
+# Произведение с категорией, жанры.
+TITLE_DETAIL_QUERIES = 2
+# Родитель для версии списка, COUNT, страница с именами авторов.
+TEXTS_LIST_QUERIES = 3
+# Объект по id с проверкой родителей в том же запросе.
+TEXT_DETAIL_QUERIES = 1
+
+
+def create_titles_bulk(count):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name='Ужасы', slug='horror'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    for idx in range(count):
+        title = Title.objects.create(name=f'Произведение {idx}', year=2000,
+                                     category=category)
+        title.genre.set(genres)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08Queries:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.mark.parametrize('page_size', (1, 10, 100))
+    def test_01_titles_list_queries(self, client, page_size,
+                                    django_assert_num_queries):
+        create_titles_bulk(page_size)
+        with django_assert_num_queries(TITLES_LIST_QUERIES):
+            response = client.get(self.TITLES_URL)
+        results = response.json()['results']
+        assert len(results) == page_size, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` возвращает '
+            'все созданные произведения.'
+        )
+        assert all(len(title['genre']) == 2 and title['category']
+                   for title in results), (
+            f'Проверьте, что ответ на GET-запрос к `{self.TITLES_URL}` '
+            'содержит жанры и категорию каждого произведения.'
+        )
+
+    def test_02_title_detail_queries(self, client,
+                                     django_assert_num_queries):
+        create_titles_bulk(1)
+        title = Title.objects.get()
+        with django_assert_num_queries(TITLE_DETAIL_QUERIES):
+            response = client.get(f'{self.TITLES_URL}{title.id}/')
+        assert len(response.json()['genre']) == 2, (
+            'Проверьте, что ответ на GET-запрос к произведению содержит '
+            'его жанры.'
+        )
+
+    def test_03_titles_sparse_fieldset(self, client,
+                                       django_assert_num_queries):
+        create_titles_bulk(10)
+        # Без запроса жанров и без присоединения категорий.
+        with django_assert_num_queries(TITLES_LIST_QUERIES - 1):
+            response = client.get(f'{self.TITLES_URL}?fields=id,name,rating')
+        results = response.json()['results']
+        assert all(set(title) == {'id', 'name', 'rating'}
+                   for title in results), (
+            'Проверьте, что параметр `fields` оставляет в ответе только '
+            'перечисленные поля.'
+        )
+        response = client.get(f'{self.TITLES_URL}?omit=genre,description')
+        assert set(response.json()['results'][0]) == {
+            'id', 'name', 'year', 'rating', 'category'}, (
+            'Проверьте, что параметр `omit` убирает перечисленные поля.'
+        )
+        response = client.get(f'{self.TITLES_URL}?fields=id,unknown')
+        assert response.status_code == 400, (
+            'Проверьте, что запрос неизвестного поля возвращает статус 400.'
+        )
+
+    def test_04_reviews_and_comments_queries(self, client, admin_client,
+                                             admin, user_client, user,
+                                             django_assert_num_queries):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        reviews_url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        for url in (reviews_url, comments_url):
+            with django_assert_num_queries(TEXTS_LIST_QUERIES):
+                response = client.get(url)
+            assert response.json()['count'] == 2, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает все '
+                'объекты.'
+            )
+        for url in (f'{reviews_url}{reviews[0]["id"]}/',
+                    f'{comments_url}{comments[0]["id"]}/'):
+            with django_assert_num_queries(TEXT_DETAIL_QUERIES):
+                response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает объект.'
+            )
+        url = (f'{self.TITLES_URL}{titles[1]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/{comments[0]["id"]}/')
+        with django_assert_num_queries(TEXT_DETAIL_QUERIES):
+            response = client.get(url)
+        assert response.status_code == 404, (
+            'Проверьте, что комментарий к отзыву другого произведения '
+            'не найден.'
+        )
@@ -0,0 +1,59 @@
+import io
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09JSON:
+
+    def test_01_renderer_output(self, client, admin_client, admin,
+                                user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        review_id = reviews[0]['id']
+        for url in ('/api/v1/titles/', reviews_url,
+                    f'{reviews_url}{review_id}/comments/',
+                    '/api/v1/users/?pagination=cursor'):
+            response = admin_client.get(url)
+            assert response.content == JSONRenderer().render(
+                response.data), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` совпадает '
+                'побайтно с выводом JSONRenderer.'
+            )
+
+    @pytest.mark.parametrize('data', (
+        {'text': 'Строка\u2028с разделителем\u2029', 'score': 10},
+        [1, 2.5, None, True, {'1': []}],
+        {'big': 2 ** 70},
+    ), ids=('separators', 'types', 'big-int'))
+    def test_02_renderer_edge_cases(self, data):
+        assert (FastJSONRenderer().render(data)
+                == JSONRenderer().render(data)), (
+            'Проверьте, что FastJSONRenderer выводит те же байты, что и '
+            'JSONRenderer.'
+        )
+
+    @pytest.mark.parametrize('body', (
+        b'{"text": "\xd0\xbe\xd1\x82\xd0\xb7\xd1\x8b\xd0\xb2", "score": 7}',
+        b'[1, 2.5, null, 4611686018427387904, -1e-07]',
+        b'{"text": ',
+        b'NaN',
+    ), ids=('utf-8', 'numbers', 'broken', 'nan'))
+    def test_03_parser(self, body):
+        def parse(parser):
+            try:
+                return parser.parse(io.BytesIO(body))
+            except ParseError as error:
+                return str(error.detail)
+        assert parse(FastJSONParser()) == parse(JSONParser()), (
+            'Проверьте, что FastJSONParser разбирает тело запроса и '
+            'сообщает об ошибках так же, как JSONParser.'
+        )
@@ -0,0 +1,62 @@
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from api.serializers import CommentSerializer, ReviewSerializer
+from api.values import ValuesReader
+from reviews.models import Comment, Review
+from tests.utils import create_comments
+
+
+def make_context(url):
+    request = APIRequestFactory().get(url)
+    request.query_params = request.GET
+    return {'request': request}
+
+
+def serialize(serializer_class, queryset, url='/'):
+    return serializer_class(queryset, many=True,
+                            context=make_context(url)).data
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10ValuesReader:
+
+    @pytest.mark.parametrize('url', ('/', '/?fields=author,id',
+                                     '/?omit=text'))
+    @pytest.mark.parametrize('serializer_class,model', (
+        (ReviewSerializer, Review), (CommentSerializer, Comment)))
+    def test_01_reader_matches_serializer(self, admin_client, admin,
+                                          user_client, user,
+                                          serializer_class, model, url):
+        create_comments(admin_client, {admin: admin_client,
+                                       user: user_client})
+        queryset = model.objects.order_by('-pub_date')
+        expected = serialize(serializer_class, queryset, url)
+        reader = ValuesReader(serializer_class(context=make_context(url)))
+        result = [reader.represent(row) for row in reader.values(queryset)]
+        assert [list(row.items()) for row in result] == [
+            list(row.items()) for row in expected], (
+            f'Проверьте, что ValuesReader для {serializer_class.__name__} '
+            'отдаёт те же поля, в том же порядке и с теми же значениями, '
+            'что и сериализатор.'
+        )
+
+    @pytest.mark.parametrize('query', ('', '?pagination=cursor',
+                                       '?fields=id,pub_date'))
+    def test_02_list_matches_serializer(self, client, admin_client, admin,
+                                        user_client, user, query):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        for url, serializer_class, queryset in (
+                (reviews_url, ReviewSerializer,
+                 Review.objects.filter(title_id=titles[0]['id'])),
+                (comments_url, CommentSerializer,
+                 Comment.objects.filter(review_id=reviews[0]['id']))):
+            response = client.get(f'{url}{query}')
+            assert response.json()['results'] == serialize(
+                serializer_class, queryset.order_by('-pub_date'), query), (
+                f'Проверьте, что список `{url}{query}` совпадает с выводом '
+                f'{serializer_class.__name__}.'
+            )
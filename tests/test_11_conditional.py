@@ -0,0 +1,156 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+
+from reviews.constants import TITLES_LIST_VERSION
+from reviews.models import Genre, ListVersion, Review, Title
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11Conditional:
+
+    def test_01_reviews_not_modified(self, client, admin_client, admin,
+                                     user_client, user, moderator_client,
+                                     django_assert_max_num_queries):
+        _, _, titles = create_comments(admin_client,
+                                       {admin: admin_client,
+                                        user: user_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag and response.has_header('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки ETag и Last-Modified.'
+        )
+        with django_assert_max_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            'If-None-Match возвращает 304 за один запрос к базе.'
+        )
+        create_single_review(moderator_client, titles[0]['id'], 'Новый', 3)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после нового отзыва список отзывов '
+            'возвращается заново.'
+        )
+        assert response['ETag'] != etag
+
+    def test_02_comments_and_objects(self, client, admin_client, admin,
+                                     user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client})
+        review_url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+                      f'{reviews[0]["id"]}/')
+        comment_url = f'{review_url}comments/{comments[0]["id"]}/'
+        urls = (f'{review_url}comments/', comment_url, review_url,
+                f'/api/v1/titles/{titles[0]["id"]}/', '/api/v1/titles/')
+        etags = {url: client.get(url)['ETag'] for url in urls}
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                'If-None-Match возвращает 304.'
+            )
+        admin_client.patch(comment_url, data={'text': 'Правка'})
+        for url in urls[:2]:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после правки комментария `{url}` '
+                'возвращается заново.'
+            )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        user_review_url = f'{reviews_url}{reviews[1]["id"]}/'
+        etags = {url: client.get(url)['ETag']
+                 for url in (*urls, reviews_url, user_review_url)}
+        user.last_login = user.date_joined
+        user.save()
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                'Проверьте, что сохранение пользователя без смены логина '
+                'не меняет версии отзывов и комментариев.'
+            )
+        admin_client.patch(f'/api/v1/users/{user.username}/',
+                           data={'username': 'renamed'})
+        for url in (user_review_url, f'{review_url}comments/', reviews_url):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после смены логина автора `{url}` '
+                'возвращается заново.'
+            )
+        response = client.get(review_url,
+                              HTTP_IF_NONE_MATCH=etags[review_url])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что смена логина не меняет версии чужих отзывов.'
+        )
+
+    def test_03_titles_list_version(self, client, admin_client,
+                                    django_assert_num_queries):
+        _, _, titles = create_comments(admin_client, {})
+        url = '/api/v1/titles/'
+        response = client.get(url)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        time.sleep(1)
+        admin_client.delete(f'{url}{titles[0]["id"]}/')
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления произведения запрос с '
+            'If-Modified-Since возвращает список заново.'
+        )
+        assert response['ETag'] != etag
+        etag = response['ETag']
+        cache.clear()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что версия списка хранится в базе и не зависит '
+            'от кэша процесса.'
+        )
+        Genre.objects.filter(slug=titles[1]['genre'][0]).update(
+            name='Новое имя')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение жанров меняет версию списка '
+            'произведений.'
+        )
+
+    def test_04_titles_version_once_per_transaction(self, admin, user,
+                                                    moderator):
+        title = Title.objects.create(name='Произведение', year=2000)
+        _, version = ListVersion.objects.get_state(TITLES_LIST_VERSION)
+        with transaction.atomic():
+            for author in (admin, user, moderator):
+                Review.objects.create(title=title, author=author,
+                                      text='Отзыв', score=5)
+            assert ListVersion.objects.get_state(
+                TITLES_LIST_VERSION)[1] == version, (
+                'Проверьте, что версия списка произведений сдвигается '
+                'после фиксации транзакции.'
+            )
+        assert ListVersion.objects.get_state(
+            TITLES_LIST_VERSION)[1] == version + 1, (
+            'Проверьте, что версия списка произведений сдвигается один раз '
+            'на транзакцию.'
+        )
+
+    def test_05_title_not_modified_query(self, client, admin_client,
+                                         django_assert_max_num_queries):
+        _, _, titles = create_comments(admin_client, {})
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        with django_assert_max_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что ответ 304 на запрос произведения стоит одного '
+            'запроса к базе, без загрузки произведения и жанров.'
+        )
+        assert client.get('/api/v1/titles/100500/').status_code == (
+            HTTPStatus.NOT_FOUND)
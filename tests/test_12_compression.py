@@ -0,0 +1,81 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory
+
+from api_yamdb.middleware import CompressionMiddleware
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Compression:
+
+    def test_01_compressed_page(self, client, admin_client, admin,
+                                user_client, user, settings):
+        settings.COMPRESSION_MIN_SIZE = 100
+        _, titles = create_reviews(admin_client, {admin: admin_client,
+                                                  user: user_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        plain = client.get(url)
+        response = client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+        assert response['Content-Encoding'] == 'gzip', (
+            f'Проверьте, что ответ на GET-запрос к `{url}` с Accept-Encoding: '
+            'gzip сжимается.'
+        )
+        assert json.loads(gzip.decompress(response.content)) == plain.json()
+        assert 'Accept-Encoding' in response['Vary']
+        assert not plain.has_header('Content-Encoding'), (
+            'Проверьте, что без Accept-Encoding ответ не сжимается.'
+        )
+        response = client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0, *')
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что gzip с q=0 не используется.'
+        )
+
+    def test_02_threshold(self, client, settings):
+        settings.COMPRESSION_MIN_SIZE = 10 ** 6
+        response = client.get('/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip')
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что ответы меньше COMPRESSION_MIN_SIZE не сжимаются.'
+        )
+
+    def test_03_html_not_compressed(self, client, settings):
+        settings.COMPRESSION_MIN_SIZE = 100
+        response = client.get('/admin/login/', HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Type'].startswith('text/html')
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что страницы HTML с токеном CSRF не сжимаются.'
+        )
+
+    def test_04_streaming(self):
+        chunks = [f'{{"id": {idx}}}\n'.encode() for idx in range(1000)]
+        middleware = CompressionMiddleware(
+            lambda request: StreamingHttpResponse(
+                iter(chunks), content_type='application/x-ndjson'))
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = middleware(request)
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(
+            b''.join(response.streaming_content)) == b''.join(chunks), (
+            'Проверьте, что потоковые ответы сжимаются целиком.'
+        )
+
+    def test_05_not_modified_etag(self, client, admin_client, admin,
+                                  user_client, user, settings):
+        settings.COMPRESSION_MIN_SIZE = 100
+        create_reviews(admin_client, {admin: admin_client,
+                                      user: user_client})
+        url = '/api/v1/titles/'
+        response = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip'
+        etag = response['ETag']
+        response = client.get(url, HTTP_ACCEPT_ENCODING='gzip',
+                              HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response['ETag'] == etag, (
+            'Проверьте, что ответ 304 несёт тот же ETag, что и сжатый '
+            'ответ 200.'
+        )
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Export:
+
+    URL_TEMPLATE = '/api/v1/export/{name}.{file_format}'
+
+    def test_01_permissions(self, client, user_client):
+        url = self.URL_TEMPLATE.format(name='titles', file_format='csv')
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что `{url}` недоступен анонимному пользователю.'
+        )
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{url}` доступен только администратору.'
+        )
+
+    def test_02_ndjson_and_csv(self, admin_client, admin, user_client,
+                               user):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client,
+                                                        user: user_client})
+        expected = {
+            'titles': {title['id']: title for title in titles},
+            'reviews': {review['id']: review for review in reviews},
+        }
+        for name, objects in expected.items():
+            url = self.URL_TEMPLATE.format(name=name, file_format='ndjson')
+            response = admin_client.get(url, HTTP_ACCEPT='text/csv')
+            assert response.streaming, (
+                f'Проверьте, что `{url}` отдаёт потоковый ответ.'
+            )
+            rows = [json.loads(line) for line in b''.join(
+                response.streaming_content).splitlines()]
+            assert {row['id'] for row in rows} == set(objects), (
+                f'Проверьте, что `{url}` выгружает все объекты.'
+            )
+            url = self.URL_TEMPLATE.format(name=name, file_format='csv')
+            response = admin_client.get(url)
+            table = list(csv.DictReader(io.StringIO(b''.join(
+                response.streaming_content).decode())))
+            assert {int(row['id']) for row in table} == set(objects), (
+                f'Проверьте, что `{url}` выгружает все объекты.'
+            )
+        url = self.URL_TEMPLATE.format(name='titles', file_format='ndjson')
+        rows = {row['id']: row for row in map(json.loads, b''.join(
+            admin_client.get(url).streaming_content).splitlines())}
+        for title in titles:
+            row = rows[title['id']]
+            assert (row['genre'], row['category']) == (
+                sorted(title['genre']), title['category']), (
+                'Проверьте, что выгрузка произведений содержит жанры и '
+                'категорию.'
+            )
+        assert rows[titles[0]['id']]['rating'] == 5, (
+            'Проверьте, что выгрузка произведений содержит рейтинг.'
+        )
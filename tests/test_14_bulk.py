@@ -0,0 +1,163 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title, bulk_changed
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14BulkTitles:
+
+    URL = '/api/v1/titles/bulk/'
+
+    def make_items(self, count, genres, categories):
+        return [{
+            'name': f'Произведение {number}',
+            'year': 2000 + number % 20,
+            'genre': [genres[number % 3]['slug'], genres[0]['slug']],
+            'category': categories[number % 2]['slug'],
+        } for number in range(count)]
+
+    def test_01_permissions(self, client, user_client):
+        response = client.post(self.URL, data='[]',
+                               content_type='application/json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что `{self.URL}` недоступен анонимному пользователю.'
+        )
+        response = user_client.post(self.URL, data=[], format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.URL}` доступен только администратору.'
+        )
+
+    def test_02_create_and_update(self, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        items = self.make_items(3, genres, categories) + [
+            {'id': titles[0]['id'], 'name': 'Терминатор 2',
+             'genre': [genres[2]['slug']]},
+            {'id': titles[1]['id'], 'year': 1990},
+        ]
+        response = admin_client.post(self.URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что корректный пакет для `{self.URL}` '
+            'возвращает статус 201.'
+        )
+        data = response.json()
+        assert [title['name'] for title in data] == [
+            'Произведение 0', 'Произведение 1', 'Произведение 2',
+            'Терминатор 2', 'Крепкий орешек'], (
+            f'Проверьте, что `{self.URL}` возвращает произведения '
+            'в порядке пакета.'
+        )
+        for title, item in zip(data[:3], items):
+            detail = admin_client.get(f'/api/v1/titles/{title["id"]}/').json()
+            assert detail == title, (
+                'Проверьте, что созданные пакетом произведения доступны '
+                'по своему id.'
+            )
+            assert sorted(genre['slug'] for genre in title['genre']) == (
+                sorted(set(item['genre']))), (
+                'Проверьте, что пакет записывает жанры произведений.'
+            )
+        assert [genre['slug'] for genre in data[3]['genre']] == [
+            genres[2]['slug']], (
+            'Проверьте, что переданные жанры заменяют прежние.'
+        )
+        assert (data[4]['year'], len(data[4]['genre'])) == (1990, 1), (
+            'Проверьте, что без жанров в элементе прежние жанры '
+            'сохраняются.'
+        )
+
+    def test_03_item_errors(self, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        items = self.make_items(2, genres, categories) + [
+            {'name': 'Без категории', 'year': 2000, 'genre': ['horror'],
+             'category': 'unknown'},
+            {'id': 10 ** 6, 'name': 'Нет такого'},
+            {'name': 'Без года', 'genre': ['unknown'], 'category': 'films'},
+        ]
+        response = admin_client.post(self.URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что пакет с ошибками для `{self.URL}` '
+            'возвращает статус 400.'
+        )
+        errors = response.json()['errors']
+        assert errors[:2] == [{}, {}], (
+            'Проверьте, что у корректных элементов пакета нет ошибок.'
+        )
+        assert set(errors[2]) == {'category'}, (
+            'Проверьте, что неизвестная категория указана в ошибках '
+            'элемента.'
+        )
+        assert set(errors[3]) == {'id'}, (
+            'Проверьте, что несуществующее произведение указано в ошибках '
+            'элемента.'
+        )
+        assert set(errors[4]) == {'year'}, (
+            'Проверьте, что ошибки формата элемента возвращаются.'
+        )
+        count = admin_client.get('/api/v1/titles/').json()['count']
+        assert count == len(titles), (
+            'Проверьте, что пакет с ошибками ничего не записывает.'
+        )
+        response = admin_client.post(self.URL, data={'name': 'Не список'},
+                                     format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что `{self.URL}` принимает только список.'
+        )
+
+    def test_04_queries_do_not_grow(self, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        counts = []
+        for size in (2, 40):
+            items = self.make_items(size, genres, categories)
+            items[0] = {'id': titles[0]['id'], 'genre': ['drama']}
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(self.URL, data=items,
+                                             format='json')
+            assert response.status_code == HTTPStatus.CREATED
+            counts.append(len(context))
+        assert counts[0] == counts[1], (
+            f'Проверьте, что число запросов `{self.URL}` не зависит '
+            f'от размера пакета: {counts}.'
+        )
+
+    @pytest.mark.parametrize('returning', (True, False))
+    def test_05_created_ids(self, admin_client, monkeypatch, returning):
+        _, categories, genres = create_titles(admin_client)
+        monkeypatch.setattr(connection.features,
+                            'can_return_rows_from_bulk_insert', returning)
+        inserted = []
+
+        def insert_other(sender, **kwargs):
+            # Вставка, попавшая между записью пакета и чтением id.
+            if not inserted:
+                inserted.append(Title.objects.create(name='Чужое',
+                                                     year=2000))
+
+        bulk_changed.connect(insert_other, sender=Title)
+        try:
+            response = admin_client.post(
+                self.URL, data=self.make_items(3, genres, categories),
+                format='json')
+        finally:
+            bulk_changed.disconnect(insert_other, sender=Title)
+        assert response.status_code == HTTPStatus.CREATED
+        for title in response.json():
+            assert Title.objects.get(pk=title['id']).name == title['name'], (
+                'Проверьте, что пакет возвращает id именно созданных им '
+                'произведений.'
+            )
+
+    def test_06_update_only(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.post(
+            self.URL, data=[{'id': titles[0]['id'], 'year': 1990}],
+            format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что пакет без новых произведений возвращает '
+            'статус 200.'
+        )
+        assert response.json()[0]['year'] == 1990
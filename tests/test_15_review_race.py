@@ -0,0 +1,96 @@
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import OperationalError, connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.views import ReviewViewSet
+from reviews.models import Review
+from tests.utils import create_titles
+
+THREADS = 8
+ATTEMPTS = 50
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ReviewRace:
+
+    def test_01_concurrent_reviews(self, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        factory = APIRequestFactory()
+        view = ReviewViewSet.as_view({'post': 'create'})
+        barrier = threading.Barrier(THREADS)
+        waited = set()
+        statuses = []
+
+        def insert_together(execute, sql, params, many, context):
+            # Все запросы доходят до INSERT, прежде чем один из них
+            # запишет отзыв: это окно гонки при проверке до вставки.
+            if (sql.startswith('INSERT INTO "reviews_review"')
+                    and threading.get_ident() not in waited):
+                waited.add(threading.get_ident())
+                try:
+                    barrier.wait(timeout=5)
+                except threading.BrokenBarrierError:
+                    pass
+            return execute(sql, params, many, context)
+
+        def post_review(number):
+            # Вьюсет вызывается напрямую: тестовый клиент ловит исключения
+            # через общий сигнал и путает потоки.
+            try:
+                with connection.execute_wrapper(insert_together):
+                    for _ in range(ATTEMPTS):
+                        request = factory.post(
+                            url, {'text': f'Отзыв {number}', 'score': 5},
+                            format='json')
+                        force_authenticate(request, user=user)
+                        try:
+                            response = view(request, title_id=title_id)
+                            break
+                        except OperationalError:
+                            # SQLite пускает одного писателя за раз: запрос
+                            # можно повторить, уникальность тут ни при чём.
+                            time.sleep(0.01)
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=post_review, args=(number,))
+                   for number in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(statuses) == (
+            [HTTPStatus.CREATED] + [HTTPStatus.BAD_REQUEST] * (THREADS - 1)), (
+            'Проверьте, что из одновременных отзывов одного автора на одно '
+            'произведение создаётся ровно один, а остальные получают 400: '
+            f'{statuses}.'
+        )
+        assert Review.objects.filter(author=user).count() == 1, (
+            'Проверьте, что в базе остаётся один отзыв автора.'
+        )
+
+    def test_02_duplicate_review_message(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Отзыв', 'score': 7}
+        assert user_client.post(url, data=data).status_code == (
+            HTTPStatus.CREATED)
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв возвращает статус 400.'
+        )
+        assert 'non_field_errors' in response.json(), (
+            'Проверьте, что ошибка повторного отзыва не привязана к полю.'
+        )
+        rating = admin_client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/').json()['rating']
+        assert rating == 7, (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг.'
+        )
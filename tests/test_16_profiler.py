@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from django.db import connection
+
+from api_yamdb.profiler import QueryProfile, normalize
+from tests.utils import create_titles
+
+
+@pytest.fixture
+def profiler(settings):
+    settings.QUERY_PROFILER_ENABLED = True
+    settings.QUERY_PROFILER_SAMPLE_RATE = 1
+    settings.QUERY_PROFILER_LOG = None
+    return settings
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Profiler:
+
+    URL = '/api/v1/titles/'
+
+    def test_01_headers(self, profiler, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(self.URL)
+        assert response['X-DB-Queries'] == '4', (
+            'Проверьте, что заголовок `X-DB-Queries` содержит число '
+            'запросов к базе.'
+        )
+        assert float(response['X-DB-Time']) > 0, (
+            'Проверьте, что заголовок `X-DB-Time` содержит время запросов.'
+        )
+        assert response['X-DB-Repeated'] == '0', (
+            'Проверьте, что список произведений не похож на N+1.'
+        )
+
+    def test_02_disabled_and_sampling(self, settings, client):
+        settings.QUERY_PROFILER_ENABLED = False
+        assert not client.get(self.URL).has_header('X-DB-Queries'), (
+            'Проверьте, что выключенный профилировщик не добавляет '
+            'заголовков.'
+        )
+
+    def test_03_sample_rate(self, profiler, client):
+        profiler.QUERY_PROFILER_SAMPLE_RATE = 0
+        assert not client.get(self.URL).has_header('X-DB-Queries'), (
+            'Проверьте, что запросы вне выборки не профилируются.'
+        )
+
+    def test_04_repeated_queries(self):
+        profile = QueryProfile()
+        with connection.execute_wrapper(profile):
+            with connection.cursor() as cursor:
+                for number in range(6):
+                    cursor.execute('SELECT %s', [number])
+                    cursor.execute(f'SELECT {number} + 1')
+                cursor.execute('SELECT 1 WHERE 1 IN (%s, %s)', [1, 2])
+        repeated = profile.get_repeated(threshold=5)
+        assert [(group['sql'], group['count']) for group in repeated] == [
+            ('SELECT %s', 6), ('SELECT ? + ?', 6)], (
+            'Проверьте, что одинаковые после нормализации запросы '
+            'группируются.'
+        )
+        assert normalize("SELECT 'a' FROM t WHERE id IN (%s, %s, %s)") == (
+            "SELECT ? FROM t WHERE id IN (...)"), (
+            'Проверьте нормализацию литералов и списков параметров.'
+        )
+
+    def test_05_slow_log(self, profiler, client, tmp_path):
+        path = tmp_path / 'slow.jsonl'
+        profiler.QUERY_PROFILER_LOG = str(path)
+        profiler.QUERY_PROFILER_SLOW_MS = 0
+        client.get(self.URL)
+        client.get(f'{self.URL}?year=2000')
+        records = [json.loads(line)
+                   for line in path.read_text().splitlines()]
+        assert [record['path'] for record in records] == [
+            self.URL, f'{self.URL}?year=2000'], (
+            'Проверьте, что медленные запросы пишутся в журнал по строке.'
+        )
+        assert {'status', 'ms', 'queries', 'db_ms', 'repeated',
+                'slowest'} <= set(records[0]), (
+            'Проверьте, что запись журнала содержит сводку запросов.'
+        )
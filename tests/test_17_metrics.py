@@ -0,0 +1,137 @@
+import re
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from api_yamdb import metrics, profiler
+from tests.utils import create_titles
+
+URL = '/api/v1/metrics/'
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    metrics.registry.reset()
+
+
+def get_samples(admin_client):
+    response = admin_client.get(URL)
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('text/plain'), (
+        f'Проверьте, что `{URL}` отдаёт текстовый формат Prometheus.'
+    )
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Metrics:
+
+    def test_01_permissions(self, client, user_client):
+        assert client.get(URL).status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что `{URL}` недоступен анонимному пользователю.'
+        )
+        assert user_client.get(URL).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{URL}` доступен только администратору.'
+        )
+
+    def test_02_view_histograms(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        for _ in range(3):
+            client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        client.get('/api/v1/titles/100500/')
+        client.get('/api/v1/unknown/')
+        samples = get_samples(admin_client)
+        labels = 'view="TitleViewSet",action="list"'
+        assert samples[f'yamdb_request_duration_seconds_count{{{labels}}}'
+                       ] == 3, (
+            'Проверьте, что время ответа собирается по представлению '
+            'и действию.'
+        )
+        assert samples[
+            f'yamdb_request_db_queries_bucket{{{labels},le="5"}}'] == 3, (
+            'Проверьте гистограмму числа запросов к базе.'
+        )
+        assert samples[f'yamdb_response_size_bytes_sum{{{labels}}}'] > 0, (
+            'Проверьте гистограмму размера ответа.'
+        )
+        assert samples[
+            'yamdb_responses_total{view="TitleViewSet",action="retrieve",'
+            'status="404"}'] == 1, (
+            'Проверьте, что ответы считаются по статусам.'
+        )
+        assert samples['yamdb_responses_total{view="unmatched",'
+                       'action="get",status="404"}'] == 1, (
+            'Проверьте, что запросы к неизвестным адресам тоже считаются.'
+        )
+        buckets = [value for name, value in samples.items()
+                   if re.match(r'yamdb_request_duration_seconds_bucket\{'
+                               + re.escape(labels), name)]
+        assert buckets == sorted(buckets) and buckets[-1] == 3, (
+            'Проверьте, что корзины гистограммы накопительные.'
+        )
+
+    def test_03_queries_not_recorded(self, client, admin_client,
+                                     monkeypatch, settings):
+        settings.QUERY_PROFILER_SAMPLE_RATE = 0
+        create_titles(admin_client)
+        metrics.registry.reset()
+
+        def record(*args, **kwargs):
+            raise AssertionError('Текст запросов записывается.')
+
+        monkeypatch.setattr(profiler.QueryProfile, '__call__', record)
+        client.get('/api/v1/titles/')
+        samples = get_samples(admin_client)
+        labels = 'view="TitleViewSet",action="list"'
+        assert samples[f'yamdb_request_db_queries_sum{{{labels}}}'] > 0, (
+            'Проверьте, что метрики считают запросы к базе без записи их '
+            'текста: текст сохраняет только выборка профилировщика.'
+        )
+
+    def test_04_auth_counters(self, client, admin_client, user):
+        client.post('/api/v1/auth/signup/',
+                    data={'email': 'valid@yamdb.fake', 'username': 'valid'})
+        client.post('/api/v1/auth/token/',
+                    data={'username': user.username,
+                          'confirmation_code': '12345'})
+        samples = get_samples(admin_client)
+        assert samples['yamdb_auth_signups_total'] == 1, (
+            'Проверьте, что запросы кода подтверждения считаются.'
+        )
+        assert samples['yamdb_auth_confirmation_failures_total'] == 1, (
+            'Проверьте, что неверные коды подтверждения считаются.'
+        )
+        assert 'yamdb_auth_tokens_issued_total' not in samples, (
+            'Проверьте, что токен не считается выданным при неверном коде.'
+        )
+
+    def test_05_thread_safety(self):
+        labels = (('view', 'test'), ('action', 'list'))
+
+        def work():
+            for _ in range(1000):
+                metrics.registry.inc('yamdb_responses_total', labels)
+                metrics.registry.observe(
+                    'yamdb_request_db_queries', labels, 1)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        text = metrics.registry.render()
+        assert ('yamdb_responses_total{view="test",action="list"} 8000'
+                in text), (
+            'Проверьте, что счётчики потокобезопасны.'
+        )
+        assert ('yamdb_request_db_queries_count{view="test",action="list"} '
+                '8000' in text), (
+            'Проверьте, что гистограммы потокобезопасны.'
+        )
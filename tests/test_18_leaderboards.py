@@ -0,0 +1,182 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+
+from reviews import rankings
+from reviews.models import (Category, Genre, GenreRanking, Review, Title,
+                            TitleRanking)
+from reviews.rankings import (get_bayesian_score, get_cached_prior_mean,
+                              get_prior_mean)
+
+URL = '/api/v1/titles/top/'
+# Жанр или категория по слагу, строки рейтинга с произведениями.
+GENRE_TOP_QUERIES = 3
+
+
+def create_scored_titles(django_user_model):
+    films = Category.objects.create(name='Фильм', slug='films')
+    books = Category.objects.create(name='Книги', slug='books')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    users = [django_user_model.objects.create_user(
+        username=f'reviewer{number}', email=f'reviewer{number}@yamdb.fake')
+        for number in range(8)]
+    scores = {
+        # Мало отзывов: в рейтинг не попадает.
+        ('Новинка', films, (drama,)): (10,),
+        ('Хит', films, (drama, comedy)): (10, 10, 7),
+        ('Классика', books, (drama,)): (9, 9, 9, 9, 9, 9, 9, 9),
+        ('Середняк', books, (comedy,)): (5, 6, 5),
+    }
+    titles = {}
+    for (name, category, genres), title_scores in scores.items():
+        title = Title.objects.create(name=name, year=2000,
+                                     category=category)
+        title.genre.set(genres)
+        for user, score in zip(users, title_scores):
+            Review.objects.create(title=title, author=user, text='Отзыв',
+                                  score=score)
+        titles[name] = title
+    return titles
+
+
+def get_names(client, query=''):
+    response = client.get(f'{URL}{query}')
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{URL}{query}` возвращает статус 200.'
+    )
+    return [row['name'] for row in response.json()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Leaderboards:
+
+    def test_01_top_rated(self, client, django_user_model, settings):
+        settings.LEADERBOARD_MIN_REVIEWS = 3
+        settings.LEADERBOARD_PRIOR_WEIGHT = 5
+        create_scored_titles(django_user_model)
+        call_command('refresh_rankings')
+        rows = client.get(URL).json()
+        prior_mean = get_prior_mean()
+        expected = sorted(
+            Title.objects.filter(review_count__gte=3),
+            key=lambda title: -get_bayesian_score(
+                title.score_sum, title.review_count, prior_mean))
+        assert [row['name'] for row in rows] == [
+            title.name for title in expected], (
+            'Проверьте, что рейтинг упорядочен по байесовской оценке и '
+            'не содержит произведений с малым числом отзывов.'
+        )
+        assert [row['name'] for row in rows][:2] == ['Классика', 'Хит'], (
+            'Проверьте, что при равной средней оценке выше произведение '
+            'с большим числом отзывов.'
+        )
+        assert set(rows[0]) == {'id', 'name', 'year', 'category', 'rating',
+                                'review_count', 'score'}, (
+            'Проверьте поля строки рейтинга.'
+        )
+        assert get_names(client, '?by=reviews&limit=1') == ['Классика'], (
+            'Проверьте рейтинг по числу отзывов и параметр `limit`.'
+        )
+
+    def test_02_category_and_genre(self, client, django_user_model,
+                                   settings, django_assert_num_queries):
+        settings.LEADERBOARD_MIN_REVIEWS = 3
+        create_scored_titles(django_user_model)
+        assert get_names(client, '?category=films') == ['Хит'], (
+            'Проверьте рейтинг по категории.'
+        )
+        with django_assert_num_queries(GENRE_TOP_QUERIES):
+            names = get_names(client, '?genre=comedy')
+        assert names == ['Хит', 'Середняк'], (
+            'Проверьте рейтинг по жанру.'
+        )
+        assert client.get(f'{URL}?genre=unknown').status_code == (
+            HTTPStatus.NOT_FOUND), (
+            'Проверьте, что рейтинг неизвестного жанра возвращает 404.'
+        )
+        response = client.get(f'{URL}?genre=comedy&category=films')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что нельзя указать жанр и категорию сразу.'
+        )
+
+    def test_03_incremental_refresh(self, client, django_user_model,
+                                    settings):
+        settings.LEADERBOARD_MIN_REVIEWS = 3
+        titles = create_scored_titles(django_user_model)
+        hit = titles['Хит']
+        assert TitleRanking.objects.filter(title=hit).exists(), (
+            'Проверьте, что отзывы добавляют произведение в рейтинг.'
+        )
+        hit.reviews.first().delete()
+        assert not TitleRanking.objects.filter(title=hit).exists(), (
+            'Проверьте, что произведение с малым числом отзывов '
+            'выпадает из рейтинга.'
+        )
+        classic = titles['Классика']
+        classic.category = Category.objects.get(slug='films')
+        classic.save()
+        assert get_names(client, '?category=films') == ['Классика'], (
+            'Проверьте, что смена категории обновляет рейтинг.'
+        )
+        classic.genre.add(Genre.objects.get(slug='comedy'))
+        assert GenreRanking.objects.filter(
+            title=classic, genre__slug='comedy').exists(), (
+            'Проверьте, что смена жанров обновляет рейтинг жанров.'
+        )
+        review = classic.reviews.first()
+        review.score = 1
+        review.save()
+        row = TitleRanking.objects.get(title=classic)
+        classic.refresh_from_db()
+        assert row.score == pytest.approx(get_bayesian_score(
+            classic.score_sum, classic.review_count,
+            get_cached_prior_mean())), (
+            'Проверьте, что изменение оценки пересчитывает строку рейтинга.'
+        )
+
+    def test_04_refresh_once_per_title(self, django_user_model,
+                                       monkeypatch):
+        titles = create_scored_titles(django_user_model)
+        refreshed = []
+        original_refresh = rankings.refresh_rankings
+
+        def count_refresh(title_ids, *args, **kwargs):
+            refreshed.append(sorted(title_ids))
+            return original_refresh(title_ids, *args, **kwargs)
+
+        monkeypatch.setattr(rankings, 'refresh_rankings', count_refresh)
+        classic_id = titles['Классика'].pk
+        titles['Классика'].delete()
+        assert refreshed == [], (
+            'Проверьте, что удаление произведения не пересчитывает рейтинг '
+            'на каждый его отзыв.'
+        )
+        assert not TitleRanking.objects.filter(title_id=classic_id).exists()
+        refreshed.clear()
+        hit, average = titles['Хит'], titles['Середняк']
+        with transaction.atomic():
+            for review in Review.objects.filter(title__in=(hit, average)):
+                review.score = 10
+                review.save()
+            assert refreshed == [], (
+                'Проверьте, что рейтинг пересчитывается после фиксации '
+                'транзакции.'
+            )
+        assert refreshed == [sorted((hit.pk, average.pk))], (
+            'Проверьте, что изменения отзывов в одной транзакции '
+            'пересчитывают каждое произведение один раз.'
+        )
+        assert TitleRanking.objects.get(title=average).score == (
+            pytest.approx(get_bayesian_score(30, 3, get_cached_prior_mean()))
+        ), 'Проверьте, что отложенный пересчёт обновляет строку рейтинга.'
+        refreshed.clear()
+        with pytest.raises(ValueError), transaction.atomic():
+            hit.reviews.first().delete()
+            raise ValueError
+        hit.reviews.first().delete()
+        assert refreshed == [[hit.pk]], (
+            'Проверьте, что после отката пересчёт снова планируется.'
+        )
@@ -0,0 +1,154 @@
+from http import HTTPStatus
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+
+from reviews import similar
+from reviews.models import Category, Review, SimilarTitle, Title
+
+# Произведение и строки похожих с произведениями и категориями.
+SIMILAR_QUERIES = 2
+
+
+def create_users(django_user_model, count):
+    return [django_user_model.objects.create_user(
+        username=f'reader{number}', email=f'reader{number}@yamdb.fake')
+        for number in range(count)]
+
+
+def create_clusters(django_user_model):
+    """Две группы читателей с противоположными вкусами."""
+    category = Category.objects.create(name='Фильм', slug='films')
+    titles = {name: Title.objects.create(name=name, year=2000,
+                                         category=category)
+              for name in ('Дюна', 'Солярис', 'Амели', 'Мамма миа',
+                           'Одиночка')}
+    users = create_users(django_user_model, 8)
+    scores = {
+        'Дюна': (10, 9, 10, 9, 2, 3, 2, 1),
+        'Солярис': (9, 10, 9, 10, 3, 2, 1, 2),
+        'Амели': (2, 1, 3, 2, 9, 10, 10, 9),
+        'Мамма миа': (3, 2, 2, 1, 10, 9, 9, 10),
+        'Одиночка': (10,),
+    }
+    for name, title_scores in scores.items():
+        for user, score in zip(users, title_scores):
+            Review.objects.create(title=titles[name], author=user,
+                                  text='Отзыв', score=score)
+    return titles
+
+
+def get_expected(count, min_common):
+    """Соседи, посчитанные по плотной матрице без блоков."""
+    title_ids = list(Title.objects.order_by('pk')
+                     .values_list('pk', flat=True))
+    authors = sorted(set(Review.objects.values_list('author_id', flat=True)))
+    matrix = np.zeros((len(title_ids), len(authors)))
+    rated = np.zeros_like(matrix, dtype=bool)
+    for title_id, author_id, score in Review.objects.values_list(
+            'title_id', 'author_id', 'score'):
+        row, column = title_ids.index(title_id), authors.index(author_id)
+        matrix[row, column] = score
+        rated[row, column] = True
+    means = matrix.sum(axis=0) / rated.sum(axis=0)
+    matrix = np.where(rated, matrix - means, 0)
+    norms = np.linalg.norm(matrix, axis=1)
+    common = rated.astype(int) @ rated.T.astype(int)
+    expected = {}
+    for row, title_id in enumerate(title_ids):
+        neighbours = []
+        for column, other_id in enumerate(title_ids):
+            if column == row or common[row, column] < min_common:
+                continue
+            score = matrix[row] @ matrix[column] / (norms[row]
+                                                   * norms[column])
+            if score > 0:
+                neighbours.append((-score, other_id))
+        expected[title_id] = [
+            (other_id, -score) for score, other_id in sorted(neighbours)
+        ][:count]
+    return expected
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19SimilarTitles:
+
+    def test_01_similar(self, client, django_user_model,
+                        django_assert_num_queries):
+        titles = create_clusters(django_user_model)
+        call_command('build_similar_titles', min_common=3)
+        url = f'/api/v1/titles/{titles["Дюна"].pk}/similar/'
+        with django_assert_num_queries(SIMILAR_QUERIES):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+        )
+        rows = response.json()
+        assert [row['name'] for row in rows] == ['Солярис'], (
+            'Проверьте, что похожими считаются произведения, которые '
+            'высоко оценили одни и те же пользователи.'
+        )
+        assert set(rows[0]) == {'id', 'name', 'year', 'category', 'rating',
+                                'score'}, (
+            'Проверьте поля похожего произведения.'
+        )
+        assert 0 < rows[0]['score'] <= 1, (
+            'Проверьте, что сходство — косинус от 0 до 1.'
+        )
+        url = f'/api/v1/titles/{titles["Одиночка"].pk}/similar/'
+        assert client.get(url).json() == [], (
+            'Проверьте, что у произведения с малым числом общих оценивших '
+            'нет похожих.'
+        )
+        assert client.get('/api/v1/titles/100500/similar/').status_code == (
+            HTTPStatus.NOT_FOUND), (
+            'Проверьте, что похожие несуществующего произведения — 404.'
+        )
+
+    def test_02_blocks_match_dense(self, django_user_model, monkeypatch):
+        rng = np.random.default_rng(19)
+        titles = [Title.objects.create(name=f'Произведение {number}',
+                                       year=2000)
+                  for number in range(12)]
+        users = create_users(django_user_model, 15)
+        Review.objects.bulk_create(
+            Review(title=title, author=user, text='Отзыв',
+                   score=int(rng.integers(1, 11)))
+            for title in titles for user in users if rng.random() < 0.5)
+        # Маленькие блоки и части пар, чтобы проверить их склейку.
+        monkeypatch.setattr(similar, 'MAX_BLOCK_SIZE', 5)
+        monkeypatch.setattr(similar, 'PAIR_BATCH_SIZE', 7)
+        saved = similar.build_similar_titles(count=4, min_common=2,
+                                             batch_size=10)
+        expected = get_expected(count=4, min_common=2)
+        stored = {title.pk: [] for title in titles}
+        for title_id, similar_id, score in (
+                SimilarTitle.objects.order_by('title', '-score', 'similar')
+                .values_list('title_id', 'similar_id', 'score')):
+            stored[title_id].append((similar_id, score))
+        assert saved == sum(map(len, expected.values())), (
+            'Проверьте число сохранённых пар похожих произведений.'
+        )
+        for title_id, neighbours in expected.items():
+            assert [pk for pk, _ in stored[title_id]] == [
+                pk for pk, _ in neighbours], (
+                'Проверьте, что блочный расчёт совпадает с расчётом по '
+                'плотной матрице.'
+            )
+            assert [score for _, score in stored[title_id]] == (
+                pytest.approx([score for _, score in neighbours],
+                              rel=1e-4)), (
+                'Проверьте значения сходства.'
+            )
+
+    def test_03_rebuild_replaces_rows(self, django_user_model):
+        titles = create_clusters(django_user_model)
+        call_command('build_similar_titles', min_common=3)
+        assert SimilarTitle.objects.filter(title=titles['Амели']).exists()
+        Review.objects.filter(title=titles['Мамма миа']).delete()
+        call_command('build_similar_titles', min_common=3)
+        assert not SimilarTitle.objects.filter(
+            title=titles['Амели']).exists(), (
+            'Проверьте, что пересчёт удаляет устаревших соседей.'
+        )
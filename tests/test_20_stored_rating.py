@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+
+
+def get_counters(title):
+    return Title.objects.values_list(
+        'score_sum', 'review_count', 'rating').get(pk=title.pk)
+
+
+@pytest.fixture
+def titles():
+    return (Title.objects.create(name='Первое', year=2000),
+            Title.objects.create(name='Второе', year=2000))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20StoredRating:
+
+    def test_01_review_signals(self, titles, admin, user):
+        first, second = titles
+        review = Review.objects.create(title=first, author=admin,
+                                       text='Отзыв', score=4)
+        Review.objects.create(title=first, author=user, text='Отзыв',
+                              score=9)
+        assert get_counters(first) == (13, 2, 6.5), (
+            'Проверьте, что новый отзыв учитывается в рейтинге.'
+        )
+        review.score = 8
+        review.save()
+        assert get_counters(first) == (17, 2, 8.5), (
+            'Проверьте, что изменение оценки пересчитывает рейтинг.'
+        )
+        review.title = second
+        review.save()
+        assert get_counters(first) == (9, 1, 9), (
+            'Проверьте, что перенос отзыва убирает оценку у прежнего '
+            'произведения.'
+        )
+        assert get_counters(second) == (8, 1, 8), (
+            'Проверьте, что перенос отзыва добавляет оценку новому '
+            'произведению.'
+        )
+        review.delete()
+        assert get_counters(second) == (0, 0, None), (
+            'Проверьте, что удаление отзыва исключает его оценку.'
+        )
+
+    def test_02_stale_title_save(self, titles, admin):
+        first, _ = titles
+        stale = Title.objects.get(pk=first.pk)
+        Review.objects.create(title=first, author=admin, text='Отзыв',
+                              score=7)
+        stale.name = 'Новое название'
+        stale.save()
+        assert get_counters(first) == (7, 1, 7), (
+            'Проверьте, что сохранение устаревшего объекта произведения '
+            'не сбрасывает хранимый рейтинг.'
+        )
+        assert Title.objects.get(pk=first.pk).name == 'Новое название', (
+            'Проверьте, что остальные поля произведения сохраняются.'
+        )
+
+    def test_03_patch_keeps_rating(self, admin_client, titles, user,
+                                   moderator, monkeypatch):
+        first, _ = titles
+        Review.objects.create(title=first, author=user, text='Отзыв',
+                              score=3)
+        original_save = Title.save
+
+        def save_after_review(title, *args, **kwargs):
+            # Отзыв появляется между чтением и записью произведения.
+            Review.objects.create(title=first, author=moderator,
+                                  text='Отзыв', score=9)
+            original_save(title, *args, **kwargs)
+
+        monkeypatch.setattr(Title, 'save', save_after_review)
+        response = admin_client.patch(f'/api/v1/titles/{first.pk}/',
+                                      data={'name': 'Правка'},
+                                      format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert get_counters(first) == (12, 2, 6), (
+            'Проверьте, что PATCH произведения не перезаписывает рейтинг, '
+            'изменённый параллельным отзывом.'
+        )
+
+    def test_04_title_delete_cascade(self, admin_client, django_user_model):
+        counts = []
+        for review_count in (2, 10):
+            title = Title.objects.create(name='Удаляемое', year=2000)
+            for number in range(review_count):
+                author = django_user_model.objects.create_user(
+                    username=f'author{review_count}_{number}',
+                    email=f'author{review_count}_{number}@yamdb.fake')
+                review = Review.objects.create(title=title, author=author,
+                                               text='Отзыв', score=5)
+                Comment.objects.create(review=review, author=author,
+                                       text='Комментарий')
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.delete(
+                    f'/api/v1/titles/{title.pk}/')
+            assert response.status_code == HTTPStatus.NO_CONTENT
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что удаление произведения не обновляет его рейтинг '
+            'и даты на каждый отзыв и комментарий.'
+        )
+
+    def test_05_delete_with_drifted_counters(self, admin_client, titles,
+                                             admin, user):
+        first, _ = titles
+        # Массовая вставка без пересчёта: хранимые счётчики отстают.
+        Review.objects.bulk_create([
+            Review(title=first, author=admin, text='Отзыв', score=9),
+            Review(title=first, author=user, text='Отзыв', score=8),
+        ])
+        response = admin_client.delete(f'/api/v1/titles/{first.pk}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT, (
+            'Проверьте, что произведение с устаревшими счётчиками рейтинга '
+            'удаляется без ошибки.'
+        )
+        assert not Review.objects.filter(title_id=first.pk).exists()
@@ -0,0 +1,116 @@
+import json
+from base64 import b64encode
+from http import HTTPStatus
+from urllib.parse import quote, urlencode
+
+import pytest
+from django.utils import timezone
+
+from api.pagination import KeysetPagination
+from reviews.models import Comment, Review, Title
+
+PAGE_SIZE = 2
+
+
+@pytest.fixture(autouse=True)
+def small_pages(monkeypatch):
+    monkeypatch.setattr(KeysetPagination, 'page_size', PAGE_SIZE)
+
+
+def get_page(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+    )
+    data = response.json()
+    assert set(data) == {'next', 'previous', 'results'}, (
+        'Проверьте, что курсорный режим отдаёт `next`, `previous` и '
+        '`results` без `count`.'
+    )
+    return data
+
+
+def make_cursor(position):
+    """Курсор с произвольными значениями ключа."""
+    query = urlencode({'p': json.dumps(position)})
+    return quote(b64encode(query.encode()).decode())
+
+
+def walk(client, url):
+    """Все страницы по ссылкам next."""
+    ids, pages = [], []
+    while url:
+        page = get_page(client, url)
+        pages.append(page)
+        ids += [row['id'] for row in page['results']]
+        url = page['next']
+    return ids, pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21CursorPagination:
+
+    def create_comments(self, user, count):
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(title=title, author=user,
+                                       text='Отзыв', score=5)
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text=f'Комментарий {number}')
+            for number in range(count))
+        # Одинаковое время публикации: порядок задаёт только id.
+        Comment.objects.update(pub_date=timezone.now())
+        return (f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+                '?pagination=cursor')
+
+    def test_01_equal_pub_dates(self, client, user):
+        url = self.create_comments(user, 7)
+        ids, pages = walk(client, url)
+        assert ids == sorted(Comment.objects.values_list('pk', flat=True),
+                             reverse=True), (
+            'Проверьте, что курсорные страницы с равными `pub_date` '
+            'обходят все комментарии по убыванию id без повторов.'
+        )
+        assert pages[0]['previous'] is None
+        previous = get_page(client, pages[1]['previous'])
+        assert previous['results'] == pages[0]['results'], (
+            'Проверьте, что ссылка `previous` ведёт на предыдущую страницу.'
+        )
+
+    def test_02_stable_on_insert(self, client, user):
+        url = self.create_comments(user, 5)
+        expected = sorted(Comment.objects.values_list('pk', flat=True),
+                          reverse=True)
+        first = get_page(client, url)
+        Comment.objects.create(review=Comment.objects.first().review,
+                               author=user, text='Новый комментарий')
+        ids, _ = walk(client, first['next'])
+        assert [row['id'] for row in first['results']] + ids == expected, (
+            'Проверьте, что новые записи не сдвигают курсорные страницы.'
+        )
+
+    def test_03_titles_with_equal_names(self, client):
+        Title.objects.bulk_create(Title(name='Тёзка', year=2000)
+                                  for _ in range(5))
+        Title.objects.create(name='Альфа', year=2000)
+        ids, _ = walk(client, '/api/v1/titles/?pagination=cursor')
+        assert ids == list(Title.objects.order_by('name', 'id')
+                           .values_list('pk', flat=True)), (
+            'Проверьте, что произведения с одинаковым названием обходятся '
+            'по id без повторов и пропусков.'
+        )
+
+    @pytest.mark.parametrize('url,position', (
+        ('/api/v1/titles/', ['a', 'x']),
+        ('/api/v1/titles/', [None, 1]),
+        ('/api/v1/titles/', ['Имя', [1]]),
+        ('/api/v1/titles/{title}/reviews/', ['garbage', 1]),
+        ('/api/v1/titles/{title}/reviews/', [None, 1]),
+    ))
+    def test_04_invalid_position(self, client, url, position):
+        title = Title.objects.create(name='Произведение', year=2000)
+        url = url.format(title=title.pk)
+        response = client.get(f'{url}?cursor={make_cursor(position)}')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что курсор с неподходящими значениями ключа '
+            'возвращает 404, а не ошибку сервера.'
+        )
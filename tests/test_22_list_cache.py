@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import transaction
+
+from api.conditional import get_cache_version, get_list_version_key
+from reviews.models import Category, Genre
+
+URL = '/api/v1/categories/'
+
+
+def get_names(client, url=URL):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return [row['name'] for row in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ListCache:
+
+    def test_01_warm_list_without_queries(self, client,
+                                          django_assert_num_queries):
+        Category.objects.create(name='Фильм', slug='films')
+        get_names(client)
+        with django_assert_num_queries(0):
+            assert get_names(client) == ['Фильм'], (
+                'Проверьте, что список категорий отдаётся из кэша.'
+            )
+
+    def test_02_api_write_invalidates(self, client, admin_client):
+        get_names(client)
+        admin_client.post(URL, data={'name': 'Книга', 'slug': 'books'})
+        assert get_names(client) == ['Книга'], (
+            'Проверьте, что создание категории сбрасывает кэш списка.'
+        )
+        admin_client.delete(f'{URL}books/')
+        assert get_names(client) == [], (
+            'Проверьте, что удаление категории сбрасывает кэш списка.'
+        )
+
+    @pytest.mark.parametrize('change', (
+        lambda: Category.objects.create(name='Музыка', slug='music'),
+        lambda: Category.objects.filter(slug='films').update(name='Кино'),
+        lambda: Category.objects.bulk_create(
+            [Category(name='Музыка', slug='music')]),
+        lambda: Category.objects.filter(slug='films').delete(),
+    ))
+    def test_03_model_changes_invalidate(self, client, change):
+        Category.objects.create(name='Фильм', slug='films')
+        before = get_names(client)
+        change()
+        assert get_names(client) == list(
+            Category.objects.values_list('name', flat=True)) != before, (
+            'Проверьте, что изменения категорий вне API, в том числе '
+            'массовые, сбрасывают кэш списка.'
+        )
+
+    def test_04_lists_are_separate(self, client, django_assert_num_queries):
+        get_names(client)
+        get_names(client, '/api/v1/genres/')
+        Genre.objects.create(name='Драма', slug='drama')
+        with django_assert_num_queries(0):
+            get_names(client)
+        assert get_names(client, '/api/v1/genres/') == ['Драма'], (
+            'Проверьте, что изменение жанров сбрасывает кэш их списка.'
+        )
+
+    def test_05_timeout_from_settings(self, client, settings,
+                                      django_assert_num_queries):
+        settings.LIST_CACHE_TIMEOUT = 0
+        Category.objects.create(name='Фильм', slug='films')
+        get_names(client)
+        # COUNT и страница: с нулевым сроком список не кэшируется.
+        with django_assert_num_queries(2):
+            get_names(client)
+
+    def test_06_invalidated_after_commit(self):
+        key = get_list_version_key('categories')
+        version = get_cache_version(key)
+        with transaction.atomic():
+            Category.objects.create(name='Фильм', slug='films')
+            assert get_cache_version(key) == version, (
+                'Проверьте, что кэш списка сбрасывается только после '
+                'фиксации транзакции.'
+            )
+        assert get_cache_version(key) != version, (
+            'Проверьте, что после фиксации транзакции кэш списка '
+            'сбрасывается.'
+        )
@@ -0,0 +1,91 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Avg
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from reviews.management.commands.load_csv import DEFAULT_DATA_DIR
+from reviews.models import Category, Comment, Genre, Review, Title
+
+FILES = {
+    'users.csv': (('id', 'username', 'email', 'role', 'bio', 'first_name',
+                   'last_name'),
+                  ((1, 'taken', 'new@yamdb.fake', 'user', '', '', ''),
+                   (2, 'reader', 'reader@yamdb.fake', 'user', '', '', ''))),
+    'titles.csv': (('id', 'name', 'year', 'category'),
+                   ((1, 'Произведение', 2000, ''),)),
+    'review.csv': (('id', 'title_id', 'text', 'author', 'score',
+                    'pub_date'),
+                   ((1, 1, 'Отзыв', 1, 10, '2020-01-01T00:00:00Z'),
+                    (2, 1, 'Отзыв', 2, 4, '2020-01-02T00:00:00Z'))),
+    'comments.csv': (('id', 'review_id', 'text', 'author', 'pub_date'),
+                     ((1, 1, 'Комментарий', 2, '2020-01-03T00:00:00Z'),
+                      (2, 2, 'Комментарий', 2, '2020-01-04T00:00:00Z'))),
+}
+
+
+def count_rows(filename):
+    with open(DEFAULT_DATA_DIR / filename, encoding='utf-8',
+              newline='') as csv_file:
+        return sum(1 for _ in csv.DictReader(csv_file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23LoadCsv:
+
+    def test_01_static_data(self):
+        call_command('load_csv', batch_size=7, stdout=StringIO())
+        for filename, model in (('category.csv', Category),
+                                ('genre.csv', Genre),
+                                ('titles.csv', Title),
+                                ('review.csv', Review),
+                                ('comments.csv', Comment)):
+            assert model.objects.count() == count_rows(filename), (
+                f'Проверьте, что `load_csv` загружает все строки '
+                f'{filename}.'
+            )
+        review = Review.objects.get(pk=1)
+        assert review.pub_date == parse_datetime('2019-09-24T21:08:21.567Z'), (
+            'Проверьте, что `load_csv` сохраняет даты публикации из файла.'
+        )
+        title = Title.objects.get(pk=review.title_id)
+        assert title.rating == pytest.approx(
+            title.reviews.aggregate(value=Avg('score'))['value']), (
+            'Проверьте, что после загрузки рейтинг пересчитан.'
+        )
+        before = timezone.now()
+        comment = Comment.objects.create(review=review,
+                                         author=review.author, text='Новый')
+        assert comment.pub_date >= before, (
+            'Проверьте, что после загрузки дата публикации новых '
+            'комментариев снова проставляется автоматически.'
+        )
+
+    def test_02_ignored_rows_are_not_referenced(self, tmp_path,
+                                                django_user_model):
+        django_user_model.objects.create_user(username='taken',
+                                              email='taken@yamdb.fake')
+        for filename, (header, rows) in FILES.items():
+            with open(tmp_path / filename, 'w', encoding='utf-8',
+                      newline='') as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(header)
+                writer.writerows(rows)
+        output = StringIO()
+        call_command('load_csv', path=tmp_path, stdout=output)
+        assert list(Review.objects.values_list('pk', flat=True)) == [2], (
+            'Проверьте, что отзывы пользователя, чья строка отброшена из-за '
+            'конфликта, не загружаются.'
+        )
+        assert list(Comment.objects.values_list('pk', flat=True)) == [2], (
+            'Проверьте, что комментарии к незагруженным отзывам '
+            'не загружаются.'
+        )
+        assert 'users.csv: загружено 1, пропущено 1' in output.getvalue(), (
+            'Проверьте, что строки, отброшенные из-за конфликта, не '
+            'считаются загруженными.'
+        )
+        assert Title.objects.get().review_count == 1
@@ -0,0 +1,113 @@
+import csv
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+
+from reviews.constants import MAX_SCORE, MIN_SCORE
+from reviews.management.commands.generate_data import HEADERS, SyntheticData
+from reviews.models import Comment, Genre, Review, Title
+
+COUNTS = dict(users=20, categories=3, genres=5, titles=30, reviews=200,
+              comments=50)
+
+
+def make_data(seed=0, batch_size=16, **counts):
+    return SyntheticData(**{**COUNTS, **counts}, seed=seed,
+                         batch_size=batch_size)
+
+
+def collect(data):
+    """Все строки по файлам и размеры пакетов."""
+    rows, batches = {}, []
+    for filename, source in data.files().items():
+        rows[filename] = []
+        for chunk in source():
+            batches.append(len(chunk))
+            rows[filename] += chunk
+    return rows, batches
+
+
+class Test24SyntheticData:
+
+    def test_01_seed_is_reproducible(self):
+        first, _ = collect(make_data(seed=1))
+        assert first == collect(make_data(seed=1))[0], (
+            'Проверьте, что одинаковое зерно даёт одинаковые данные.'
+        )
+        assert first != collect(make_data(seed=2))[0], (
+            'Проверьте, что разные зёрна дают разные данные.'
+        )
+
+    def test_02_rows_are_consistent(self):
+        data = make_data()
+        rows, batches = collect(data)
+        assert len(rows['users.csv']) == COUNTS['users']
+        assert len(rows['titles.csv']) == COUNTS['titles']
+        assert len(rows['review.csv']) == data.total_reviews == (
+            COUNTS['reviews']), (
+            'Проверьте, что отзывов создаётся столько, сколько запрошено.'
+        )
+        pairs = [(title_id, author) for _, title_id, _, author, _, _
+                 in rows['review.csv']]
+        assert len(set(pairs)) == len(pairs), (
+            'Проверьте, что пара (произведение, автор) не повторяется.'
+        )
+        assert all(1 <= author <= COUNTS['users']
+                   and 1 <= title_id <= COUNTS['titles']
+                   for title_id, author in pairs)
+        assert all(MIN_SCORE <= row[4] <= MAX_SCORE
+                   for row in rows['review.csv'])
+        links = [(title_id, genre_id)
+                 for _, title_id, genre_id in rows['genre_title.csv']]
+        assert len(set(links)) == len(links), (
+            'Проверьте, что жанры произведения не повторяются.'
+        )
+        assert all(1 <= row[1] <= data.total_reviews
+                   for row in rows['comments.csv'])
+        assert max(batches) <= 16, (
+            'Проверьте, что строки отдаются пакетами не больше batch_size.'
+        )
+
+    def test_03_reviews_capped_by_users(self):
+        data = make_data(users=4, titles=5, reviews=1000)
+        counts = np.bincount([row[1] for row in collect(data)[0][
+            'review.csv']])
+        assert data.total_reviews == 20 and counts.max() <= 4, (
+            'Проверьте, что у произведения не больше отзывов, чем '
+            'пользователей.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24GenerateDataCommand:
+
+    def test_01_write_db(self):
+        call_command('generate_data', **COUNTS, seed=3, batch_size=16,
+                     stdout=StringIO())
+        assert Title.objects.count() == COUNTS['titles']
+        assert Genre.objects.count() == COUNTS['genres']
+        assert Review.objects.count() == COUNTS['reviews'], (
+            'Проверьте, что `generate_data` записывает отзывы в базу.'
+        )
+        assert Comment.objects.count() == COUNTS['comments']
+        assert sum(Title.objects.values_list('review_count', flat=True)) == (
+            COUNTS['reviews']), (
+            'Проверьте, что после генерации рейтинги пересчитаны.'
+        )
+
+    def test_02_csv_round_trip(self, tmp_path):
+        call_command('generate_data', **COUNTS, seed=3, output=tmp_path,
+                     stdout=StringIO())
+        for filename, header in HEADERS.items():
+            with open(tmp_path / filename, encoding='utf-8',
+                      newline='') as csv_file:
+                assert tuple(next(csv.reader(csv_file))) == header, (
+                    f'Проверьте заголовок {filename}.'
+                )
+        call_command('load_csv', path=tmp_path, stdout=StringIO())
+        assert Review.objects.count() == COUNTS['reviews'], (
+            'Проверьте, что CSV-файлы `generate_data` загружаются '
+            '`load_csv` без потерь.'
+        )
@@ -0,0 +1,101 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews import search as search_module
+from reviews.models import Review, Title
+from reviews.search import get_fts_table, get_match_query, search
+
+
+def find(query, model=Title):
+    return list(search(model.objects.all(), query)
+                .order_by('search_rank', 'pk')
+                .values_list('name' if model is Title else 'text',
+                             flat=True))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Search:
+
+    def test_01_match_query(self):
+        assert get_match_query('Войн"а и  мир!') == (
+            '"Войн"* "а"* "и"* "мир"*'), (
+            'Проверьте, что запрос разбивается на слова с поиском по '
+            'префиксу, а кавычки и знаки препинания отбрасываются.'
+        )
+        assert get_match_query('"?!') == ''
+
+    def test_02_rank_prefix_and_case(self):
+        Title.objects.create(name='Скучная книга', year=2000,
+                             description='Про войну и мир.')
+        Title.objects.create(name='Война и мир', year=2000,
+                             description='Война, война и снова война.')
+        Title.objects.create(name='Мир', year=2000)
+        assert find('ВОЙН') == ['Война и мир', 'Скучная книга'], (
+            'Проверьте, что поиск не зависит от регистра, ищет по префиксу '
+            'и ставит выше более релевантные произведения.'
+        )
+        assert find('война мир') == ['Война и мир'], (
+            'Проверьте, что в результат попадают произведения со всеми '
+            'словами запроса.'
+        )
+        assert find('!!!') == []
+
+    def test_03_triggers(self, user):
+        Title.objects.bulk_create([Title(name='Солярис', year=1972)])
+        title = Title.objects.get()
+        assert find('солярис') == ['Солярис'], (
+            'Проверьте, что bulk_create попадает в индекс.'
+        )
+        Title.objects.filter(pk=title.pk).update(name='Сталкер')
+        assert find('солярис') == [] and find('сталкер') == ['Сталкер'], (
+            'Проверьте, что изменение названия через update обновляет '
+            'индекс.'
+        )
+        Review.objects.create(title=title, author=user, text='Зона',
+                              score=9)
+        assert find('зона', Review) == ['Зона']
+        Title.objects.filter(pk=title.pk).delete()
+        assert find('сталкер') == [] and find('зона', Review) == [], (
+            'Проверьте, что удалённые записи пропадают из индекса.'
+        )
+
+    def test_04_rebuild(self):
+        Title.objects.create(name='Солярис', year=1972)
+        fts = get_fts_table(Title)
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('delete-all')")
+        assert find('солярис') == []
+        call_command('rebuild_search_index', stdout=StringIO())
+        assert find('солярис') == ['Солярис'], (
+            'Проверьте, что `rebuild_search_index` перестраивает индекс.'
+        )
+
+    def test_05_fallback_without_fts(self, monkeypatch):
+        Title.objects.create(name='Солярис', year=1972)
+        Title.objects.create(name='Сталкер', year=1979,
+                             description='По мотивам, не Солярис.')
+        monkeypatch.setattr(search_module, 'uses_fts',
+                            lambda connection: False)
+        # LIKE в SQLite не сводит регистр кириллицы, поэтому «Соляр».
+        assert sorted(find('Соляр')) == ['Солярис', 'Сталкер'], (
+            'Проверьте, что без FTS5 поиск идёт по вхождению подстроки '
+            'в названии и описании.'
+        )
+
+    def test_06_api_ordering(self, client):
+        Title.objects.create(name='Мир', year=2000,
+                             description='Война и мир, мир и война.')
+        Title.objects.create(name='Война', year=1990)
+        url = '/api/v1/titles/?q=война'
+        names = [row['name'] for row in client.get(url).json()['results']]
+        assert names == ['Война', 'Мир'], (
+            'Проверьте, что `?q=` сортирует произведения по релевантности.'
+        )
+        names = [row['name'] for row in client.get(
+            f'{url}&ordering=-year').json()['results']]
+        assert names == ['Мир', 'Война'], (
+            'Проверьте, что явный `?ordering=` важнее релевантности.'
+        )
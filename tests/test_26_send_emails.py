@@ -0,0 +1,111 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.constants import EMAIL_CLAIM_TIMEOUT, EMAIL_MAX_ATTEMPTS
+from users.management.commands import send_emails
+from users.models import OutgoingEmail
+
+
+def send():
+    call_command('send_emails', once=True, stdout=StringIO())
+
+
+@pytest.fixture
+def emails():
+    return [OutgoingEmail.objects.create(
+        subject='Код', body='123', from_email='admin@yamdb.fake',
+        to=f'user{number}@yamdb.fake') for number in range(3)]
+
+
+def make_due():
+    OutgoingEmail.objects.update(send_after=timezone.now())
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26SendEmails:
+
+    def test_01_claimed_not_sent_twice(self, emails):
+        claimed = send_emails.Command().claim(batch_size=2)
+        assert len(claimed) == 2
+        assert send_emails.Command().claim(batch_size=10) == [emails[2]], (
+            'Проверьте, что письма, захваченные одним запуском, не '
+            'достаются параллельному.'
+        )
+        OutgoingEmail.objects.update(claim=None, claimed_at=None)
+        OutgoingEmail.objects.filter(pk=emails[2].pk).update(
+            claimed_at=timezone.now())
+        send()
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            emails[0].to, emails[1].to], (
+            'Проверьте, что захваченное письмо не отправляется повторно.'
+        )
+        OutgoingEmail.objects.filter(pk=emails[2].pk).update(
+            claimed_at=timezone.now()
+            - timedelta(seconds=EMAIL_CLAIM_TIMEOUT + 1))
+        send()
+        assert len(mail.outbox) == 3, (
+            'Проверьте, что захват упавшего процесса истекает.'
+        )
+        assert not OutgoingEmail.objects.filter(
+            sent_at__isnull=True).exists()
+        assert not OutgoingEmail.objects.filter(
+            claimed_at__isnull=False).exists(), (
+            'Проверьте, что после отправки захват снимается.'
+        )
+
+    def test_02_retry(self, emails, monkeypatch):
+        original_send = send_emails.EmailMessage.send
+
+        def fail_first(message, *args, **kwargs):
+            if message.to[0] == emails[0].to:
+                raise OSError('Отказ сервера')
+            return original_send(message, *args, **kwargs)
+
+        monkeypatch.setattr(send_emails.EmailMessage, 'send', fail_first)
+        send()
+        assert len(mail.outbox) == 2
+        failed = OutgoingEmail.objects.get(pk=emails[0].pk)
+        assert failed.sent_at is None and failed.attempts == 1, (
+            'Проверьте, что неотправленное письмо остаётся в очереди.'
+        )
+        assert 'Отказ сервера' in failed.last_error
+        assert failed.send_after > timezone.now(), (
+            'Проверьте, что повтор откладывается.'
+        )
+        assert failed.claimed_at is None, (
+            'Проверьте, что после ошибки захват снимается.'
+        )
+        send()
+        assert len(mail.outbox) == 2, (
+            'Проверьте, что письмо не повторяется до истечения паузы.'
+        )
+        monkeypatch.undo()
+        make_due()
+        send()
+        assert len(mail.outbox) == 3, (
+            'Проверьте, что письмо отправляется при повторе.'
+        )
+
+    def test_03_connection_failure(self, emails, monkeypatch):
+        def broken_connection(*args, **kwargs):
+            raise ConnectionRefusedError
+
+        monkeypatch.setattr(send_emails, 'get_connection', broken_connection)
+        for _ in range(EMAIL_MAX_ATTEMPTS):
+            send()
+            make_due()
+        assert list(OutgoingEmail.objects.values_list(
+            'attempts', flat=True)) == [EMAIL_MAX_ATTEMPTS] * 3, (
+            'Проверьте, что при недоступном сервере все письма пакета '
+            'уходят на повтор.'
+        )
+        assert send_emails.Command().claim(batch_size=10) == [], (
+            'Проверьте, что исчерпавшие попытки письма больше не '
+            'отправляются.'
+        )
+        assert mail.outbox == []
@@ -0,0 +1,120 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.authentication import get_access_token
+
+URL_USERS = '/api/v1/users/'
+URL_CATEGORIES = '/api/v1/categories/'
+
+
+@pytest.fixture(params=('local', 'shared'))
+def cache_kind(request, settings, tmp_path):
+    """Локальный кэш процесса и общий, здесь файловый."""
+    if request.param == 'shared':
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        }}
+    return request.param
+
+
+def get_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {get_access_token(user)}')
+    return client
+
+
+def user_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        assert client.get(url).status_code == HTTPStatus.OK
+    table = connection.ops.quote_name('users_yamdbuser')
+    return [query['sql'] for query in context.captured_queries
+            if table in query['sql']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TokenClaims:
+
+    def test_01_demotion(self, admin, cache_kind):
+        client = get_client(admin)
+        assert client.get(URL_USERS).status_code == HTTPStatus.OK
+        admin.role = 'user'
+        admin.save()
+        assert client.get(URL_USERS).status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что понижение роли действует на выданный токен '
+            'сразу.'
+        )
+
+    def test_02_update_changes_role(self, admin, user, django_user_model,
+                                    cache_kind):
+        admin_client, user_client = get_client(admin), get_client(user)
+        assert admin_client.get(URL_USERS).status_code == HTTPStatus.OK
+        assert user_client.get(URL_USERS).status_code == (
+            HTTPStatus.FORBIDDEN)
+        django_user_model.objects.filter(pk=admin.pk).update(role='user')
+        django_user_model.objects.filter(pk=user.pk).update(role='admin')
+        assert admin_client.get(URL_USERS).status_code == (
+            HTTPStatus.FORBIDDEN), (
+            'Проверьте, что смена роли через QuerySet.update отзывает права '
+            'выданного токена.'
+        )
+        assert user_client.get(URL_USERS).status_code == HTTPStatus.OK, (
+            'Проверьте, что повышение роли действует без нового токена.'
+        )
+
+    def test_03_deletion_and_deactivation(self, admin, moderator,
+                                          cache_kind):
+        admin_client = get_client(admin)
+        moderator_client = get_client(moderator)
+        for client in (admin_client, moderator_client):
+            assert client.get(URL_CATEGORIES).status_code == HTTPStatus.OK
+        admin.delete()
+        assert admin_client.get(URL_CATEGORIES).status_code == (
+            HTTPStatus.UNAUTHORIZED), (
+            'Проверьте, что токен удалённого пользователя не действует.'
+        )
+        moderator.is_active = False
+        moderator.save()
+        assert moderator_client.get(URL_CATEGORIES).status_code == (
+            HTTPStatus.UNAUTHORIZED), (
+            'Проверьте, что токен заблокированного пользователя не '
+            'действует.'
+        )
+
+    def test_04_no_user_query(self, admin, cache_kind):
+        client = get_client(admin)
+        user_queries(client, URL_CATEGORIES)
+        queries = user_queries(client, URL_CATEGORIES)
+        assert queries == [], (
+            'Проверьте, что версия токенов берётся из кэша и пользователь '
+            'не читается из базы.'
+        )
+        admin.last_login = admin.date_joined
+        admin.save(update_fields=('last_login',))
+        admin.first_name = 'Админ'
+        admin.save()
+        assert get_client(admin).get(URL_USERS).status_code == HTTPStatus.OK
+        assert client.get(URL_USERS).status_code == HTTPStatus.OK, (
+            'Проверьте, что изменения без смены прав не отзывают токен.'
+        )
+
+    def test_05_local_cache_expires(self, admin, django_user_model,
+                                    settings, monkeypatch):
+        settings.TOKEN_VERSION_LOCAL_TIMEOUT = 1
+        client = get_client(admin)
+        assert client.get(URL_USERS).status_code == HTTPStatus.OK
+        # Смена прав в другом процессе: локальный кэш этого не узнает.
+        monkeypatch.setattr('users.models.forget_token_versions',
+                            lambda pks: None)
+        django_user_model.objects.filter(pk=admin.pk).update(role='user')
+        assert client.get(URL_USERS).status_code == HTTPStatus.OK
+        time.sleep(1.1)
+        assert client.get(URL_USERS).status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что версия токенов в локальном кэше устаревает '
+            'через TOKEN_VERSION_LOCAL_TIMEOUT секунд.'
+        )
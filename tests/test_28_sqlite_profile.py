@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category
+from tests.conftest import MANAGE_PATH
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28SqliteProfile:
+
+    def test_01_pragmas_applied(self, settings):
+        settings.SQLITE_PRAGMAS = {'cache_size': -1234,
+                                   'busy_timeout': 4321}
+        new_connection = connection.copy()
+        try:
+            with new_connection.cursor() as cursor:
+                values = [cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                          for name in ('cache_size', 'busy_timeout')]
+        finally:
+            new_connection.close()
+        assert values == [-1234, 4321], (
+            'Проверьте, что новое соединение SQLite настраивается по '
+            'SQLITE_PRAGMAS.'
+        )
+
+    @pytest.mark.parametrize('mode', ('DEFERRED', 'IMMEDIATE'))
+    def test_02_transaction_mode(self, settings, mode):
+        settings.SQLITE_TRANSACTION_MODE = mode
+        with CaptureQueriesContext(connection) as context:
+            with transaction.atomic():
+                Category.objects.create(name='Фильм', slug='films')
+        assert context.captured_queries[0]['sql'] == f'BEGIN {mode}', (
+            'Проверьте, что транзакции начинаются в режиме '
+            'SQLITE_TRANSACTION_MODE.'
+        )
+
+    def test_03_unknown_profile(self):
+        result = subprocess.run(
+            (sys.executable, 'manage.py', 'check'), cwd=MANAGE_PATH,
+            env=dict(os.environ, YAMDB_DATABASE_PROFILE='fast'),
+            capture_output=True, text=True)
+        assert result.returncode != 0
+        assert 'ImproperlyConfigured' in result.stderr, (
+            'Проверьте, что неизвестный профиль базы приводит к '
+            'ImproperlyConfigured.'
+        )
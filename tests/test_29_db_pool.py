@@ -0,0 +1,172 @@
+import sqlite3
+import threading
+
+import pytest
+from django.db import connection, connections
+from django.db.utils import OperationalError, load_backend
+
+from api_yamdb import db
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    db.metrics.reset()
+
+
+class FakeConnections:
+    """Открытые соединения SQLite и проверки исправности."""
+
+    def __init__(self, usable=True):
+        self.opened = []
+        self.checks = 0
+        self.usable = usable
+
+    def connect(self):
+        raw = sqlite3.connect(':memory:', check_same_thread=False)
+        self.opened.append(raw)
+        return raw
+
+    def is_usable(self, raw):
+        self.checks += 1
+        return self.usable
+
+
+def get_counters(*names):
+    counters = db.metrics.snapshot()
+    return [counters[name] for name in names]
+
+
+class Test29ConnectionPool:
+
+    def test_01_checkout_and_checkin(self):
+        pool = db.ConnectionPool(size=2, max_age=None, timeout=1,
+                                 check_idle=60)
+        fake = FakeConnections()
+        raw, created, reused = pool.checkout(fake.connect, fake.is_usable)
+        assert not reused and pool.stats() == {'size': 2, 'in_use': 1,
+                                               'idle': 0}
+        pool.checkin(raw, created)
+        assert pool.stats()['idle'] == 1, (
+            'Проверьте, что возвращённое соединение остаётся в пуле.'
+        )
+        again, _, reused = pool.checkout(fake.connect, fake.is_usable)
+        assert again is raw and reused, (
+            'Проверьте, что пул повторно выдаёт свободное соединение.'
+        )
+        assert fake.checks == 0, (
+            'Проверьте, что недавно возвращённое соединение не проверяется.'
+        )
+        assert get_counters('opened', 'reused', 'checkouts',
+                            'checkins') == [1, 1, 2, 1]
+
+    def test_02_idle_check(self):
+        pool = db.ConnectionPool(size=1, max_age=None, timeout=1,
+                                 check_idle=0)
+        fake = FakeConnections(usable=False)
+        raw, created, _ = pool.checkout(fake.connect, fake.is_usable)
+        pool.checkin(raw, created)
+        new, _, reused = pool.checkout(fake.connect, fake.is_usable)
+        assert fake.checks == 1 and new is not raw and not reused, (
+            'Проверьте, что простоявшее соединение проверяется и при '
+            'неисправности заменяется новым.'
+        )
+        assert get_counters('reconnects', 'closed') == [1, 1]
+
+    def test_03_max_age(self):
+        pool = db.ConnectionPool(size=1, max_age=0, timeout=1)
+        fake = FakeConnections()
+        raw, created, _ = pool.checkout(fake.connect, fake.is_usable)
+        pool.checkin(raw, created)
+        assert pool.stats()['idle'] == 0, (
+            'Проверьте, что соединение с истёкшим сроком жизни закрывается '
+            'при возврате.'
+        )
+        pool.idle.append((raw, created, created))
+        new, _, _ = pool.checkout(fake.connect, fake.is_usable)
+        assert new is not raw and len(fake.opened) == 2, (
+            'Проверьте, что пул не выдаёт соединение с истёкшим сроком.'
+        )
+        assert get_counters('expired') == [1]
+
+    def test_04_exhausted(self):
+        pool = db.ConnectionPool(size=1, max_age=None, timeout=0.05)
+        fake = FakeConnections()
+        raw, created, _ = pool.checkout(fake.connect, fake.is_usable)
+        with pytest.raises(OperationalError):
+            pool.checkout(fake.connect, fake.is_usable)
+        assert get_counters('waits', 'timeouts') == [1, 1], (
+            'Проверьте, что при исчерпании пула ожидание ограничено '
+            'timeout.'
+        )
+        thread = threading.Timer(0.01, pool.checkin, (raw, created))
+        pool.timeout = 1
+        thread.start()
+        again, _, reused = pool.checkout(fake.connect, fake.is_usable)
+        thread.join()
+        assert again is raw and reused, (
+            'Проверьте, что ожидающий получает возвращённое соединение.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29PooledEngine:
+
+    def get_wrapper(self, tmp_path):
+        settings_dict = dict(connection.settings_dict,
+                             ENGINE='api_yamdb.pooled_sqlite3',
+                             NAME=str(tmp_path / 'pool.sqlite3'),
+                             CONN_MAX_AGE=0)
+        backend = load_backend(settings_dict['ENGINE'])
+        return backend.DatabaseWrapper(settings_dict, alias='pool-test')
+
+    def test_05_request_cycle(self, tmp_path, settings):
+        settings.SQLITE_PRAGMAS = {'cache_size': -1234}
+        wrapper = self.get_wrapper(tmp_path)
+        try:
+            with wrapper.cursor() as cursor:
+                cursor.execute('CREATE TABLE item (id INTEGER)')
+            raw = wrapper.connection
+            # Так Django закрывает соединения в конце запроса.
+            wrapper.close_if_unusable_or_obsolete()
+            pool = db.pools['pool-test']
+            assert pool.stats() == {'size': settings.DB_POOL_SIZE,
+                                    'in_use': 0, 'idle': 1}, (
+                'Проверьте, что в конце запроса соединение возвращается '
+                'в пул.'
+            )
+            settings.SQLITE_PRAGMAS = {'cache_size': -4321}
+            with wrapper.cursor() as cursor:
+                cursor.execute('PRAGMA cache_size')
+                assert cursor.fetchone()[0] == -1234, (
+                    'Проверьте, что настройки SQLite не применяются '
+                    'повторно к соединению из пула.'
+                )
+            assert wrapper.connection is raw and wrapper.pool_reused
+            wrapper.connection.execute('BEGIN')
+            wrapper.close()
+            assert pool.stats()['idle'] == 0, (
+                'Проверьте, что соединение с открытой транзакцией не '
+                'возвращается в пул.'
+            )
+        finally:
+            wrapper.close()
+            db.pools.pop('pool-test').close_all()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_29_health_check_idle(client, settings, monkeypatch):
+    checks = []
+    monkeypatch.setattr(type(connections['default']), 'is_usable',
+                        lambda self: checks.append(self) or True)
+    settings.DB_HEALTH_CHECK_IDLE = 3600
+    client.get('/api/v1/categories/')
+    client.get('/api/v1/categories/')
+    assert checks == [], (
+        'Проверьте, что недавно использованное соединение не проверяется '
+        'перед запросом.'
+    )
+    settings.DB_HEALTH_CHECK_IDLE = 0
+    client.get('/api/v1/categories/')
+    assert checks, (
+        'Проверьте, что простоявшее соединение проверяется перед запросом.'
+    )